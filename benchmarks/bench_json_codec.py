@@ -0,0 +1,137 @@
+"""Microbenchmark: encoding request bodies and decoding responses per JSON codec.
+
+Run from the repository root: python -m benchmarks.bench_json_codec
+"""
+
+import json
+import timeit
+from functools import partial
+
+from pyimouapi.codec import JsonCodec, OrjsonCodec, orjson
+
+SYSTEM = {
+    "ver": "1.0",
+    "sign": "0f6c3e8d2b1a4c5e9f7d8b6a5c4e3d2f",
+    "appId": "lc0123456789abcdef",
+    "time": 1760000000,
+    "nonce": "Zk3yQpX1vW9sR2tU7mN4bL6cH8dJ0aE5",
+}
+REQUESTS = {
+    "getIotDeviceProperties": {
+        "system": SYSTEM,
+        "params": {
+            "token": "At_0000abcdef0123456789abcdef012345",
+            "deviceList": [
+                {
+                    "deviceId": f"8H0ABCD{index:06d}_HUB00001_hubpid",
+                    "channelId": None,
+                    "productId": "accpid",
+                    "properties": [str(10000 + ref * 100) for ref in range(12)],
+                }
+                for index in range(20)
+            ],
+        },
+        "id": "7d9f4c1e-2b3a-4c5d-8e6f-0a1b2c3d4e5f",
+    },
+    "setIotDeviceProperties": {
+        "system": SYSTEM,
+        "params": {
+            "token": "At_0000abcdef0123456789abcdef012345",
+            "deviceList": [
+                {
+                    "deviceId": "8H0ABCD000001",
+                    "channelId": 0,
+                    "productId": "pid1",
+                    "properties": {"10001": 1},
+                }
+            ],
+        },
+        "id": "7d9f4c1e-2b3a-4c5d-8e6f-0a1b2c3d4e5f",
+    },
+}
+RESPONSES = {
+    "getIotDeviceDetailInfo (32 ch)": {
+        "result": {
+            "code": "0",
+            "msg": "操作成功。",
+            "data": {
+                "properties": {str(10000 + ref * 100): ref for ref in range(40)},
+                "channels": [
+                    {
+                        "channelId": channel,
+                        "properties": {
+                            str(10000 + ref * 100): {"enable": 1, "level": ref}
+                            for ref in range(15)
+                        },
+                    }
+                    for channel in range(32)
+                ],
+            },
+        }
+    },
+    "listDeviceDetailsByPage (10)": {
+        "result": {
+            "code": "0",
+            "msg": "操作成功。",
+            "data": {
+                "count": 10,
+                "deviceList": [
+                    {
+                        "deviceId": f"8H0ABCD{index:06d}",
+                        "deviceName": f"Camera {index}",
+                        "deviceStatus": "online",
+                        "deviceModel": "IPC-C22EP",
+                        "deviceAbility": "WLAN,MT,HSEncrypt,CloudStorage,LocalStorage",
+                        "channelList": [
+                            {
+                                "channelId": "0",
+                                "channelName": f"Camera {index}",
+                                "channelStatus": "online",
+                                "channelAbility": "AlarmMD,WLM,Dormant,SmartTrack",
+                            }
+                        ],
+                    }
+                    for index in range(10)
+                ],
+            },
+        }
+    },
+}
+
+
+class _StrRoundTrip(JsonCodec):
+    """The path used before the codec: aiohttp's json= encoder, text() then loads."""
+
+    name = "json via str"
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode()
+
+    def loads(self, raw):
+        return json.loads(raw.decode())
+
+
+def main() -> None:
+    codecs = [_StrRoundTrip(), JsonCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    number = 2000
+    for name, body in REQUESTS.items():
+        print(f"encode {name}")
+        for codec in codecs:
+            seconds = min(
+                timeit.repeat(partial(codec.dumps, body), number=number, repeat=5)
+            )
+            print(f"{codec.name:>14}: {seconds / number * 1e6:8.1f} us")
+    for name, payload in RESPONSES.items():
+        raw = json.dumps(payload, ensure_ascii=False).encode()
+        print(f"decode {name}, {len(raw) / 1024:.1f} KiB")
+        for codec in codecs:
+            seconds = min(
+                timeit.repeat(partial(codec.loads, raw), number=number, repeat=5)
+            )
+            print(f"{codec.name:>14}: {seconds / number * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Microbenchmark: property lookups on a 32-channel getIotDeviceDetailInfo payload.
+
+Run from the repository root: python -m benchmarks.bench_lookup_property
+"""
+
+import timeit
+
+from pyimouapi.const import PARAM_CHANNEL_ID, PARAM_CHANNELS, PARAM_PROPERTIES
+from pyimouapi.ha_device import ImouHaDeviceManager
+
+CHANNELS = 32
+REFS = [str(10000 + i * 100) for i in range(20)]
+
+DETAIL = {
+    PARAM_PROPERTIES: dict.fromkeys(REFS, 1),
+    PARAM_CHANNELS: [
+        {
+            PARAM_CHANNEL_ID: channel,
+            PARAM_PROPERTIES: dict.fromkeys(REFS[:10], channel),
+        }
+        for channel in range(CHANNELS)
+    ],
+}
+# One lookup per entity per channel, as a full poll of the hub does
+LOOKUPS = [(str(channel), ref) for channel in range(CHANNELS) for ref in REFS]
+
+
+def _linear_lookup(detail_info: dict, channel_id: str | None, ref: str):
+    """The lookup used before the channel index: scan the channels on every call."""
+    if channel_id is None:
+        return (detail_info.get(PARAM_PROPERTIES) or {}).get(ref)
+    for channel in detail_info.get(PARAM_CHANNELS) or []:
+        if str(channel.get(PARAM_CHANNEL_ID)) != str(channel_id):
+            continue
+        channel_properties = channel.get(PARAM_PROPERTIES) or {}
+        if ref in channel_properties:
+            return channel_properties[ref]
+        break
+    if str(channel_id) == "0":
+        return (detail_info.get(PARAM_PROPERTIES) or {}).get(ref)
+    return None
+
+
+def scan_per_lookup() -> None:
+    for channel_id, ref in LOOKUPS:
+        _linear_lookup(DETAIL, channel_id, ref)
+
+
+def index_once() -> None:
+    index = ImouHaDeviceManager._index_properties(DETAIL)
+    for channel_id, ref in LOOKUPS:
+        ImouHaDeviceManager._lookup_indexed_property(index, channel_id, ref)
+
+
+def main() -> None:
+    number = 200
+    for name, func in (
+        ("scan per lookup", scan_per_lookup),
+        ("index once", index_once),
+    ):
+        seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+        print(f"{name:>16}: {seconds * 1e6:8.1f} us per poll ({len(LOOKUPS)} lookups)")
+
+
+if __name__ == "__main__":
+    main()
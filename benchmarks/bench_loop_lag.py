@@ -0,0 +1,87 @@
+"""Loop lag while decoding large API responses, on the loop vs in a worker thread.
+
+Run from the repository root: python -m benchmarks.bench_loop_lag
+"""
+
+import asyncio
+import json
+import time
+
+from pyimouapi.codec import default_codec
+from pyimouapi.instrumentation import LoopLagMonitor
+from pyimouapi.openapi import _async_decode_json
+
+DEVICE_ABILITY = (
+    "WLAN,MT,HSEncrypt,CloudStorage,LocalStorage,PlaybackByFilename,BreathingLight,"
+    "RD,SCCode,LocalRecord,XUpgrade,Auth,ModifyPassword,LocalStorageEnable,CK,DHP2P"
+)
+CHANNEL_ABILITY = (
+    "AlarmMD,AudioEncodeControl,WLM,Dormant,CloseCamera,MDW,MDS,HeaderDetect,SmartTrack"
+)
+# A listDeviceDetailsByPage-like response: many devices with their channels
+RESPONSE = json.dumps(
+    {
+        "result": {
+            "code": "0",
+            "msg": "ok",
+            "data": {
+                "count": 2000,
+                "deviceList": [
+                    {
+                        "deviceId": f"8H0ABCD{index:06d}",
+                        "deviceName": f"Camera {index}",
+                        "deviceStatus": "online",
+                        "productId": "",
+                        "deviceModel": "IPC-C22EP",
+                        "deviceAbility": DEVICE_ABILITY,
+                        "channelList": [
+                            {
+                                "channelId": str(channel),
+                                "channelName": f"Channel {channel}",
+                                "channelStatus": "online",
+                                "channelAbility": CHANNEL_ABILITY,
+                            }
+                            for channel in range(4)
+                        ],
+                    }
+                    for index in range(2000)
+                ],
+            },
+        }
+    }
+).encode()
+ROUNDS = 10
+CODEC = default_codec()
+
+
+async def _inline() -> None:
+    for _ in range(ROUNDS):
+        CODEC.loads(RESPONSE)
+        await asyncio.sleep(0)
+
+
+async def _offloaded() -> None:
+    for _ in range(ROUNDS):
+        await _async_decode_json(CODEC, RESPONSE)
+
+
+async def main() -> None:
+    print(
+        f"response: {len(RESPONSE) / 1024:.0f} KiB, {ROUNDS} decodes with {CODEC.name}"
+    )
+    for name, decode in (("on the loop", _inline), ("worker thread", _offloaded)):
+        async with LoopLagMonitor(interval=0.005) as monitor:
+            start = time.perf_counter()
+            await decode()
+            elapsed = time.perf_counter() - start
+            await asyncio.sleep(0.01)
+        stats = monitor.stats
+        print(
+            f"{name:>14}: {elapsed * 1e3:7.1f} ms total, "
+            f"loop lag max {stats['lag_max'] * 1e3:6.1f} ms, "
+            f"avg {stats['lag_avg'] * 1e3:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class _PendingWrite:
+    def __init__(
+        self,
+        value: Any,
+        write: Callable[[Any], Awaitable[Any]],
+        future: asyncio.Future,
+    ) -> None:
+        self.value = value
+        self.write = write
+        self.future = future
+        self.task: asyncio.Task | None = None
+
+
+class WriteCoalescer:
+    """Collapse rapid successive writes to the same key into a single request.
+
+    A write waits ``debounce`` seconds, and for the previous write of its key to
+    finish, before it is sent. Writes submitted for the key meanwhile replace its
+    value, and every caller receives the result of the one request that is sent.
+    """
+
+    def __init__(self, debounce: float = 0.0) -> None:
+        self._debounce = debounce
+        self._pending: dict[Hashable, _PendingWrite] = {}
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._submitted = 0
+        self._sent = 0
+
+    @property
+    def debounce(self) -> float:
+        return self._debounce
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Counts of submitted writes and of requests actually sent."""
+        return {"submitted": self._submitted, "sent": self._sent}
+
+    async def async_submit(
+        self,
+        key: Hashable,
+        value: Any,
+        write: Callable[[Any], Awaitable[Any]],
+    ) -> Any:
+        """Submit a write of value for key; write is called with the latest value."""
+        self._submitted += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = _PendingWrite(
+                value, write, asyncio.get_running_loop().create_future()
+            )
+            self._pending[key] = pending
+            pending.task = asyncio.ensure_future(
+                self._async_flush(key, pending, self._in_flight.get(key))
+            )
+        else:
+            pending.value = value
+            pending.write = write
+        return await asyncio.shield(pending.future)
+
+    async def _async_flush(
+        self,
+        key: Hashable,
+        pending: _PendingWrite,
+        previous: asyncio.Task | None,
+    ) -> None:
+        current = asyncio.current_task()
+        try:
+            if self._debounce > 0:
+                await asyncio.sleep(self._debounce)
+            if previous is not None:
+                await asyncio.wait([previous])
+            del self._pending[key]
+            self._in_flight[key] = current
+            self._sent += 1
+            try:
+                result = await pending.write(pending.value)
+            except Exception as err:
+                pending.future.set_exception(err)
+            else:
+                pending.future.set_result(result)
+        finally:
+            # A flush cancelled while waiting or writing must not leave callers waiting
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+            if self._in_flight.get(key) is current:
+                del self._in_flight[key]
+            if not pending.future.done():
+                pending.future.cancel()
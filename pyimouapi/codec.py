@@ -0,0 +1,41 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class JsonCodec:
+    """Encode request bodies and decode responses, bytes in and out (stdlib json)."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, raw: bytes) -> Any:
+        # Decoding up front skips json's encoding detection on bytes
+        return json.loads(raw.decode())
+
+
+class OrjsonCodec(JsonCodec):
+    """JsonCodec backed by orjson, which works on bytes natively."""
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, raw: bytes) -> Any:
+        return orjson.loads(raw)
+
+
+def default_codec() -> JsonCodec:
+    """The fastest codec available: orjson when installed, else stdlib json."""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
@@ -88,6 +88,7 @@ PARAM_USED_BYTES = "usedBytes"
 PARAM_TOTAL_BYTES = "totalBytes"
 PARAM_STREAMS = "streams"
 PARAM_HLS = "hls"
+PARAM_EXPIRE_TIME = "expireTime"
 PARAM_URL = "url"
 PARAM_KEY = "key"
 PARAM_DEFAULT = "default"
@@ -127,6 +128,55 @@ PARAM_ACCESS_TYPE = "accessType"
 PARAM_ABILITY = "ability"
 PARAM_FUNCTION_TYPE = "function_type"
 
+# Seconds before the function types learned for an ability switch are re-probed
+SWITCH_FUNCTION_TYPE_REPROBE_INTERVAL = 3600
+# Seconds between online checks of an offline device, doubled up to the max while it stays offline
+OFFLINE_BACKOFF_INITIAL_INTERVAL = 60
+OFFLINE_BACKOFF_MAX_INTERVAL = 3600
+# Wake-ups allowed per sleeping device within the window (seconds)
+WAKE_UP_BUDGET = 2
+WAKE_UP_BUDGET_WINDOW = 3600
+# Seconds a battery level read while awake is served for a sleeping device without waking it
+SLEEP_BATTERY_MAX_AGE = 6 * 3600
+# Seconds before the first read-back of a written property, doubled per attempt within the timeout
+WRITE_VERIFY_INITIAL_DELAY = 1
+WRITE_VERIFY_TIMEOUT = 15
+# Upper bound of a PTZ move merged from repeated presses in the same direction
+PTZ_MAX_MOVE_DURATION = 10000
+# Concurrent API requests per client, and the slots of those kept for interactive
+# requests; the default is aiohttp's connection limit, which bounded requests before
+MAX_CONCURRENT_REQUESTS = 100
+INTERACTIVE_RESERVED_REQUESTS = 1
+# Responses of at least this many bytes are decoded in a worker thread
+JSON_OFFLOAD_THRESHOLD = 256 * 1024
+# Snapshot download: size cap, chunk size, readiness polling backoff and concurrent jobs
+SNAPSHOT_MAX_BYTES = 10 * 1024 * 1024
+SNAPSHOT_CHUNK_SIZE = 64 * 1024
+SNAPSHOT_POLL_INITIAL_DELAY = 0.5
+SNAPSHOT_POLL_MAX_DELAY = 2
+SNAPSHOT_MAX_CONCURRENT_JOBS = 4
+# Snap triggers in flight at once in a batch snapshot
+SNAPSHOT_MAX_CONCURRENT_TRIGGERS = 8
+# Seconds a snapshot is served again instead of snapping the camera, and the
+# total size of the cached snapshots
+SNAPSHOT_CACHE_MAX_AGE = 5
+SNAPSHOT_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# Accessories of a hub whose properties are read in one getIotDeviceProperties request
+HUB_PROPERTIES_BATCH_SIZE = 20
+# Seconds a device's resolved live stream addresses are reused when the response does
+# not say when they expire
+STREAM_CACHE_TTL = 1800
+# Seconds before stream addresses expire at which they are resolved again
+STREAM_EXPIRY_MARGIN = 60
+# Misses after which a ref a device never reports stops being requested and applied
+MISSING_REF_SUPPRESS_THRESHOLD = 3
+# Interval in seconds at which a suppressed ref is checked again
+MISSING_REF_RECHECK_INTERVAL = 6 * 3600
+# Weight of the latest duration in the running estimate of an update step's cost
+UPDATE_STEP_COST_SMOOTHING = 0.3
+# Remaining cycle budget, in estimated costs, needed to still run a low-priority step
+UPDATE_LOW_PRIORITY_BUDGET_FACTOR = 2
+
 # Required capacity for various switch types
 SWITCH_TYPE_ABILITY = {
     "motion_detect": [
@@ -520,3 +570,10 @@ NIGHT_VISION_MODE_MAP = {
     "lowlight": "LowLight",
     "smartlowlight": "SmartLowLight",
 }
+# Debug logs include the request and response bodies of one in this many requests
+# per endpoint; failed requests are always logged
+LOG_BODY_SAMPLE_EVERY = 10
+# Logged bodies are cut to this many characters
+LOG_BODY_MAX_CHARS = 2048
+# Upper bounds in seconds of the per-endpoint request latency histogram buckets
+REQUEST_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
@@ -62,6 +62,7 @@ from .const import (
     PARAM_URL,
 )
 from .openapi import ImouOpenApiClient
+from .scheduler import RequestPriority
 
 
 class ImouChannel:
@@ -297,7 +298,7 @@ class ImouDeviceManager:
             PARAM_DURATION: duration,
         }
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_CONTROL_DEVICE_PTZ, params
+            API_ENDPOINT_CONTROL_DEVICE_PTZ, params, RequestPriority.INTERACTIVE
         )
 
     async def async_modify_device_alarm_status(
@@ -310,7 +311,7 @@ class ImouDeviceManager:
             PARAM_ENABLE: enabled,
         }
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_MODIFY_DEVICE_ALARM_STATUS, params
+            API_ENDPOINT_MODIFY_DEVICE_ALARM_STATUS, params, RequestPriority.INTERACTIVE
         )
 
     async def async_get_device_status(
@@ -345,7 +346,7 @@ class ImouDeviceManager:
             PARAM_ENABLE: enable,
         }
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_SET_DEVICE_STATUS, params
+            API_ENDPOINT_SET_DEVICE_STATUS, params, RequestPriority.INTERACTIVE
         )
 
     async def async_get_device_night_vision_mode(
@@ -372,7 +373,9 @@ class ImouDeviceManager:
             PARAM_MODE: night_vision_mode,
         }
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_SET_DEVICE_NIGHT_VISION_MODE, params
+            API_ENDPOINT_SET_DEVICE_NIGHT_VISION_MODE,
+            params,
+            RequestPriority.INTERACTIVE,
         )
 
     async def async_get_device_storage(self, device_id: str) -> dict[str, Any]:
@@ -386,7 +389,7 @@ class ImouDeviceManager:
         """reboot device"""
         params = {PARAM_DEVICE_ID: device_id}
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_RESTART_DEVICE, params
+            API_ENDPOINT_RESTART_DEVICE, params, RequestPriority.INTERACTIVE
         )
 
     async def async_get_stream_url(
@@ -406,6 +409,14 @@ class ImouDeviceManager:
             API_ENDPOINT_SET_DEVICE_SNAP, params
         )
 
+    async def async_download_file(
+        self, url: str, sink: Any, max_bytes: int, ready_timeout: float = 0
+    ) -> int:
+        """download a file, e.g. a snapshot, into sink; see ImouOpenApiClient.async_download"""
+        return await self._imou_api_client.async_download(
+            url, sink, max_bytes, ready_timeout
+        )
+
     async def async_create_stream_url(
         self, device_id: str, channel_id: str, stream_id: int = 0
     ) -> dict[str, Any]:
@@ -451,6 +462,28 @@ class ImouDeviceManager:
             )
         ).get(PARAM_DEVICE_LIST, [{}])[0]
 
+    async def async_get_iot_devices_properties(
+        self, devices: list[tuple[str, str | None, str, list[Any]]]
+    ) -> list[dict[str, Any]]:
+        """read the properties of several devices, e.g. the accessories of a hub, at once;
+        devices are (device_id, channel_id, product_id, properties) tuples"""
+        params = {
+            PARAM_DEVICE_LIST: [
+                {
+                    PARAM_DEVICE_ID: device_id,
+                    PARAM_CHANNEL_ID: channel_id,
+                    PARAM_PRODUCT_ID: product_id,
+                    PARAM_PROPERTIES: properties,
+                }
+                for device_id, channel_id, product_id, properties in devices
+            ]
+        }
+        return (
+            await self._imou_api_client.async_request_api(
+                API_ENDPOINT_GET_IOT_DEVICE_PROPERTIES, params
+            )
+        ).get(PARAM_DEVICE_LIST, [])
+
     async def async_set_iot_device_properties(
         self, device_id: str, channel_id: str | None, product_id: str, properties: dict
     ) -> None:
@@ -467,7 +500,7 @@ class ImouDeviceManager:
             ]
         }
         await self._imou_api_client.async_request_api(
-            API_ENDPOINT_SET_IOT_DEVICE_PROPERTIES, params
+            API_ENDPOINT_SET_IOT_DEVICE_PROPERTIES, params, RequestPriority.INTERACTIVE
         )
 
     async def async_get_device_sd_card_status(self, device_id: str) -> dict[str, Any]:
@@ -477,8 +510,14 @@ class ImouDeviceManager:
         )
 
     async def async_iot_device_control(
-        self, device_id: str, product_id: str, ref: str, content: dict[str, Any]
+        self,
+        device_id: str,
+        product_id: str,
+        ref: str,
+        content: dict[str, Any],
+        priority: RequestPriority = RequestPriority.BACKGROUND,
     ) -> dict[str, Any]:
+        """invoke a device service; commands pass RequestPriority.INTERACTIVE"""
         params = {
             PARAM_DEVICE_ID: device_id,
             PARAM_PRODUCT_ID: product_id,
@@ -486,7 +525,7 @@ class ImouDeviceManager:
             PARAM_CONTENT: content,
         }
         return await self._imou_api_client.async_request_api(
-            API_ENDPOINT_IOT_DEVICE_CONTROL, params
+            API_ENDPOINT_IOT_DEVICE_CONTROL, params, priority
         )
 
     async def async_get_device_power_info(self, device_id: str) -> dict[str, Any]:
@@ -1,11 +1,16 @@
 import asyncio
 import logging
-from enum import Enum
-from typing import Any
+import time
+import weakref
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from enum import Enum, IntEnum
+from typing import Any, NamedTuple
+from urllib.parse import parse_qsl, urlsplit
 
-import aiohttp
 from simpleeval import SimpleEval
 
+from .coalescer import WriteCoalescer
 from .const import (
     BINARY_SENSOR_TYPE_ABILITY,
     BINARY_SENSOR_TYPE_REF,
@@ -16,6 +21,11 @@ from .const import (
     ERROR_CODE_LIVE_ALREADY_EXIST,
     ERROR_CODE_LIVE_NOT_EXIST,
     ERROR_CODE_NO_STORAGE_MEDIUM,
+    HUB_PROPERTIES_BATCH_SIZE,
+    MISSING_REF_RECHECK_INTERVAL,
+    MISSING_REF_SUPPRESS_THRESHOLD,
+    OFFLINE_BACKOFF_INITIAL_INTERVAL,
+    OFFLINE_BACKOFF_MAX_INTERVAL,
     PARAM_ABILITY,
     PARAM_ALKELEC,
     PARAM_BATTERY,
@@ -24,9 +34,11 @@ from .const import (
     PARAM_CONTENT,
     PARAM_CURRENT_OPTION,
     PARAM_DEFAULT,
+    PARAM_DEVICE_ID,
     PARAM_ELECTRIC,
     PARAM_ELECTRICITYS,
     PARAM_EXCEPTS,
+    PARAM_EXPIRE_TIME,
     PARAM_EXPRESSION,
     PARAM_FUNCTION_TYPE,
     PARAM_HD,
@@ -57,19 +69,43 @@ from .const import (
     PARAM_URL,
     PARAM_USED_BYTES,
     PARAM_VALUE_TYPE,
+    PTZ_MAX_MOVE_DURATION,
     SELECT_TYPE_ABILITY,
     SELECT_TYPE_REF,
     SENSOR_TYPE_ABILITY,
     SENSOR_TYPE_REF,
+    SLEEP_BATTERY_MAX_AGE,
+    SNAPSHOT_CACHE_MAX_AGE,
+    SNAPSHOT_CACHE_MAX_BYTES,
+    SNAPSHOT_MAX_BYTES,
+    SNAPSHOT_MAX_CONCURRENT_JOBS,
+    SNAPSHOT_MAX_CONCURRENT_TRIGGERS,
+    STREAM_CACHE_TTL,
+    STREAM_EXPIRY_MARGIN,
+    SWITCH_FUNCTION_TYPE_REPROBE_INTERVAL,
     SWITCH_TYPE_ABILITY,
     SWITCH_TYPE_REF,
     TEXT_TYPE_REF,
+    UPDATE_LOW_PRIORITY_BUDGET_FACTOR,
+    UPDATE_STEP_COST_SMOOTHING,
+    WAKE_UP_BUDGET,
+    WAKE_UP_BUDGET_WINDOW,
+    WRITE_VERIFY_INITIAL_DELAY,
+    WRITE_VERIFY_TIMEOUT,
 )
 from .device import ImouDevice, ImouDeviceManager
 from .exceptions import RequestFailedException
+from .ptz import PtzSession
+from .scheduler import RequestPriority
+from .snapshot import SnapshotCache
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Clock and sleep of backoffs, caches, deadlines and read-backs, looked up here so
+# tests can replace them without affecting the event loop
+_monotonic = time.monotonic
+_sleep = asyncio.sleep
+
 
 def _battery_level_from_106200_list(data) -> int:
     """解析 ref 106200 电量属性: [{"106202": 电池类型, "106203": 电量}, ...]。
@@ -131,6 +167,109 @@ PRODUCT_MODEL_ILLEGAL_LIST = [
 ]
 
 
+class EntityChange(NamedTuple):
+    """A state change of one entity, delivered to ImouHaDevice change listeners."""
+
+    kind: str
+    key: str
+    old: Any
+    new: Any
+
+
+class UpdateOverlapPolicy(Enum):
+    """What an update of a device does while a previous update of it is still running."""
+
+    # Return at once, leaving the entities as the running update sets them
+    SKIP = "skip"
+    # Wait for the running update and share its outcome
+    COALESCE = "coalesce"
+    # Run one follow-up update once the running one finishes
+    QUEUE = "queue"
+
+
+class UpdatePriority(IntEnum):
+    """Priority of a step of a device update when the update cycle runs short of time."""
+
+    # Always run: online status and user-visible switches
+    HIGH = 0
+    # Deferred once the remaining budget cannot cover the step
+    MEDIUM = 1
+    # Deferred unless the remaining budget covers the step with a margin: storage, battery
+    LOW = 2
+
+
+class UpdateCycleReport(NamedTuple):
+    """Outcome of a fleet update: its duration and the steps deferred per (device_id, channel_id)."""
+
+    duration: float
+    deferred: dict[tuple[str, str | None], list[str]]
+
+
+class _UpdateBudget:
+    def __init__(self, deadline: float, promoted: set[str]) -> None:
+        self.deadline = deadline
+        # Steps deferred by the previous cycle, which are not deferred again
+        self.promoted = promoted
+        self.deferred: list[str] = []
+
+
+class _HubPrefetch:
+    """Property reads of the online accessories of one hub during an update cycle.
+
+    An accessory joins once its own update found it online, and leaves when its update
+    ends without reading, e.g. because it is offline. A batch is sent as soon as it is full or no other accessory can
+    still join, and each accessory only waits for the batch it is part of.
+    """
+
+    def __init__(
+        self,
+        keys: set[tuple[str, str | None]],
+        send: Callable[[list["ImouHaDevice"]], Awaitable[None]],
+        batch_size: int,
+    ) -> None:
+        self._expected = keys
+        self._send = send
+        self._batch_size = batch_size
+        self._joined: list[tuple[ImouHaDevice, asyncio.Future]] = []
+        self._sends: set[asyncio.Task] = set()
+
+    async def async_join(
+        self, key: tuple[str, str | None], device: "ImouHaDevice"
+    ) -> None:
+        """Add the device to the next batch and wait until that batch was read."""
+        if key not in self._expected:
+            return
+        self._expected.discard(key)
+        read = asyncio.get_running_loop().create_future()
+        self._joined.append((device, read))
+        self._flush()
+        await read
+
+    def leave(self, key: tuple[str, str | None]) -> None:
+        if key in self._expected:
+            self._expected.discard(key)
+            self._flush()
+
+    def _flush(self) -> None:
+        while self._joined and (
+            len(self._joined) >= self._batch_size or not self._expected
+        ):
+            batch = self._joined[: self._batch_size]
+            del self._joined[: self._batch_size]
+            self._sends.add(asyncio.ensure_future(self._async_send(batch)))
+
+    async def _async_send(
+        self, batch: list[tuple["ImouHaDevice", asyncio.Future]]
+    ) -> None:
+        try:
+            await self._send([device for device, _ in batch])
+        finally:
+            self._sends.discard(asyncio.current_task())
+            for _, read in batch:
+                if not read.done():
+                    read.set_result(None)
+
+
 class ImouHaDevice:
     def __init__(
         self,
@@ -158,6 +297,12 @@ class ImouHaDevice:
         self._product_id = None
         self._parent_product_id = None
         self._parent_device_id = None
+        self._resolved_device_id: str | None = None
+        # (kind, key) -> [state before the pending changes, latest state]
+        self._changes: dict[tuple[str, str], list[Any]] = {}
+        self._change_listeners: list[
+            Callable[[ImouHaDevice, list[EntityChange]], None]
+        ] = []
 
     @property
     def device_id(self):
@@ -219,6 +364,18 @@ class ImouHaDevice:
     def parent_device_id(self) -> str:
         return self._parent_device_id
 
+    @property
+    def resolved_device_id(self) -> str:
+        """Id the API knows the device by: accessories behind a hub are addressed as
+        {device_id}_{parent_device_id}_{parent_product_id}."""
+        if self._resolved_device_id is None:
+            self._resolved_device_id = (
+                f"{self._device_id}_{self._parent_device_id}_{self._parent_product_id}"
+                if self._parent_product_id is not None
+                else self._device_id
+            )
+        return self._resolved_device_id
+
     @property
     def device_name(self) -> str:
         return self._device_name
@@ -228,9 +385,11 @@ class ImouHaDevice:
 
     def set_parent_product_id(self, parent_product_id: str) -> None:
         self._parent_product_id = parent_product_id
+        self._resolved_device_id = None
 
     def set_parent_device_id(self, parent_device_id: str) -> None:
         self._parent_device_id = parent_device_id
+        self._resolved_device_id = None
 
     def __str__(self):
         return (
@@ -245,10 +404,142 @@ class ImouHaDevice:
     def set_channel_name(self, channel_name):
         self._channel_name = channel_name
 
+    def get_entities(self, kind: str) -> dict[str, dict[str, Any]]:
+        return {
+            "switch": self._switches,
+            "sensor": self._sensors,
+            "binary_sensor": self._binary_sensors,
+            "select": self._selects,
+            "text": self._texts,
+        }[kind]
+
+    def set_entity_state(self, kind: str, key: str, value: Any) -> None:
+        """Set the state of an entity (the current option of a select), tracking the change."""
+        entity = self.get_entities(kind)[key]
+        field = PARAM_CURRENT_OPTION if kind == "select" else PARAM_STATE
+        old = entity.get(field)
+        if old == value and type(old) is type(value):
+            return
+        entity[field] = value
+        change = self._changes.get((kind, key))
+        if change is None:
+            self._changes[(kind, key)] = [old, value]
+        else:
+            change[1] = value
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._changes)
+
+    def add_change_listener(
+        self, listener: Callable[["ImouHaDevice", list[EntityChange]], None]
+    ) -> Callable[[], None]:
+        """Register a listener called with the entity changes of each update; returns a remover."""
+        self._change_listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._change_listeners:
+                self._change_listeners.remove(listener)
+
+        return _remove
+
+    def flush_changes(self) -> list[EntityChange]:
+        """Deliver the changes pending since the last flush to the listeners and return them.
+
+        Several changes of one entity are merged into one, and an entity back at its
+        previous state is not reported.
+        """
+        changes = [
+            EntityChange(kind, key, old, new)
+            for (kind, key), (old, new) in self._changes.items()
+            if old != new or type(old) is not type(new)
+        ]
+        self._changes.clear()
+        if changes:
+            for listener in list(self._change_listeners):
+                try:
+                    listener(self, changes)
+                except Exception as e:
+                    _LOGGER.error(f"device change listener fail:{e}")
+        return changes
+
 
 class ImouHaDeviceManager:
-    def __init__(self, device_manager: ImouDeviceManager):
+    def __init__(
+        self,
+        device_manager: ImouDeviceManager,
+        write_debounce: float = 0.0,
+        update_overlap_policy: UpdateOverlapPolicy = UpdateOverlapPolicy.COALESCE,
+        max_snapshot_jobs: int = SNAPSHOT_MAX_CONCURRENT_JOBS,
+        snapshot_max_age: float = SNAPSHOT_CACHE_MAX_AGE,
+        snapshot_cache_bytes: int = SNAPSHOT_CACHE_MAX_BYTES,
+    ):
         self._delegate = device_manager
+        self._update_overlap_policy = update_overlap_policy
+        # (device_id, channel_id) -> status update running, and the follow-up queued behind it
+        self._updates_in_flight: dict[tuple[str, str | None], asyncio.Task] = {}
+        self._queued_updates: dict[tuple[str, str | None], asyncio.Task] = {}
+        self._update_overlap_stats = {"overlapped": 0, "skipped": 0}
+        # (device_id, channel_id) -> duration of its last update and the status it left
+        self._device_updates: dict[tuple[str, str | None], tuple[float, str]] = {}
+        # (device_id, channel_id) of the devices of the last discovery or update cycle,
+        # the only ones whose update stats are exported; None before either ran
+        self._known_devices: set[tuple[str, str | None]] | None = None
+        self._last_update_cycle: UpdateCycleReport | None = None
+        # Update step -> running estimate of its duration in seconds
+        self._update_step_costs: dict[str, float] = {}
+        # (device_id, channel_id) -> properties of a hub accessory read in a batch, used
+        # instead of its detail request by the update in progress
+        self._prefetched_details: dict[tuple[str, str | None], dict[str, Any]] = {}
+        # (device_id, channel_id) -> property reads of the hub the accessory is updated with
+        self._hub_prefetches: dict[tuple[str, str | None], _HubPrefetch] = {}
+        # (device_id, channel_id) -> update steps deferred by the last deadline-bound update
+        self._deferred_steps: dict[tuple[str, str | None], list[str]] = {}
+        # Writes to the same (device, channel, ref) are collapsed to the latest value
+        self._write_coalescer = WriteCoalescer(write_debounce)
+        # (device_id, channel_id, switch_type) -> (answering function types, re-probe time)
+        self._switch_function_types: dict[
+            tuple[str, str | None, str], tuple[list[str], float]
+        ] = {}
+        # (device_id, channel_id, select_type) -> (raw options, normalized options);
+        # option lists never change for a device, so they survive rediscovery
+        self._select_options: dict[
+            tuple[str, str | None, str], tuple[list[str], list[str]]
+        ] = {}
+        # (device_id, channel_id) -> offline backoff state and counters
+        self._offline_backoff: dict[tuple[str, str | None], dict[str, Any]] = {}
+        # (device_id, channel_id) -> (last battery level read, read time)
+        self._last_battery: dict[tuple[str, str | None], tuple[str, float]] = {}
+        # device_id -> times of recent wake-ups, and the wake-up currently in flight
+        self._wake_up_history: dict[str, deque[float]] = {}
+        self._wake_ups: dict[str, asyncio.Future] = {}
+        # Read-backs confirming optimistic writes, kept referenced until they finish
+        self._background_tasks: set[asyncio.Task] = set()
+        self._write_verification_stats = {"verified": 0, "reverted": 0}
+        # (device_id, channel_id, ref) -> read-back of the latest write to that ref, and
+        # the entity value from before the first write it has not confirmed
+        self._write_verifiers: dict[
+            tuple[str, str | None, str], tuple[asyncio.Task, Any]
+        ] = {}
+        # Raw value last applied to each property entity of a device object
+        self._applied_details: weakref.WeakKeyDictionary[
+            ImouHaDevice, dict[tuple[str, str], Any]
+        ] = weakref.WeakKeyDictionary()
+        # (product_id, device_id, channel_id, ref) -> misses of a ref the device does
+        # not report, and when a suppressed ref is checked again
+        self._missing_refs: dict[
+            tuple[str | None, str, str | None, str], dict[str, Any]
+        ] = {}
+        # Snapshot jobs (snap and download) running at once across all cameras
+        self._snapshot_jobs = asyncio.Semaphore(max_snapshot_jobs)
+        # (device_id, channel_id) -> live stream info with its expiry time, and the
+        # resolution of that info in flight
+        self._stream_cache: dict[tuple[str, str | None], tuple[dict, float]] = {}
+        self._stream_resolves: dict[tuple[str, str | None], asyncio.Future] = {}
+        # (device_id, channel_id) -> recent picture, served to repeated image requests
+        self._snapshot_cache = SnapshotCache(snapshot_max_age, snapshot_cache_bytes)
+        # (device_id, channel_id) -> PTZ session serializing the moves of that camera
+        self._ptz_sessions: dict[tuple[str, str | None], PtzSession] = {}
 
     @property
     def delegate(self):
@@ -256,36 +547,223 @@ class ImouHaDeviceManager:
 
     @staticmethod
     def _resolve_device_id(device: ImouHaDevice) -> str:
-        device_id = device.device_id
-        if device.parent_product_id is not None:
-            device_id = (
-                f"{device_id}_{device.parent_device_id}_{device.parent_product_id}"
+        return device.resolved_device_id
+
+    @classmethod
+    def _device_key(cls, device: ImouHaDevice) -> tuple[str, str | None]:
+        return cls._resolve_device_id(device), device.channel_id
+
+    @classmethod
+    def _write_key(cls, device: ImouHaDevice, ref: str) -> tuple[str, str | None, str]:
+        return cls._resolve_device_id(device), device.channel_id, ref
+
+    @property
+    def write_coalescer(self) -> WriteCoalescer:
+        return self._write_coalescer
+
+    @property
+    def snapshot_cache(self) -> SnapshotCache:
+        return self._snapshot_cache
+
+    @property
+    def update_overlap_policy(self) -> UpdateOverlapPolicy:
+        return self._update_overlap_policy
+
+    @property
+    def update_overlap_stats(self) -> dict[str, int]:
+        """Counts of updates started while one was running, and of those that did not run."""
+        return dict(self._update_overlap_stats)
+
+    @property
+    def update_step_costs(self) -> dict[str, float]:
+        """Running estimate of the duration in seconds of each update step."""
+        return dict(self._update_step_costs)
+
+    @property
+    def last_update_cycle(self) -> UpdateCycleReport | None:
+        """Report of the last async_update_devices_status cycle."""
+        return self._last_update_cycle
+
+    @property
+    def device_update_stats(self) -> dict[tuple[str, str | None], dict[str, Any]]:
+        """Per (device_id, channel_id): duration in seconds of its last update and the
+        device status that update left, for the devices of the last discovery or update
+        cycle."""
+        return {
+            key: {"duration": duration, "status": status}
+            for key, (duration, status) in self._device_updates.items()
+            if self._known_devices is None or key in self._known_devices
+        }
+
+    def forget_device(self, device: ImouHaDevice) -> None:
+        """Drop everything kept about a device that was removed: update stats, backoff,
+        caches and learned metadata. Its running update and write read-backs are cancelled."""
+        key = self._device_key(device)
+        for tasks in (self._updates_in_flight, self._queued_updates):
+            task = tasks.pop(key, None)
+            if task is not None:
+                task.cancel()
+        for write_key in [
+            write_key for write_key in self._write_verifiers if write_key[:2] == key
+        ]:
+            self._write_verifiers.pop(write_key)[0].cancel()
+        for per_device in (
+            self._device_updates,
+            self._prefetched_details,
+            self._hub_prefetches,
+            self._deferred_steps,
+            self._offline_backoff,
+            self._last_battery,
+            self._stream_cache,
+            self._stream_resolves,
+        ):
+            per_device.pop(key, None)
+        self._ptz_sessions.pop((device.device_id, device.channel_id), None)
+        for per_type in (self._switch_function_types, self._select_options):
+            for cache_key in [
+                cache_key
+                for cache_key in per_type
+                if cache_key[:2] == (device.device_id, device.channel_id)
+            ]:
+                del per_type[cache_key]
+        for missing_key in [
+            missing_key
+            for missing_key in self._missing_refs
+            if missing_key[:3] == (device.product_id, *key)
+        ]:
+            del self._missing_refs[missing_key]
+        self._wake_up_history.pop(device.device_id, None)
+        self._wake_ups.pop(device.device_id, None)
+        self._applied_details.pop(device, None)
+        self._snapshot_cache.invalidate(key)
+        if self._known_devices is not None:
+            self._known_devices.discard(key)
+
+    @staticmethod
+    def _index_properties(detail_info: dict) -> dict[str | None, dict[str, Any]]:
+        """Map channel id to its properties once per detail response; None holds the device properties."""
+        index: dict[str | None, dict[str, Any]] = {}
+        for channel in detail_info.get(PARAM_CHANNELS) or []:
+            index.setdefault(
+                str(channel.get(PARAM_CHANNEL_ID)),
+                channel.get(PARAM_PROPERTIES) or {},
             )
-        return device_id
+        index[None] = detail_info.get(PARAM_PROPERTIES) or {}
+        return index
 
     @staticmethod
-    def _lookup_property(
-        detail_info: dict, channel_id: str | None, ref: str
+    def _lookup_indexed_property(
+        index: dict[str | None, dict[str, Any]], channel_id: str | None, ref: str
     ) -> Any | None:
         if channel_id is None:
-            properties = detail_info.get(PARAM_PROPERTIES) or {}
-            return properties.get(ref)
+            return index[None].get(ref)
 
-        channels = detail_info.get(PARAM_CHANNELS) or []
-        for channel in channels:
-            if str(channel.get(PARAM_CHANNEL_ID)) != str(channel_id):
-                continue
-            channel_properties = channel.get(PARAM_PROPERTIES) or {}
-            if ref in channel_properties:
-                return channel_properties[ref]
-            break
+        channel_id = str(channel_id)
+        channel_properties = index.get(channel_id)
+        if channel_properties is not None and ref in channel_properties:
+            return channel_properties[ref]
 
-        if str(channel_id) == "0":
-            properties = detail_info.get(PARAM_PROPERTIES) or {}
-            return properties.get(ref)
+        # Channel 0 falls back to the device properties
+        if channel_id == "0":
+            return index[None].get(ref)
 
         return None
 
+    @classmethod
+    def _lookup_property(
+        cls, detail_info: dict, channel_id: str | None, ref: str
+    ) -> Any | None:
+        return cls._lookup_indexed_property(
+            cls._index_properties(detail_info), channel_id, ref
+        )
+
+    @classmethod
+    def _missing_ref_key(
+        cls, device: ImouHaDevice, ref: str
+    ) -> tuple[str | None, str, str | None, str]:
+        return device.product_id, cls._resolve_device_id(device), device.channel_id, ref
+
+    def _ref_suppressed(self, device: ImouHaDevice, ref: str) -> bool:
+        """Whether a ref the device keeps not reporting should be left out this time."""
+        if not self._missing_refs:
+            return False
+        state = self._missing_refs.get(self._missing_ref_key(device, ref))
+        return (
+            state is not None
+            and state["misses"] >= MISSING_REF_SUPPRESS_THRESHOLD
+            and _monotonic() < state["recheck_at"]
+        )
+
+    def _record_missing_ref(
+        self,
+        device: ImouHaDevice,
+        ref: str,
+        *,
+        source: str,
+        kind: str | None = None,
+        key: str | None = None,
+    ) -> None:
+        state = self._missing_refs.setdefault(
+            self._missing_ref_key(device, ref),
+            {"misses": 0, "recheck_at": 0.0, "entity": None},
+        )
+        state["misses"] += 1
+        if kind and key:
+            state["entity"] = f"{kind}.{key}"
+        if state["misses"] < MISSING_REF_SUPPRESS_THRESHOLD:
+            self._debug_missing_property_ref(
+                device, ref, source=source, kind=kind, key=key
+            )
+            return
+        if state["misses"] == MISSING_REF_SUPPRESS_THRESHOLD:
+            _LOGGER.debug(
+                "property ref %s missing %d times, suppressing it for %ds, device_id=%s channel_id=%s",
+                ref,
+                state["misses"],
+                MISSING_REF_RECHECK_INTERVAL,
+                device.device_id,
+                device.channel_id,
+            )
+        state["recheck_at"] = _monotonic() + MISSING_REF_RECHECK_INTERVAL
+
+    def _record_ref_found(self, device: ImouHaDevice, ref: str) -> None:
+        if self._missing_refs:
+            self._missing_refs.pop(self._missing_ref_key(device, ref), None)
+
+    def get_suppressed_refs(
+        self, device: ImouHaDevice | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the refs no longer requested because the device never reports them,
+        for all devices or one, with their misses and seconds until the next re-check."""
+        now = _monotonic()
+        suppressed = []
+        for (
+            product_id,
+            device_id,
+            channel_id,
+            ref,
+        ), state in self._missing_refs.items():
+            if state["misses"] < MISSING_REF_SUPPRESS_THRESHOLD:
+                continue
+            if device is not None and (product_id, device_id, channel_id) != (
+                device.product_id,
+                self._resolve_device_id(device),
+                device.channel_id,
+            ):
+                continue
+            suppressed.append(
+                {
+                    "product_id": product_id,
+                    "device_id": device_id,
+                    "channel_id": channel_id,
+                    "ref": ref,
+                    "entity": state["entity"],
+                    "misses": state["misses"],
+                    "recheck_in": max(0.0, state["recheck_at"] - now),
+                }
+            )
+        return suppressed
+
     @staticmethod
     def _debug_missing_property_ref(
         device: ImouHaDevice,
@@ -334,24 +812,30 @@ class ImouHaDeviceManager:
         raw_value: Any,
     ) -> None:
         ref = meta[PARAM_REF]
-        if kind == "switch":
-            device.switches[key][PARAM_STATE] = raw_value == 1
-        elif kind == "binary_sensor":
-            device.binary_sensors[key][PARAM_STATE] = raw_value == 1
+        if kind in ("switch", "binary_sensor"):
+            device.set_entity_state(kind, key, raw_value == 1)
         elif kind == "select":
             value = str(raw_value) if isinstance(raw_value, int) else raw_value
-            device.selects[key][PARAM_CURRENT_OPTION] = value
             if ref == "15400" and value == "-1":
-                device.selects[key][PARAM_CURRENT_OPTION] = "99"
+                value = "99"
+            device.set_entity_state(kind, key, value)
         elif kind in ("sensor", "text"):
             if meta.get(PARAM_EXPRESSION) and isinstance(raw_value, dict | list):
                 state = self.get_expression_value(meta[PARAM_EXPRESSION], raw_value)
             else:
                 state = raw_value
-            target = device.sensors if kind == "sensor" else device.texts
-            target[key][PARAM_STATE] = str(state) if isinstance(state, int) else state
+            device.set_entity_state(
+                kind, key, str(state) if isinstance(state, int) else state
+            )
 
     async def _async_fetch_device_detail(self, device: ImouHaDevice) -> dict[str, Any]:
+        key = self._device_key(device)
+        prefetch = self._hub_prefetches.get(key)
+        if prefetch is not None:
+            await prefetch.async_join(key, device)
+        prefetched = self._prefetched_details.pop(key, None)
+        if prefetched is not None:
+            return prefetched
         return await self.delegate.async_get_iot_device_detail_info(
             self._resolve_device_id(device), device.product_id
         )
@@ -359,11 +843,17 @@ class ImouHaDeviceManager:
     async def _async_update_properties_from_detail(
         self, device: ImouHaDevice, detail: dict[str, Any]
     ) -> None:
+        # {(kind, key): raw value applied}: a snapshot of only the refs the entities
+        # read, so an unchanged payload costs one lookup per ref and applies nothing
+        values = self._applied_details.setdefault(device, {})
+        index = self._index_properties(detail)
         for kind, key, meta in self._collect_property_entities(device):
             ref = meta[PARAM_REF]
-            raw = self._lookup_property(detail, device.channel_id, ref)
+            if self._ref_suppressed(device, ref):
+                continue
+            raw = self._lookup_indexed_property(index, device.channel_id, ref)
             if raw is None:
-                self._debug_missing_property_ref(
+                self._record_missing_ref(
                     device,
                     ref,
                     source="getIotDeviceDetailInfo",
@@ -371,77 +861,488 @@ class ImouHaDeviceManager:
                     key=key,
                 )
                 continue
+            self._record_ref_found(device, ref)
+            if (kind, key) in values and values[(kind, key)] == raw:
+                continue
             self._apply_property_value(device, kind, key, meta, raw)
+            values[(kind, key)] = raw
+
+    def _forget_applied_value(self, device: ImouHaDevice, kind: str, key: str) -> None:
+        """Make the next detail payload apply the entity again, e.g. after a local write."""
+        applied = self._applied_details.get(device)
+        if applied is not None:
+            applied.pop((kind, key), None)
+
+    @staticmethod
+    def _collect_services_entities(
+        device: ImouHaDevice,
+    ) -> dict[str, list[tuple[str, str, dict[str, Any]]]]:
+        """Group services-type sensors and texts by ref, so each service is invoked once."""
+        groups: dict[str, list[tuple[str, str, dict[str, Any]]]] = {}
+        for kind, mapping in (
+            ("sensor", device.sensors),
+            ("text", device.texts),
+        ):
+            for key, value in mapping.items():
+                if PARAM_REF not in value:
+                    continue
+                if value.get(PARAM_REF_TYPE, PARAM_PROPERTIES) != PARAM_SERVICES:
+                    continue
+                groups.setdefault(value[PARAM_REF], []).append((kind, key, value))
+        return groups
 
     async def _async_update_services_entities(self, device: ImouHaDevice) -> None:
-        for sensor_type, value in device.sensors.items():
-            if (
-                PARAM_REF in value
-                and value.get(PARAM_REF_TYPE, PARAM_PROPERTIES) == PARAM_SERVICES
-            ):
-                await self._async_update_device_sensor_status_by_ref(
-                    device, sensor_type, value
+        device_id = self._resolve_device_id(device)
+        for ref, entities in self._collect_services_entities(device).items():
+            try:
+                result = await self.delegate.async_iot_device_control(
+                    device_id, device.product_id, ref, {}
                 )
-        for text_type, value in device.texts.items():
-            if (
-                PARAM_REF in value
-                and value.get(PARAM_REF_TYPE, PARAM_PROPERTIES) == PARAM_SERVICES
-            ):
-                await self._async_update_device_text_status_by_ref(
-                    device, text_type, value
+                data = result[PARAM_CONTENT][PARAM_OUTPUT_DATA]
+            except Exception as e:
+                _LOGGER.error(f"_async_update_services_entities fail:{e}")
+                continue
+            for kind, key, meta in entities:
+                try:
+                    self._apply_property_value(device, kind, key, meta, data)
+                except Exception as e:
+                    _LOGGER.error(
+                        f"_async_update_services_entities apply {kind}.{key} fail:{e}"
+                    )
+
+    async def async_update_devices_status(
+        self, devices: list[ImouHaDevice], timeout: float | None = None
+    ) -> UpdateCycleReport:
+        """Update the status of all devices in one cycle bounded by timeout seconds.
+
+        Steps that the remaining time cannot cover are deferred by priority and run
+        first on the next cycle; the returned report lists them per device.
+        """
+        start = _monotonic()
+        deadline = None if timeout is None else start + timeout
+        self._known_devices = {self._device_key(device) for device in devices}
+        standalone, hubs = self._group_by_hub(devices)
+        await asyncio.gather(
+            *[
+                self.async_update_device_status(device, deadline)
+                for device in standalone
+            ],
+            *[
+                self._async_update_hub_accessories(accessories, deadline)
+                for accessories in hubs.values()
+            ],
+            return_exceptions=True,
+        )
+        deferred = {}
+        for device in devices:
+            key = self._device_key(device)
+            if self._deferred_steps.get(key):
+                deferred[key] = list(self._deferred_steps[key])
+        report = UpdateCycleReport(_monotonic() - start, deferred)
+        self._last_update_cycle = report
+        if deferred:
+            _LOGGER.info(
+                "update cycle took %.1fs, deferred steps: %s", report.duration, deferred
+            )
+        return report
+
+    @staticmethod
+    def _group_by_hub(
+        devices: list[ImouHaDevice],
+    ) -> tuple[list[ImouHaDevice], dict[tuple[str, str], list[ImouHaDevice]]]:
+        """Split devices into standalone ones and the accessories of each hub that has
+        several, keyed by (parent_device_id, parent_product_id)."""
+        hubs: dict[tuple[str, str], list[ImouHaDevice]] = {}
+        standalone = []
+        for device in devices:
+            if device.parent_product_id is None or device.product_id is None:
+                standalone.append(device)
+            else:
+                hubs.setdefault(
+                    (device.parent_device_id, device.parent_product_id), []
+                ).append(device)
+        for hub, accessories in list(hubs.items()):
+            if len(accessories) == 1:
+                standalone.extend(hubs.pop(hub))
+        return standalone, hubs
+
+    async def _async_update_hub_accessories(
+        self, accessories: list[ImouHaDevice], deadline: float | None
+    ) -> None:
+        """Update the accessories of one hub together, the properties of those online
+        read in batches.
+
+        Each accessory runs its own update, under the overlap policy and the deadline,
+        and joins a batch once it is found online. Accessories whose update is already
+        running keep it and are not read in a batch.
+        """
+        keys = {
+            self._device_key(accessory)
+            for accessory in accessories
+            if self._device_key(accessory) not in self._updates_in_flight
+            and self._device_key(accessory) not in self._queued_updates
+        }
+        prefetch = _HubPrefetch(
+            keys, self._async_prefetch_hub_properties, HUB_PROPERTIES_BATCH_SIZE
+        )
+
+        async def _async_update(accessory: ImouHaDevice) -> None:
+            key = self._device_key(accessory)
+            try:
+                await self.async_update_device_status(accessory, deadline)
+            finally:
+                prefetch.leave(key)
+                if self._hub_prefetches.get(key) is prefetch:
+                    del self._hub_prefetches[key]
+                self._prefetched_details.pop(key, None)
+
+        for key in keys:
+            self._hub_prefetches[key] = prefetch
+        await asyncio.gather(
+            *[_async_update(accessory) for accessory in accessories],
+            return_exceptions=True,
+        )
+
+    async def _async_prefetch_hub_properties(
+        self, accessories: list[ImouHaDevice]
+    ) -> None:
+        reads = []
+        for accessory in accessories:
+            refs = list(
+                dict.fromkeys(
+                    meta[PARAM_REF]
+                    for _, _, meta in self._collect_property_entities(accessory)
+                    if not self._ref_suppressed(accessory, meta[PARAM_REF])
+                )
+            )
+            if refs:
+                reads.append((accessory, refs))
+        for offset in range(0, len(reads), HUB_PROPERTIES_BATCH_SIZE):
+            batch = reads[offset : offset + HUB_PROPERTIES_BATCH_SIZE]
+            try:
+                entries = await self.delegate.async_get_iot_devices_properties(
+                    [
+                        (
+                            accessory.resolved_device_id,
+                            accessory.channel_id,
+                            accessory.product_id,
+                            refs,
+                        )
+                        for accessory, refs in batch
+                    ]
+                )
+            except Exception as e:
+                # The accessories fall back to their own detail request
+                _LOGGER.warning(f"_async_prefetch_hub_properties fail:{e}")
+                continue
+            by_id = {
+                (
+                    entry.get(PARAM_DEVICE_ID),
+                    None
+                    if entry.get(PARAM_CHANNEL_ID) is None
+                    else str(entry[PARAM_CHANNEL_ID]),
+                ): entry
+                for entry in entries
+            }
+            for accessory, _ in batch:
+                entry = by_id.get((accessory.resolved_device_id, accessory.channel_id))
+                if entry is None:
+                    continue
+                properties = entry.get(PARAM_PROPERTIES) or {}
+                self._prefetched_details[self._device_key(accessory)] = (
+                    {PARAM_PROPERTIES: properties, PARAM_CHANNELS: []}
+                    if accessory.channel_id is None
+                    else {
+                        PARAM_PROPERTIES: {},
+                        PARAM_CHANNELS: [
+                            {
+                                PARAM_CHANNEL_ID: accessory.channel_id,
+                                PARAM_PROPERTIES: properties,
+                            }
+                        ],
+                    }
                 )
 
-    async def async_update_device_status(self, device: ImouHaDevice):
-        """Update device status, with the updater calling every time the coordinator is updated"""
+    async def async_update_device_status(
+        self, device: ImouHaDevice, deadline: float | None = None
+    ):
+        """Update device status, with the updater calling every time the coordinator is updated
+
+        Only one update of a device runs at a time; an update started while another is
+        running is handled according to the manager's UpdateOverlapPolicy. With a
+        time.monotonic() deadline, lower-priority steps are deferred once it is near.
+        """
+        key = self._device_key(device)
+        running = self._updates_in_flight.get(key)
+        queued = self._queued_updates.get(key)
+        if running is None and queued is None:
+            task = asyncio.ensure_future(
+                self._async_run_device_update(device, key, deadline)
+            )
+            self._updates_in_flight[key] = task
+            await asyncio.shield(task)
+            return
+        self._update_overlap_stats["overlapped"] += 1
+        if self._update_overlap_policy is UpdateOverlapPolicy.SKIP:
+            self._update_overlap_stats["skipped"] += 1
+            _LOGGER.debug("update of %s still running, skipping", key)
+            return
+        if self._update_overlap_policy is UpdateOverlapPolicy.COALESCE:
+            self._update_overlap_stats["skipped"] += 1
+            await asyncio.shield(running or queued)
+            return
+        if queued is None:
+            queued = asyncio.ensure_future(
+                self._async_run_queued_update(device, key, running, deadline)
+            )
+            self._queued_updates[key] = queued
+        else:
+            self._update_overlap_stats["skipped"] += 1
+        await asyncio.shield(queued)
+
+    async def _async_run_queued_update(
+        self,
+        device: ImouHaDevice,
+        key: tuple[str, str | None],
+        running: asyncio.Task,
+        deadline: float | None,
+    ) -> None:
+        await asyncio.wait([running])
+        del self._queued_updates[key]
+        self._updates_in_flight[key] = asyncio.current_task()
+        await self._async_run_device_update(device, key, deadline)
+
+    async def _async_run_device_update(
+        self,
+        device: ImouHaDevice,
+        key: tuple[str, str | None],
+        deadline: float | None,
+    ) -> None:
+        current = asyncio.current_task()
+        promoted = self._deferred_steps.pop(key, [])
+        budget = None if deadline is None else _UpdateBudget(deadline, set(promoted))
+        start = _monotonic()
+        try:
+            await self._async_update_device_status(device, budget)
+        finally:
+            device.flush_changes()
+            # Not in flight any more when the device was forgotten meanwhile
+            if self._updates_in_flight.get(key) is current:
+                del self._updates_in_flight[key]
+                self._device_updates[key] = (
+                    _monotonic() - start,
+                    device.sensors[PARAM_STATUS][PARAM_STATE],
+                )
+                if budget is not None and budget.deferred:
+                    self._deferred_steps[key] = budget.deferred
+
+    async def _async_update_device_status(
+        self, device: ImouHaDevice, budget: _UpdateBudget | None = None
+    ):
         # The device status is updated first, and if it's not online, the other entity status isn't updated
-        await self._async_update_status(device)
+        if self._offline_backoff_pending(device):
+            return
+        answered = await self._async_run_update_step(
+            budget,
+            "status",
+            UpdatePriority.HIGH,
+            lambda: self._async_update_status(device),
+        )
         if device.sensors[PARAM_STATUS][PARAM_STATE] == DeviceStatus.OFFLINE.value:
-            _LOGGER.info(f"device {device.device_name} is offline,stop updating")
+            # A failed check leaves the last status; only a reported offline backs off
+            if answered:
+                self._record_device_offline(device)
+            _LOGGER.info(
+                "device offline, stop updating, device_id=%s channel_id=%s",
+                device.device_id,
+                device.channel_id,
+            )
             return
+        self.reset_offline_backoff(device)
 
         if device.product_id is not None:
-            try:
-                detail = await self._async_fetch_device_detail(device)
-                entities = self._collect_property_entities(device)
-                _LOGGER.debug(
-                    "fetched device detail for %s, updating %d property entities",
-                    self._resolve_device_id(device),
-                    len(entities),
-                )
-                await self._async_update_properties_from_detail(device, detail)
-            except Exception as e:
-                _LOGGER.error(f"async_get_iot_device_detail_info failed: {e}")
+            await self._async_run_update_step(
+                budget,
+                "detail",
+                UpdatePriority.HIGH,
+                lambda: self._async_update_device_detail(device),
+            )
 
         await asyncio.gather(
-            self._async_update_services_entities(device),
-            self._async_update_device_switch_status(device),
-            self._async_update_device_select_status(device),
-            self._async_update_device_sensor_status(device),
+            self._async_run_update_step(
+                budget,
+                "services",
+                UpdatePriority.MEDIUM,
+                lambda: self._async_update_services_entities(device),
+            ),
+            self._async_run_update_step(
+                budget,
+                "switches",
+                UpdatePriority.HIGH,
+                lambda: self._async_update_device_switch_status(device),
+            ),
+            self._async_run_update_step(
+                budget,
+                "selects",
+                UpdatePriority.MEDIUM,
+                lambda: self._async_update_device_select_status(device),
+            ),
+            self._async_update_device_sensor_status(device, budget),
             return_exceptions=True,
         )
-        _LOGGER.debug(f"update_device_status finish: {device.__str__()}")
+        _LOGGER.debug("update_device_status finish: %s", device)
+
+    async def _async_update_device_detail(self, device: ImouHaDevice):
+        try:
+            detail = await self._async_fetch_device_detail(device)
+            entities = self._collect_property_entities(device)
+            _LOGGER.debug(
+                "fetched device detail for %s, updating %d property entities",
+                self._resolve_device_id(device),
+                len(entities),
+            )
+            await self._async_update_properties_from_detail(device, detail)
+        except Exception as e:
+            _LOGGER.error(f"async_get_iot_device_detail_info failed: {e}")
+
+    async def _async_run_update_step(
+        self,
+        budget: _UpdateBudget | None,
+        step: str,
+        priority: UpdatePriority,
+        update: Callable[[], Any],
+    ) -> Any:
+        """Run one step of a device update unless the budget requires deferring it;
+        returns what the step returned, None when deferred."""
+        if (
+            budget is not None
+            and priority is not UpdatePriority.HIGH
+            and step not in budget.promoted
+        ):
+            remaining = budget.deadline - _monotonic()
+            cost = self._update_step_costs.get(step, 0.0)
+            if priority is UpdatePriority.LOW:
+                cost *= UPDATE_LOW_PRIORITY_BUDGET_FACTOR
+            if remaining <= 0 or remaining < cost:
+                _LOGGER.debug(
+                    "deferring %s: %.2fs left, estimated %.2fs", step, remaining, cost
+                )
+                budget.deferred.append(step)
+                return
+        start = _monotonic()
+        try:
+            return await update()
+        finally:
+            elapsed = _monotonic() - start
+            previous = self._update_step_costs.get(step)
+            self._update_step_costs[step] = (
+                elapsed
+                if previous is None
+                else previous + UPDATE_STEP_COST_SMOOTHING * (elapsed - previous)
+            )
+
+    def _offline_backoff_waiting(self, device: ImouHaDevice) -> bool:
+        """Whether an offline device is within its backoff, without counting a skip."""
+        state = self._offline_backoff.get(self._device_key(device))
+        return not (
+            state is None
+            or state["interval"] == 0
+            or device.sensors[PARAM_STATUS][PARAM_STATE] != DeviceStatus.OFFLINE.value
+            or _monotonic() >= state["next_check"]
+        )
+
+    def _offline_backoff_pending(self, device: ImouHaDevice) -> bool:
+        """Whether an offline device should skip its online check this cycle."""
+        if not self._offline_backoff_waiting(device):
+            return False
+        self._offline_backoff[self._device_key(device)]["skipped_checks"] += 1
+        return True
+
+    def _record_device_offline(self, device: ImouHaDevice) -> None:
+        state = self._offline_backoff.setdefault(
+            self._device_key(device),
+            {
+                "interval": 0,
+                "next_check": 0.0,
+                "offline_checks": 0,
+                "skipped_checks": 0,
+            },
+        )
+        state["interval"] = (
+            min(state["interval"] * 2, OFFLINE_BACKOFF_MAX_INTERVAL)
+            if state["interval"]
+            else OFFLINE_BACKOFF_INITIAL_INTERVAL
+        )
+        state["next_check"] = _monotonic() + state["interval"]
+        state["offline_checks"] += 1
+
+    def reset_offline_backoff(self, device: ImouHaDevice) -> None:
+        """Check the device again on the next update, e.g. after it showed a sign of life."""
+        state = self._offline_backoff.get(self._device_key(device))
+        if state is not None:
+            state["interval"] = 0
+            state["next_check"] = 0.0
+
+    def get_offline_backoff(self, device: ImouHaDevice) -> dict[str, Any] | None:
+        """Return the offline backoff of a device: current interval, seconds until the next
+        online check, online checks that found it offline and checks skipped by the backoff."""
+        state = self._offline_backoff.get(self._device_key(device))
+        if state is None:
+            return None
+        return {
+            "interval": state["interval"],
+            "next_check_in": max(0.0, state["next_check"] - _monotonic()),
+            "offline_checks": state["offline_checks"],
+            "skipped_checks": state["skipped_checks"],
+        }
 
     async def _async_update_device_switch_status(self, device: ImouHaDevice):
         """UPDATE SWITCH STATUS"""
         for switch_type, value in device.switches.items():
             if PARAM_REF in value:
                 continue
-            else:
-                device.switches[switch_type][PARAM_STATE] = any(
-                    await asyncio.gather(
-                        *[
-                            self._async_get_device_switch_status_by_ability(
-                                device, ability_type
-                            )
-                            for ability_type in (
-                                value[PARAM_FUNCTION_TYPE]
-                                if isinstance(value[PARAM_FUNCTION_TYPE], list)
-                                else [value[PARAM_FUNCTION_TYPE]]
-                            )
-                        ],
-                        return_exceptions=True,
+            function_types = (
+                value[PARAM_FUNCTION_TYPE]
+                if isinstance(value[PARAM_FUNCTION_TYPE], list)
+                else [value[PARAM_FUNCTION_TYPE]]
+            )
+            # Only the function types that answered the last probe are queried,
+            # all of them are probed again periodically or after an error
+            cache_key = (device.device_id, device.channel_id, switch_type)
+            learned = self._switch_function_types.get(cache_key)
+            probing = learned is None or _monotonic() >= learned[1]
+            queried = function_types if probing else learned[0]
+            results = await asyncio.gather(
+                *[
+                    self._async_fetch_device_switch_status_by_ability(
+                        device, ability_type
                     )
+                    for ability_type in queried
+                ],
+                return_exceptions=True,
+            )
+            answered = []
+            for ability_type, result in zip(queried, results, strict=True):
+                if isinstance(result, BaseException):
+                    log = _LOGGER.debug if probing else _LOGGER.warning
+                    log(
+                        "get switch status by ability %s fail, device_id=%s: %s",
+                        ability_type,
+                        device.device_id,
+                        result,
+                    )
+                else:
+                    answered.append(ability_type)
+            if probing and answered:
+                self._switch_function_types[cache_key] = (
+                    answered,
+                    _monotonic() + SWITCH_FUNCTION_TYPE_REPROBE_INTERVAL,
                 )
+            elif len(answered) != len(queried):
+                self._switch_function_types.pop(cache_key, None)
+            device.set_entity_state(
+                "switch", switch_type, any(result is True for result in results)
+            )
 
     async def _async_update_device_select_status(self, device: ImouHaDevice):
         """UPDATE SELECT STATUS"""
@@ -453,37 +1354,49 @@ class ImouHaDeviceManager:
                     device, select_type
                 )
 
-    async def _async_update_device_sensor_status(self, device: ImouHaDevice):
+    async def _async_update_device_sensor_status(
+        self, device: ImouHaDevice, budget: _UpdateBudget | None = None
+    ):
         """UPDATE SENSOR STATUS"""
         for sensor_type, value in device.sensors.items():
             if PARAM_REF in value:
                 continue
             elif sensor_type == PARAM_STORAGE_USED:
-                await self._async_update_device_storage(device)
+                await self._async_run_update_step(
+                    budget,
+                    "storage",
+                    UpdatePriority.LOW,
+                    lambda: self._async_update_device_storage(device),
+                )
             elif sensor_type == PARAM_BATTERY:
-                await self._async_update_device_battery(device)
+                await self._async_run_update_step(
+                    budget,
+                    "battery",
+                    UpdatePriority.LOW,
+                    lambda: self._async_update_device_battery(device),
+                )
 
-    async def _async_update_status(self, device: ImouHaDevice):
+    async def _async_update_status(self, device: ImouHaDevice) -> bool:
+        """Update the status sensor; returns whether the API reported a status."""
         try:
-            device_id = device.device_id
-            if device.parent_device_id is not None:
-                device_id = (
-                    f"{device_id}_{device.parent_device_id}_{device.parent_product_id}"
-                )
+            device_id = self._resolve_device_id(device)
             data = await self.delegate.async_get_device_online_status(device_id)
             if device.channel_id is None and device.product_id is not None:
-                device.sensors[PARAM_STATUS][PARAM_STATE] = self.get_device_status(
-                    data[PARAM_ONLINE]
+                device.set_entity_state(
+                    "sensor", PARAM_STATUS, self.get_device_status(data[PARAM_ONLINE])
                 )
-            else:
-                for channel in data[PARAM_CHANNELS]:
-                    if channel[PARAM_CHANNEL_ID] == device.channel_id:
-                        device.sensors[PARAM_STATUS][PARAM_STATE] = (
-                            self.get_device_status(channel[PARAM_ONLINE])
-                        )
-                        break
+                return True
+            for channel in data[PARAM_CHANNELS]:
+                if channel[PARAM_CHANNEL_ID] == device.channel_id:
+                    device.set_entity_state(
+                        "sensor",
+                        PARAM_STATUS,
+                        self.get_device_status(channel[PARAM_ONLINE]),
+                    )
+                    return True
         except Exception as e:
             _LOGGER.error(f"_async_update_device_status error:  {e}")
+        return False
 
     async def _async_update_device_storage(self, device: ImouHaDevice):
         try:
@@ -492,72 +1405,206 @@ class ImouHaDeviceManager:
                 percentage_used = int(
                     data[PARAM_USED_BYTES] * 100 / data[PARAM_TOTAL_BYTES]
                 )
-                device.sensors[PARAM_STORAGE_USED][PARAM_STATE] = str(percentage_used)
+                device.set_entity_state(
+                    "sensor", PARAM_STORAGE_USED, str(percentage_used)
+                )
             else:
-                device.sensors[PARAM_STORAGE_USED][PARAM_STATE] = "e2"
+                device.set_entity_state("sensor", PARAM_STORAGE_USED, "e2")
         except RequestFailedException as exception:
             _LOGGER.error(f"_async_update_device_storage error:  {exception}")
             if ERROR_CODE_NO_STORAGE_MEDIUM in exception.message:
-                device.sensors[PARAM_STORAGE_USED][PARAM_STATE] = "e1"
+                device.set_entity_state("sensor", PARAM_STORAGE_USED, "e1")
             else:
-                device.sensors[PARAM_STORAGE_USED][PARAM_STATE] = "e2"
+                device.set_entity_state("sensor", PARAM_STORAGE_USED, "e2")
 
     async def async_get_device_stream(
         self, device: ImouHaDevice, live_resolution: str, live_protocol: str
     ):
+        """Return the live stream address of a camera for a resolution and protocol.
+
+        The streams of a camera are resolved once and reused until STREAM_EXPIRY_MARGIN
+        seconds before they expire, as given by an expireTime in the getLiveStreamInfo
+        response or an expire(s) parameter of the stream addresses; when neither is
+        present they are reused for STREAM_CACHE_TTL seconds. Call
+        invalidate_device_stream when playing the address fails.
+        """
+        data = await self._async_get_device_streams(device)
+        return await self.async_get_stream_url(data, live_resolution, live_protocol)
+
+    def invalidate_device_stream(self, device: ImouHaDevice) -> None:
+        """Resolve the camera's stream addresses again on the next request."""
+        self._stream_cache.pop(self._device_key(device), None)
+
+    async def async_prewarm_device_streams(
+        self, devices: list[ImouHaDevice]
+    ) -> list[ImouHaDevice]:
+        """Bind and resolve the live streams of cameras ahead of opening them; returns
+        the cameras whose streams could not be resolved."""
+        results = await asyncio.gather(
+            *[self._async_get_device_streams(device) for device in devices],
+            return_exceptions=True,
+        )
+        failed = []
+        for device, result in zip(devices, results, strict=True):
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    f"prewarm stream of {self._device_key(device)} fail:{result}"
+                )
+                failed.append(device)
+        return failed
+
+    async def _async_get_device_streams(self, device: ImouHaDevice) -> dict:
+        key = self._device_key(device)
+        cached = self._stream_cache.get(key)
+        if cached is not None:
+            if _monotonic() < cached[1]:
+                return cached[0]
+            del self._stream_cache[key]
+        resolve = self._stream_resolves.get(key)
+        if resolve is None:
+            resolve = asyncio.ensure_future(self._async_resolve_device_streams(device))
+            self._stream_resolves[key] = resolve
+            resolve.add_done_callback(lambda _: self._stream_resolves.pop(key, None))
+        data = await asyncio.shield(resolve)
+        if data.get(PARAM_STREAMS):
+            self._stream_cache[key] = (data, self._stream_expiry(data))
+            self.reset_offline_backoff(device)
+        return data
+
+    @staticmethod
+    def _stream_expiry(data: dict) -> float:
+        """Monotonic time until which resolved streams are reused."""
+        expires = []
+        for item in (data, *data[PARAM_STREAMS]):
+            if item.get(PARAM_EXPIRE_TIME) is not None:
+                expires.append(item[PARAM_EXPIRE_TIME])
+            query = {
+                name.lower(): value
+                for name, value in parse_qsl(urlsplit(item.get(PARAM_HLS, "")).query)
+            }
+            expires.extend(
+                query[name] for name in ("expire", "expires") if name in query
+            )
+        timestamps = []
+        for expire in expires:
+            try:
+                timestamp = float(expire)
+            except (TypeError, ValueError):
+                continue
+            # Epoch seconds or milliseconds
+            timestamps.append(timestamp / 1000 if timestamp > 1e11 else timestamp)
+        if not timestamps:
+            return _monotonic() + STREAM_CACHE_TTL
+        return _monotonic() + min(timestamps) - time.time() - STREAM_EXPIRY_MARGIN
+
+    async def _async_resolve_device_streams(self, device: ImouHaDevice) -> dict:
         try:
-            return await self._async_get_device_exist_stream(
-                device, live_resolution, live_protocol
+            return await self.delegate.async_get_stream_url(
+                device.device_id, device.channel_id
             )
         except RequestFailedException as exception:
             if ERROR_CODE_LIVE_NOT_EXIST in exception.message:
                 try:
-                    return await self._async_create_device_stream(
-                        device, live_resolution, live_protocol
+                    return await self.delegate.async_create_stream_url(
+                        device.device_id, device.channel_id
                     )
                 except RequestFailedException as ex:
                     if ERROR_CODE_LIVE_ALREADY_EXIST in ex.message:
-                        return await self._async_get_device_exist_stream(
-                            device, live_resolution, live_protocol
+                        return await self.delegate.async_get_stream_url(
+                            device.device_id, device.channel_id
                         )
                     raise ex
             raise exception
 
-    async def _async_get_device_exist_stream(
-        self, device: ImouHaDevice, resolution: str, protocol: str
+    async def async_get_device_image(
+        self,
+        device: ImouHaDevice,
+        wait_seconds: int,
+        sink: Any = None,
+        max_bytes: int = SNAPSHOT_MAX_BYTES,
     ):
-        data = await self.delegate.async_get_stream_url(
-            device.device_id, device.channel_id
-        )
-        return await self.async_get_stream_url(data, resolution, protocol)
+        """Snap the camera and download the picture once it is ready, within wait_seconds.
+
+        Without a sink the picture is returned as bytes, from the snapshot cache while
+        it is fresh; with one (see ImouOpenApiClient.async_download) a new picture is
+        streamed into it and its size is returned. None is returned when the download
+        fails.
+        """
+        if sink is None:
+            return await self._snapshot_cache.async_get_or_fetch(
+                self._device_key(device),
+                lambda: self._async_snapshot(device, wait_seconds, None, max_bytes),
+            )
+        return await self._async_snapshot(device, wait_seconds, sink, max_bytes)
 
-    async def _async_create_device_stream(
-        self, device: ImouHaDevice, resolution: str, protocol: str
+    async def _async_snapshot(
+        self, device: ImouHaDevice, wait_seconds: int, sink: Any, max_bytes: int
     ):
-        data = await self.delegate.async_create_stream_url(
-            device.device_id, device.channel_id
-        )
-        return await self.async_get_stream_url(data, resolution, protocol)
+        async with self._snapshot_jobs:
+            data = await self.delegate.async_get_device_snap(
+                device.device_id, device.channel_id
+            )
+            self.reset_offline_backoff(device)
+            buffer = bytearray()
+            try:
+                size = await self.delegate.async_download_file(
+                    data[PARAM_URL],
+                    buffer.extend if sink is None else sink,
+                    max_bytes,
+                    wait_seconds,
+                )
+            except Exception as exception:
+                _LOGGER.error("error get_device_image %s", exception)
+                return None
+        return bytes(buffer) if sink is None else size
 
-    async def async_get_device_image(self, device: ImouHaDevice, wait_seconds: int):
-        data = await self.delegate.async_get_device_snap(
-            device.device_id, device.channel_id
-        )
-        if PARAM_URL in data:
-            _LOGGER.debug(f"wait {wait_seconds} seconds to download a picture")
-            await asyncio.sleep(wait_seconds)
-        try:
-            timeout = aiohttp.ClientTimeout(total=120)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                response = await session.get(data[PARAM_URL])
-                if response.status != 200:
-                    raise RequestFailedException(
-                        f"request failed,status code {response.status}"
+    async def async_iter_device_images(
+        self,
+        devices: list[ImouHaDevice],
+        wait_seconds: int,
+        max_triggers: int = SNAPSHOT_MAX_CONCURRENT_TRIGGERS,
+        max_downloads: int = SNAPSHOT_MAX_CONCURRENT_JOBS,
+        max_bytes: int = SNAPSHOT_MAX_BYTES,
+    ) -> AsyncIterator[tuple[ImouHaDevice, bytes | Exception]]:
+        """Snap many cameras at once, yielding (device, picture or error) as each completes.
+
+        All snaps are triggered up front, max_triggers at a time, and each picture is
+        downloaded as soon as it is ready, max_downloads at a time and within the
+        manager's snapshot job limit. Closing the iterator cancels what is left.
+        """
+        triggers = asyncio.Semaphore(max_triggers)
+        downloads = asyncio.Semaphore(max_downloads)
+
+        async def _snapshot(
+            device: ImouHaDevice,
+        ) -> tuple[ImouHaDevice, bytes | Exception]:
+            try:
+                async with triggers:
+                    data = await self.delegate.async_get_device_snap(
+                        device.device_id, device.channel_id
                     )
-                return await response.read()
-        except Exception as exception:
-            _LOGGER.error("error get_device_image %s", exception)
-            return None
+                self.reset_offline_backoff(device)
+                buffer = bytearray()
+                async with downloads, self._snapshot_jobs:
+                    await self.delegate.async_download_file(
+                        data[PARAM_URL], buffer.extend, max_bytes, wait_seconds
+                    )
+            except Exception as exception:
+                _LOGGER.error(
+                    "error snapshot of %s: %s", self._device_key(device), exception
+                )
+                return device, exception
+            image = bytes(buffer)
+            self._snapshot_cache.put(self._device_key(device), image)
+            return device, image
+
+        tasks = [asyncio.ensure_future(_snapshot(device)) for device in devices]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def async_get_devices(self) -> list[ImouHaDevice]:
         """
@@ -573,7 +1620,9 @@ class ImouHaDeviceManager:
                     imou_ha_device.set_channel_name(channel.channel_name)
                     if device.product_id is not None:
                         _LOGGER.debug(
-                            f"channels and product_id is not none, device_id:{device.device_id},product_id:{device.product_id}"
+                            "configuring channel by ref, device_id=%s product_id=%s",
+                            device.device_id,
+                            device.product_id,
                         )
                         await self._async_configure_device_by_ref(
                             channel.channel_ability_refs.split(","),
@@ -583,7 +1632,8 @@ class ImouHaDeviceManager:
                         )
                     else:
                         _LOGGER.debug(
-                            f"channels is not none, device_id:{device.device_id}"
+                            "configuring channel by ability, device_id=%s",
+                            device.device_id,
                         )
                         self.configure_device_by_ability(
                             channel.channel_ability.split(","),
@@ -591,10 +1641,14 @@ class ImouHaDeviceManager:
                             device.device_ability.split(","),
                             imou_ha_device,
                         )
+                    if channel.channel_status == DeviceStatus.ONLINE.value:
+                        self.reset_offline_backoff(imou_ha_device)
                     devices.append(imou_ha_device)
             elif device.product_id is not None:
                 _LOGGER.debug(
-                    f"channels is none, device_id:{device.device_id},product_id:{device.product_id}"
+                    "configuring device by ref, device_id=%s product_id=%s",
+                    device.device_id,
+                    device.product_id,
                 )
                 imou_ha_device = self.build_device(device)
                 await self._async_configure_device_by_ref(
@@ -603,9 +1657,13 @@ class ImouHaDeviceManager:
                     device.device_ability_refs.split(","),
                     imou_ha_device,
                 )
+                if device.device_status == DeviceStatus.ONLINE.value:
+                    self.reset_offline_backoff(imou_ha_device)
                 devices.append(imou_ha_device)
         for device in devices:
-            _LOGGER.debug(f"device is  {device.__str__()}")
+            self._restore_static_metadata(device)
+            _LOGGER.debug("device is %s", device)
+        self._known_devices = {self._device_key(device) for device in devices}
         return devices
 
     @staticmethod
@@ -644,15 +1702,27 @@ class ImouHaDeviceManager:
         if button_type == PARAM_RESTART_DEVICE:
             await self.delegate.async_restart_device(device.device_id)
         elif PARAM_PTZ in button_type:
-            await self.delegate.async_control_device_ptz(
-                device.device_id,
-                device.channel_id,
-                BUTTON_TYPE_PARAM_VALUE[button_type],
-                duration,
+            await self.ptz_session(device).async_move(
+                BUTTON_TYPE_PARAM_VALUE[button_type], duration
             )
         elif device.buttons[button_type].get(PARAM_REF):
             ref_id = device.buttons[button_type].get(PARAM_REF)
             await self._async_press_button_by_ref(device, ref_id)
+        self.reset_offline_backoff(device)
+
+    def ptz_session(self, device: ImouHaDevice) -> PtzSession:
+        """Return the PTZ session of a camera channel, creating it on first use."""
+        session_key = (device.device_id, device.channel_id)
+        session = self._ptz_sessions.get(session_key)
+        if session is None:
+            session = PtzSession(
+                lambda operation, duration: self.delegate.async_control_device_ptz(
+                    device.device_id, device.channel_id, operation, duration
+                ),
+                PTZ_MAX_MOVE_DURATION,
+            )
+            self._ptz_sessions[session_key] = session
+        return session
 
     async def async_set_text_value(
         self, device: ImouHaDevice, text_type: str, text_value: str
@@ -662,39 +1732,54 @@ class ImouHaDeviceManager:
             if ref_id == "28800":
                 await self._async_set_count_down_switch_time(device, text_value)
             else:
-                value_type = device.texts[text_type].get(PARAM_VALUE_TYPE)
-                device_id = device.device_id
-                # 如果是配件，需要拼接设备id
-                if device.parent_product_id is not None:
-                    device_id = (
-                        device_id
-                        + "_"
-                        + device.parent_device_id
-                        + "_"
-                        + device.parent_product_id
-                    )
-                if value_type == "int" and text_value.isdigit():
-                    value = int(text_value)
-                elif value_type == "str" and not isinstance(value_type, str):
-                    value = str(text_value)
-                else:
-                    value = text_value
-                await self.delegate.async_set_iot_device_properties(
-                    device_id, device.channel_id, device.product_id, {ref_id: value}
+                await self._write_coalescer.async_submit(
+                    self._write_key(device, ref_id),
+                    text_value,
+                    lambda value: self._async_set_text_value_by_ref(
+                        device, text_type, value, ref_id
+                    ),
                 )
-                if device.channel_id is not None and device.channel_id == "0":
-                    await self.delegate.async_set_iot_device_properties(
-                        device.device_id, None, device.product_id, {ref_id: value}
-                    )
+            device.flush_changes()
+            self.reset_offline_backoff(device)
+
+    async def _async_set_text_value_by_ref(
+        self, device: ImouHaDevice, text_type: str, text_value: str, ref_id: str
+    ):
+        value_type = device.texts[text_type].get(PARAM_VALUE_TYPE)
+        device_id = self._resolve_device_id(device)
+        if value_type == "int" and text_value.isdigit():
+            value = int(text_value)
+        elif value_type == "str" and not isinstance(value_type, str):
+            value = str(text_value)
+        else:
+            value = text_value
+        await self.delegate.async_set_iot_device_properties(
+            device_id, device.channel_id, device.product_id, {ref_id: value}
+        )
+        if device.channel_id is not None and device.channel_id == "0":
+            await self.delegate.async_set_iot_device_properties(
+                device.device_id, None, device.product_id, {ref_id: value}
+            )
+        if not device.texts[text_type].get(PARAM_EXPRESSION):
+            previous = device.texts[text_type][PARAM_STATE]
+            device.set_entity_state("text", text_type, text_value)
+            self._schedule_write_verification(
+                device, "text", text_type, ref_id, value, previous
+            )
 
     async def async_switch_operation(
         self, device: ImouHaDevice, switch_type: str, enable: bool
     ):
         if device.switches[switch_type].get(PARAM_REF):
             ref_id = device.switches[switch_type].get(PARAM_REF)
-            await self._async_switch_operation_by_ref(
-                device, switch_type, enable, ref_id
+            await self._write_coalescer.async_submit(
+                self._write_key(device, ref_id),
+                enable,
+                lambda value: self._async_switch_operation_by_ref(
+                    device, switch_type, value, ref_id
+                ),
             )
+            device.flush_changes()
         elif switch_type == PARAM_MOTION_DETECT:
             await self.delegate.async_modify_device_alarm_status(
                 device.device_id, device.channel_id, enable
@@ -718,6 +1803,7 @@ class ImouHaDeviceManager:
             # Request all failed, consider this operation a failure
             if all(isinstance(result_item, Exception) for result_item in result):
                 raise result[0]
+        self.reset_offline_backoff(device)
 
     async def async_select_option(
         self,
@@ -731,25 +1817,27 @@ class ImouHaDeviceManager:
             # 兼容下音量15400值为-1的情况
             if ref_id == "15400" and option == "99":
                 option = "-1"
-            await self._async_select_option_by_ref(device, option, ref_id, value_type)
+            await self._write_coalescer.async_submit(
+                self._write_key(device, ref_id),
+                option,
+                lambda value: self._async_select_option_by_ref(
+                    device, value, ref_id, value_type, select_type
+                ),
+            )
+            device.flush_changes()
         elif select_type == PARAM_NIGHT_VISION_MODE:
             await self.delegate.async_set_device_night_vision_mode(
                 device.device_id, device.channel_id, option
             )
+        self.reset_offline_backoff(device)
 
-    async def _async_get_device_switch_status_by_ability(
+    async def _async_fetch_device_switch_status_by_ability(
         self, device: ImouHaDevice, ability_type: str
     ) -> bool:
-        # Updating the interface requires capturing exceptions for two main purposes:
-        # 1. To prevent the updater from failing to load due to exceptions;
-        try:
-            data = await self.delegate.async_get_device_status(
-                device.device_id, device.channel_id, ability_type
-            )
-            return data[PARAM_STATUS] == PARAM_ON
-        except Exception as e:
-            _LOGGER.warning(f"_async_get_device_switch_status_by_ability fail:{e}")
-            return False
+        data = await self.delegate.async_get_device_status(
+            device.device_id, device.channel_id, ability_type
+        )
+        return data[PARAM_STATUS] == PARAM_ON
 
     async def _async_set_device_switch_status_by_ability(
         self, device: ImouHaDevice, ability_type: str, enable: bool
@@ -766,10 +1854,13 @@ class ImouHaDeviceManager:
                 await self._async_update_device_night_vision_mode(device)
             except Exception as e:
                 _LOGGER.warning(f"_async_update_device_select_status_by_type fail:{e}")
-                device.selects[PARAM_NIGHT_VISION_MODE] = {
-                    PARAM_CURRENT_OPTION: "",
-                    PARAM_OPTIONS: [],
-                }
+                cached = self._select_options.get(
+                    (device.device_id, device.channel_id, select_type)
+                )
+                device.set_entity_state("select", PARAM_NIGHT_VISION_MODE, "")
+                device.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS] = (
+                    cached[1] if cached is not None else []
+                )
 
     async def _async_update_device_night_vision_mode(self, device: ImouHaDevice):
         data = await self.delegate.async_get_device_night_vision_mode(
@@ -778,13 +1869,38 @@ class ImouHaDeviceManager:
         if PARAM_MODE not in data or PARAM_MODES not in data:
             raise RequestFailedException("get_device_night_vision fail")
         if data[PARAM_MODE] is not None:
-            device.selects[PARAM_NIGHT_VISION_MODE][PARAM_CURRENT_OPTION] = data[
-                PARAM_MODE
-            ].lower()
+            device.set_entity_state(
+                "select", PARAM_NIGHT_VISION_MODE, data[PARAM_MODE].lower()
+            )
         if data[PARAM_MODES] is not None:
-            device.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS] = [
-                item.lower() for item in data[PARAM_MODES]
-            ]
+            device.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS] = (
+                self._get_select_options(
+                    device, PARAM_NIGHT_VISION_MODE, data[PARAM_MODES]
+                )
+            )
+
+    def _get_select_options(
+        self, device: ImouHaDevice, select_type: str, raw_options: list[str]
+    ) -> list[str]:
+        """Return the cached option list, rebuilding it only when the device reports new options."""
+        cache_key = (device.device_id, device.channel_id, select_type)
+        cached = self._select_options.get(cache_key)
+        if cached is not None and cached[0] == raw_options:
+            return cached[1]
+        options = [item.lower() for item in raw_options]
+        self._select_options[cache_key] = (list(raw_options), options)
+        return options
+
+    def _restore_static_metadata(self, device: ImouHaDevice) -> None:
+        """Fill option lists learned before rediscovery into a freshly configured device."""
+        for select_type, value in device.selects.items():
+            if PARAM_REF in value or value.get(PARAM_OPTIONS):
+                continue
+            cached = self._select_options.get(
+                (device.device_id, device.channel_id, select_type)
+            )
+            if cached is not None:
+                value[PARAM_OPTIONS] = cached[1]
 
     @staticmethod
     def configure_device_by_ability(
@@ -923,7 +2039,7 @@ class ImouHaDeviceManager:
                     stream[PARAM_HLS].startswith(protocol + ":")
                     and (0 if resolution == PARAM_HD else 1) == stream[PARAM_STREAM_ID]
                 ):
-                    _LOGGER.debug(f"get_device_stream {stream[PARAM_HLS]}")
+                    _LOGGER.debug("get_device_stream %s", stream[PARAM_HLS])
                     return stream[PARAM_HLS]
             return data[PARAM_STREAMS][0][PARAM_HLS]
         return ""
@@ -1154,17 +2270,20 @@ class ImouHaDeviceManager:
     async def _async_update_device_switch_status_by_ref(
         self, device: ImouHaDevice, switch_type: str, ref: str
     ):
+        if self._ref_suppressed(device, ref):
+            return
         try:
             device_id = self._resolve_device_id(device)
             data = await self.delegate.async_get_iot_device_properties(
                 device_id, device.channel_id, device.product_id, [ref]
             )
             if ref in data[PARAM_PROPERTIES]:
-                device.switches[switch_type][PARAM_STATE] = (
-                    data[PARAM_PROPERTIES][ref] == 1
+                self._record_ref_found(device, ref)
+                device.set_entity_state(
+                    "switch", switch_type, data[PARAM_PROPERTIES][ref] == 1
                 )
             else:
-                self._debug_missing_property_ref(
+                self._record_missing_ref(
                     device,
                     ref,
                     source="getIotDeviceProperties",
@@ -1177,22 +2296,25 @@ class ImouHaDeviceManager:
     async def _async_update_device_select_status_by_ref(
         self, device: ImouHaDevice, select_type: str, ref: str
     ):
+        if self._ref_suppressed(device, ref):
+            return
         try:
             device_id = self._resolve_device_id(device)
             data = await self.delegate.async_get_iot_device_properties(
                 device_id, device.channel_id, device.product_id, [ref]
             )
             if ref in data[PARAM_PROPERTIES]:
+                self._record_ref_found(device, ref)
                 value = (
                     str(data[PARAM_PROPERTIES][ref])
                     if isinstance(data[PARAM_PROPERTIES][ref], int)
                     else data[PARAM_PROPERTIES][ref]
                 )
-                device.selects[select_type][PARAM_CURRENT_OPTION] = value
                 if ref == "15400" and value == "-1":
-                    device.selects[select_type][PARAM_CURRENT_OPTION] = "99"
+                    value = "99"
+                device.set_entity_state("select", select_type, value)
             else:
-                self._debug_missing_property_ref(
+                self._record_missing_ref(
                     device,
                     ref,
                     source="getIotDeviceProperties",
@@ -1209,23 +2331,14 @@ class ImouHaDeviceManager:
         value: dict[str, any],
     ):
         try:
-            device_id = device.device_id
-            # 如果是配件，需要拼接设备id
-            if device.parent_product_id is not None:
-                device_id = (
-                    device_id
-                    + "_"
-                    + device.parent_device_id
-                    + "_"
-                    + device.parent_product_id
-                )
+            device_id = self._resolve_device_id(device)
             state = await self._get_state_from_properties_or_services(
                 device, device_id, value, kind="sensor", key=sensor_type
             )
             if state is None:
                 return
-            device.sensors[sensor_type][PARAM_STATE] = (
-                str(state) if isinstance(state, int) else state
+            device.set_entity_state(
+                "sensor", sensor_type, str(state) if isinstance(state, int) else state
             )
         except Exception as e:
             _LOGGER.error(f"_async_update_device_sensor_status_by_ref fail:{e}")
@@ -1246,12 +2359,14 @@ class ImouHaDeviceManager:
             data = result[PARAM_CONTENT][PARAM_OUTPUT_DATA]
         else:
             ref = value[PARAM_REF]
+            if self._ref_suppressed(device, ref):
+                return None
             result = await self.delegate.async_get_iot_device_properties(
                 device_id, device.channel_id, device.product_id, [ref]
             )
             properties = result.get(PARAM_PROPERTIES) or {}
             if ref not in properties:
-                self._debug_missing_property_ref(
+                self._record_missing_ref(
                     device,
                     ref,
                     source="getIotDeviceProperties",
@@ -1259,6 +2374,7 @@ class ImouHaDeviceManager:
                     key=key,
                 )
                 return None
+            self._record_ref_found(device, ref)
             data = properties[ref]
         if value.get(PARAM_EXPRESSION) and isinstance(data, dict | list):
             state = self.get_expression_value(value[PARAM_EXPRESSION], data)
@@ -1267,32 +2383,20 @@ class ImouHaDeviceManager:
         return state
 
     async def _async_press_button_by_ref(self, device: ImouHaDevice, ref: str):
-        device_id = device.device_id
-        if device.parent_product_id is not None:
-            device_id = (
-                device_id
-                + "_"
-                + device.parent_device_id
-                + "_"
-                + device.parent_product_id
-            )
+        device_id = self._resolve_device_id(device)
         await self.delegate.async_iot_device_control(
-            device_id, device.product_id, ref, {}
+            device_id, device.product_id, ref, {}, RequestPriority.INTERACTIVE
         )
 
     async def _async_select_option_by_ref(
-        self, device: ImouHaDevice, option: str, ref: str, value_type: str
+        self,
+        device: ImouHaDevice,
+        option: str,
+        ref: str,
+        value_type: str,
+        select_type: str | None = None,
     ):
-        device_id = device.device_id
-        # 如果是配件，需要拼接设备id
-        if device.parent_product_id is not None:
-            device_id = (
-                device_id
-                + "_"
-                + device.parent_device_id
-                + "_"
-                + device.parent_product_id
-            )
+        device_id = self._resolve_device_id(device)
         if value_type == "int" and (
             ref != "15400" or device.product_id not in PRODUCT_MODEL_ILLEGAL_LIST
         ):
@@ -1306,19 +2410,21 @@ class ImouHaDeviceManager:
             await self.delegate.async_set_iot_device_properties(
                 device.device_id, None, device.product_id, {ref: value}
             )
+        if select_type is not None:
+            previous = device.selects[select_type][PARAM_CURRENT_OPTION]
+            device.set_entity_state(
+                "select",
+                select_type,
+                "99" if ref == "15400" and option == "-1" else option,
+            )
+            self._schedule_write_verification(
+                device, "select", select_type, ref, value, previous
+            )
 
     async def _async_switch_operation_by_ref(
         self, device: ImouHaDevice, switch_type: str, enable: bool, ref: str
     ):
-        device_id = device.device_id
-        if device.parent_product_id is not None:
-            device_id = (
-                device_id
-                + "_"
-                + device.parent_device_id
-                + "_"
-                + device.parent_product_id
-            )
+        device_id = self._resolve_device_id(device)
         await self.delegate.async_set_iot_device_properties(
             device_id, device.channel_id, device.product_id, {ref: 1 if enable else 0}
         )
@@ -1326,8 +2432,118 @@ class ImouHaDeviceManager:
             await self.delegate.async_set_iot_device_properties(
                 device.device_id, None, device.product_id, {ref: 1 if enable else 0}
             )
-        await asyncio.sleep(3)
-        await self._async_update_device_switch_status_by_ref(device, switch_type, ref)
+        previous = device.switches[switch_type][PARAM_STATE]
+        device.set_entity_state("switch", switch_type, enable)
+        self._schedule_write_verification(
+            device, "switch", switch_type, ref, 1 if enable else 0, previous
+        )
+
+    def _schedule_write_verification(
+        self,
+        device: ImouHaDevice,
+        kind: str,
+        key: str,
+        ref: str,
+        expected: Any,
+        previous: Any,
+    ) -> None:
+        self._forget_applied_value(device, kind, key)
+        write_key = (*self._device_key(device), ref)
+        superseded = self._write_verifiers.pop(write_key, None)
+        if superseded is not None and not superseded[0].done():
+            # Only the latest write is checked; the device may never have held the
+            # superseded value, so a revert falls back to the value before it
+            superseded[0].cancel()
+            previous = superseded[1]
+        task = asyncio.ensure_future(
+            self._async_verify_write(device, kind, key, ref, expected, previous)
+        )
+        self._write_verifiers[write_key] = (task, previous)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        task.add_done_callback(
+            lambda done: self._write_verification_done(write_key, done)
+        )
+
+    def _write_verification_done(
+        self, write_key: tuple[str, str | None, str], task: asyncio.Task
+    ) -> None:
+        verifier = self._write_verifiers.get(write_key)
+        if verifier is not None and verifier[0] is task:
+            del self._write_verifiers[write_key]
+
+    def _schedule_background(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def async_wait_for_write_verifications(self) -> None:
+        """Wait until the read-backs of all optimistic writes have finished."""
+        while self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
+    @property
+    def write_verification_stats(self) -> dict[str, int]:
+        """Counts of optimistic writes that were confirmed or reverted by the read-back."""
+        return dict(self._write_verification_stats)
+
+    async def _async_read_property(self, device: ImouHaDevice, ref: str) -> Any | None:
+        data = await self.delegate.async_get_iot_device_properties(
+            self._resolve_device_id(device), device.channel_id, device.product_id, [ref]
+        )
+        self.reset_offline_backoff(device)
+        return (data.get(PARAM_PROPERTIES) or {}).get(ref)
+
+    async def _async_verify_write(
+        self,
+        device: ImouHaDevice,
+        kind: str,
+        key: str,
+        ref: str,
+        expected: Any,
+        previous: Any,
+    ) -> None:
+        """Read the written ref back with backoff until it converges or the timeout passes.
+
+        On mismatch the entity takes the value last read from the device, or its value
+        from before the write when the device could not be read.
+        """
+        observed = None
+        delay = WRITE_VERIFY_INITIAL_DELAY
+        waited = 0
+        while True:
+            await _sleep(delay)
+            waited += delay
+            try:
+                observed = await self._async_read_property(device, ref)
+            except Exception as e:
+                _LOGGER.debug("verify write of ref %s fail: %s", ref, e)
+                observed = None
+            if observed is not None and (
+                observed == expected or str(observed) == str(expected)
+            ):
+                self._write_verification_stats["verified"] += 1
+                return
+            if waited + delay * 2 > WRITE_VERIFY_TIMEOUT:
+                break
+            delay *= 2
+        self._write_verification_stats["reverted"] += 1
+        _LOGGER.warning(
+            "write of ref %s did not converge, device_id=%s entity=%s.%s expected=%s observed=%s",
+            ref,
+            device.device_id,
+            kind,
+            key,
+            expected,
+            observed,
+        )
+        if observed is not None:
+            self._apply_property_value(
+                device, kind, key, device.get_entities(kind)[key], observed
+            )
+        else:
+            device.set_entity_state(kind, key, previous)
+        device.flush_changes()
 
     @staticmethod
     def configure_binary_sensor_by_ability(
@@ -1362,17 +2578,22 @@ class ImouHaDeviceManager:
     async def _async_update_device_binary_sensor_status_by_ref(
         self, device: ImouHaDevice, binary_sensor_type: str, ref: str
     ):
+        if self._ref_suppressed(device, ref):
+            return
         try:
             device_id = self._resolve_device_id(device)
             data = await self.delegate.async_get_iot_device_properties(
                 device_id, device.channel_id, device.product_id, [ref]
             )
             if ref in data[PARAM_PROPERTIES]:
-                device.binary_sensors[binary_sensor_type][PARAM_STATE] = (
-                    data[PARAM_PROPERTIES][ref] == 1
+                self._record_ref_found(device, ref)
+                device.set_entity_state(
+                    "binary_sensor",
+                    binary_sensor_type,
+                    data[PARAM_PROPERTIES][ref] == 1,
                 )
             else:
-                self._debug_missing_property_ref(
+                self._record_missing_ref(
                     device,
                     ref,
                     source="getIotDeviceProperties",
@@ -1385,36 +2606,93 @@ class ImouHaDeviceManager:
             )
 
     async def _async_update_device_battery(self, device, retry: bool = False):
+        battery_key = self._device_key(device)
+        # A sleeping camera keeps its last known level instead of being woken up
+        if device.sensors[PARAM_STATUS][
+            PARAM_STATE
+        ] == DeviceStatus.SLEEP.value and self._serve_last_battery(device):
+            return
         try:
             data = await self.delegate.async_get_device_power_info(device.device_id)
             if data.get(PARAM_ELECTRICITYS):
                 electricity = data[PARAM_ELECTRICITYS][0]
                 if PARAM_LITELEC in electricity:
-                    device.sensors[PARAM_BATTERY][PARAM_STATE] = str(
-                        electricity[PARAM_LITELEC]
+                    device.set_entity_state(
+                        "sensor", PARAM_BATTERY, str(electricity[PARAM_LITELEC])
                     )
                 elif PARAM_ALKELEC in electricity:
-                    device.sensors[PARAM_BATTERY][PARAM_STATE] = str(
-                        electricity[PARAM_ALKELEC]
+                    device.set_entity_state(
+                        "sensor", PARAM_BATTERY, str(electricity[PARAM_ALKELEC])
                     )
                 elif PARAM_ELECTRIC in electricity:
-                    device.sensors[PARAM_BATTERY][PARAM_STATE] = str(
-                        electricity[PARAM_ELECTRIC]
+                    device.set_entity_state(
+                        "sensor", PARAM_BATTERY, str(electricity[PARAM_ELECTRIC])
                     )
+                self._last_battery[battery_key] = (
+                    device.sensors[PARAM_BATTERY][PARAM_STATE],
+                    _monotonic(),
+                )
             else:
-                device.sensors[PARAM_BATTERY][PARAM_STATE] = "0"
+                device.set_entity_state("sensor", PARAM_BATTERY, "0")
         except RequestFailedException as exception:
             # 如果在休眠，则唤醒设备后重试一次
             if ERROR_CODE_DEVICE_SLEEPING in exception.message and not retry:
+                if self._serve_last_battery(device):
+                    return
                 try:
-                    await self.delegate.async_wake_up_device(device.device_id)
-                    await self._async_update_device_battery(device, True)
+                    if await self._async_wake_up_device(device):
+                        await self._async_update_device_battery(device, True)
+                    elif not self._serve_last_battery(device, max_age=None):
+                        device.set_entity_state("sensor", PARAM_BATTERY, "0")
                 except RequestFailedException as e:
                     _LOGGER.error(f"_async_update_device_battery error:  {e}")
-                    device.sensors[PARAM_BATTERY][PARAM_STATE] = "0"
+                    if not self._serve_last_battery(device, max_age=None):
+                        device.set_entity_state("sensor", PARAM_BATTERY, "0")
             else:
                 _LOGGER.error(f"_async_update_device_battery error:  {exception}")
-                device.sensors[PARAM_BATTERY][PARAM_STATE] = "0"
+                if not self._serve_last_battery(device, max_age=None):
+                    device.set_entity_state("sensor", PARAM_BATTERY, "0")
+
+    def _serve_last_battery(
+        self, device: ImouHaDevice, max_age: float | None = SLEEP_BATTERY_MAX_AGE
+    ) -> bool:
+        """Set the battery sensor to the last level read, if there is one recent enough."""
+        last = self._last_battery.get(self._device_key(device))
+        if last is None or (max_age is not None and _monotonic() - last[1] > max_age):
+            return False
+        device.set_entity_state("sensor", PARAM_BATTERY, last[0])
+        return True
+
+    async def _async_wake_up_device(self, device: ImouHaDevice) -> bool:
+        """Wake up a sleeping device within its wake-up budget.
+
+        Concurrent callers share a single wakeUpDevice request. Returns False without
+        calling the API when the device was already woken up WAKE_UP_BUDGET times within
+        the last WAKE_UP_BUDGET_WINDOW seconds.
+        """
+        device_id = device.device_id
+        pending = self._wake_ups.get(device_id)
+        if pending is None:
+            now = _monotonic()
+            history = self._wake_up_history.setdefault(device_id, deque())
+            while history and now - history[0] >= WAKE_UP_BUDGET_WINDOW:
+                history.popleft()
+            if len(history) >= WAKE_UP_BUDGET:
+                _LOGGER.debug("wake up budget exhausted, device_id=%s", device_id)
+                return False
+            history.append(now)
+            pending = asyncio.ensure_future(
+                self.delegate.async_wake_up_device(device_id)
+            )
+            self._wake_ups[device_id] = pending
+
+            def _done(future: asyncio.Future) -> None:
+                if self._wake_ups.get(device_id) is future:
+                    del self._wake_ups[device_id]
+
+            pending.add_done_callback(_done)
+        await asyncio.shield(pending)
+        return True
 
     @staticmethod
     def configure_text_by_ref(
@@ -1459,23 +2737,14 @@ class ImouHaDeviceManager:
         value: dict[str, any],
     ):
         try:
-            device_id = device.device_id
-            # 如果是配件，需要拼接设备id
-            if device.parent_product_id is not None:
-                device_id = (
-                    device_id
-                    + "_"
-                    + device.parent_device_id
-                    + "_"
-                    + device.parent_product_id
-                )
+            device_id = self._resolve_device_id(device)
             state = await self._get_state_from_properties_or_services(
                 device, device_id, value, kind="text", key=text_type
             )
             if state is None:
                 return
-            device.texts[text_type][PARAM_STATE] = (
-                str(state) if isinstance(state, int) else state
+            device.set_entity_state(
+                "text", text_type, str(state) if isinstance(state, int) else state
             )
         except Exception as e:
             _LOGGER.error(f"_async_update_device_text_status_by_ref fail:{e}")
@@ -1483,16 +2752,7 @@ class ImouHaDeviceManager:
     async def _async_set_count_down_switch_time(
         self, device: ImouHaDevice, text_value: str
     ):
-        device_id = device.device_id
-        # 如果是配件，需要拼接设备id
-        if device.parent_product_id is not None:
-            device_id = (
-                device_id
-                + "_"
-                + device.parent_device_id
-                + "_"
-                + device.parent_product_id
-            )
+        device_id = self._resolve_device_id(device)
         # 首先查询当前开关状态
         switch_type = "switch"
         await self._async_update_device_switch_status_by_ref(
@@ -1509,13 +2769,18 @@ class ImouHaDeviceManager:
             # 如果是关的，则倒计时打开
             param["28603"] = 1
         await self.delegate.async_iot_device_control(
-            device_id, device.product_id, "28600", param
+            device_id, device.product_id, "28600", param, RequestPriority.INTERACTIVE
         )
-        # 等待1秒，查询倒计时
-        await asyncio.sleep(1)
+        device.set_entity_state("text", "count_down_switch", text_value)
+        # 后台等待1秒后查询倒计时
+        self._schedule_background(self._async_refresh_count_down_switch(device))
+
+    async def _async_refresh_count_down_switch(self, device: ImouHaDevice) -> None:
+        await _sleep(WRITE_VERIFY_INITIAL_DELAY)
         await self._async_update_device_text_status_by_ref(
             device, "count_down_switch", device.texts["count_down_switch"]
         )
+        device.flush_changes()
 
 
 class DeviceStatus(Enum):
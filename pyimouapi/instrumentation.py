@@ -0,0 +1,249 @@
+import asyncio
+import bisect
+import contextlib
+import math
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from .const import ERROR_CODE_SUCCESS, ERROR_CODE_TOKEN_OVERDUE
+from .scheduler import RequestPriority
+
+
+class RequestStarted(NamedTuple):
+    """An API request got a request slot and is about to be sent."""
+
+    endpoint: str
+    request_id: str
+    priority: RequestPriority
+    bytes_out: int
+
+
+class RequestFinished(NamedTuple):
+    """An API request completed, successfully or not."""
+
+    endpoint: str
+    request_id: str
+    priority: RequestPriority
+    # Seconds of the round trip from RequestStarted to the response read; None when
+    # the request never got a slot
+    duration: float | None
+    # Seconds spent waiting for a request slot
+    queue_wait: float
+    # None when no response was received
+    status: int | None
+    # None when the response could not be decoded
+    result_code: str | None
+    bytes_out: int
+    bytes_in: int
+    # What the caller receives; None on success and for an expired token retried
+    error: BaseException | None
+
+
+class RequestRetried(NamedTuple):
+    """An API request is sent again after the given result code."""
+
+    endpoint: str
+    request_id: str
+    reason: str
+
+
+class TokenRefreshed(NamedTuple):
+    """An access token was requested."""
+
+    duration: float
+    error: Exception | None
+
+
+ClientEvent = RequestStarted | RequestFinished | RequestRetried | TokenRefreshed
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a task sleeping ``interval`` seconds.
+
+    The lag is the time the loop spent blocked, e.g. decoding a large response,
+    before it could run the monitor again.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        self._samples = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_last = 0.0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Samples taken and the average, maximum and latest lag in seconds."""
+        return {
+            "samples": self._samples,
+            "lag_avg": self._lag_total / self._samples if self._samples else 0.0,
+            "lag_max": self._lag_max,
+            "lag_last": self._lag_last,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._async_run())
+
+    async def async_stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.async_stop()
+
+    async def _async_run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = max(0.0, loop.time() - start - self._interval)
+            self._samples += 1
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            self._lag_last = lag
+
+
+class LatencyHistogram:
+    """Count durations into buckets with the given upper bounds in seconds."""
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self._bounds = tuple(sorted(buckets))
+        # The last count is of durations above every bound
+        self._counts = [0] * (len(self._bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def buckets(self) -> list[tuple[float, int]]:
+        """Cumulative (upper bound, count) pairs, ending with (inf, count)."""
+        cumulative = 0
+        buckets = []
+        for bound, count in zip((*self._bounds, math.inf), self._counts, strict=True):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return buckets
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q quantile; max for the last one."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, cumulative in self.buckets:
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+        }
+
+
+class ClientMetrics:
+    """Aggregate the events of a client: per-endpoint histograms of the round trip
+    and of the wait for a request slot, failures per endpoint and error code, bytes
+    sent and received, retries and token refreshes.
+
+    A failure is counted under its Imou result code, ``http_<status>`` for another
+    HTTP status, or the exception type when no response was received.
+    """
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self._buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self) -> None:
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.queue_wait: dict[str, LatencyHistogram] = {}
+        self.errors: Counter[tuple[str, str]] = Counter()
+        self.retries: Counter[tuple[str, str]] = Counter()
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.token_refreshes = 0
+        self.token_refresh_failures = 0
+
+    def __call__(self, event: ClientEvent) -> None:
+        if isinstance(event, RequestFinished):
+            if event.duration is not None:
+                self._observe(self.latency, event.endpoint, event.duration)
+            self._observe(self.queue_wait, event.endpoint, event.queue_wait)
+            self.bytes_out += event.bytes_out
+            self.bytes_in += event.bytes_in
+            code = _error_code(event)
+            if code is not None:
+                self.errors[event.endpoint, code] += 1
+        elif isinstance(event, RequestRetried):
+            self.retries[event.endpoint, event.reason] += 1
+        elif isinstance(event, TokenRefreshed):
+            self.token_refreshes += 1
+            if event.error is not None:
+                self.token_refresh_failures += 1
+
+    def _observe(
+        self, histograms: dict[str, LatencyHistogram], endpoint: str, value: float
+    ) -> None:
+        histogram = histograms.get(endpoint)
+        if histogram is None:
+            histogram = histograms[endpoint] = LatencyHistogram(self._buckets)
+        histogram.observe(value)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Round-trip latency and slot wait per endpoint (see
+        LatencyHistogram.as_dict) and the counters."""
+        return {
+            "latency": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in self.latency.items()
+            },
+            "queue_wait": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in self.queue_wait.items()
+            },
+            "errors": {
+                f"{endpoint} {code}": count
+                for (endpoint, code), count in self.errors.items()
+            },
+            "retries": sum(self.retries.values()),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "token_refreshes": self.token_refreshes,
+            "token_refresh_failures": self.token_refresh_failures,
+        }
+
+
+def _error_code(event: RequestFinished) -> str | None:
+    if event.result_code == ERROR_CODE_TOKEN_OVERDUE and event.error is None:
+        # Sent again with a new token, which counts as a retry instead
+        return None
+    if event.result_code is not None and event.result_code != ERROR_CODE_SUCCESS:
+        return event.result_code
+    if event.status is not None and event.status != 200:
+        return f"http_{event.status}"
+    if event.error is not None:
+        return type(event.error.__cause__ or event.error).__name__
+    return None
@@ -0,0 +1,249 @@
+import math
+from collections.abc import Iterable
+
+from aiohttp import web
+
+from .ha_device import DeviceStatus, ImouHaDeviceManager
+from .instrumentation import LatencyHistogram
+from .openapi import ImouOpenApiClient
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(name: str, value: float, labels: dict[str, object] | None = None) -> str:
+    if labels:
+        label_text = ",".join(
+            f'{key}="{_escape(item)}"' for key, item in labels.items()
+        )
+        return f"{name}{{{label_text}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class OpenMetricsExporter:
+    """Expose client and fleet metrics in the OpenMetrics text format.
+
+    Serve them in-process with async_start, or add ``handle`` as a route of an
+    existing aiohttp application. The manager is optional; without it only the
+    client metrics are exported.
+    """
+
+    def __init__(
+        self,
+        client: ImouOpenApiClient,
+        manager: ImouHaDeviceManager | None = None,
+        prefix: str = "imou",
+    ) -> None:
+        self._client = client
+        self._manager = manager
+        self._prefix = prefix
+        self._runner: web.AppRunner | None = None
+        self._port: int | None = None
+
+    @property
+    def port(self) -> int | None:
+        """Port the endpoint listens on, once started."""
+        return self._port
+
+    def render(self) -> str:
+        lines: list[str] = []
+        self._render_client(lines)
+        if self._manager is not None:
+            self._render_manager(lines)
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _family(self, lines: list[str], name: str, kind: str, help_text: str) -> str:
+        name = f"{self._prefix}_{name}"
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {help_text}")
+        return name
+
+    def _counter(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        samples: Iterable[tuple[dict[str, object] | None, float]],
+    ) -> None:
+        name = self._family(lines, name, "counter", help_text)
+        lines.extend(
+            _sample(f"{name}_total", value, labels) for labels, value in samples
+        )
+
+    def _gauge(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        samples: Iterable[tuple[dict[str, object] | None, float]],
+    ) -> None:
+        name = self._family(lines, name, "gauge", help_text)
+        lines.extend(_sample(name, value, labels) for labels, value in samples)
+
+    def _histogram(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        histograms: dict[str, LatencyHistogram],
+    ) -> None:
+        name = self._family(lines, name, "histogram", help_text)
+        for endpoint, histogram in sorted(histograms.items()):
+            for bound, count in histogram.buckets:
+                lines.append(
+                    _sample(
+                        f"{name}_bucket",
+                        count,
+                        {"endpoint": endpoint, "le": _format_value(float(bound))},
+                    )
+                )
+            lines.append(
+                _sample(f"{name}_count", histogram.count, {"endpoint": endpoint})
+            )
+            lines.append(_sample(f"{name}_sum", histogram.sum, {"endpoint": endpoint}))
+
+    def _render_client(self, lines: list[str]) -> None:
+        metrics = self._client.metrics
+        self._histogram(
+            lines,
+            "api_request_duration_seconds",
+            "Round trip of API requests by endpoint, from getting a request slot.",
+            metrics.latency,
+        )
+        self._histogram(
+            lines,
+            "api_request_queue_wait_seconds",
+            "Wait of API requests for a request slot, by endpoint.",
+            metrics.queue_wait,
+        )
+        self._counter(
+            lines,
+            "api_request_errors",
+            "Failed API requests by endpoint and error code.",
+            (
+                ({"endpoint": endpoint, "code": code}, count)
+                for (endpoint, code), count in sorted(metrics.errors.items())
+            ),
+        )
+        self._counter(
+            lines,
+            "api_request_retries",
+            "API requests sent again, by endpoint and the result code that caused it.",
+            (
+                ({"endpoint": endpoint, "reason": reason}, count)
+                for (endpoint, reason), count in sorted(metrics.retries.items())
+            ),
+        )
+        self._counter(
+            lines,
+            "api_token_refreshes",
+            "Access token requests.",
+            [(None, metrics.token_refreshes)],
+        )
+        self._counter(
+            lines,
+            "api_token_refresh_failures",
+            "Access token requests that failed.",
+            [(None, metrics.token_refresh_failures)],
+        )
+        self._counter(
+            lines,
+            "api_sent_bytes",
+            "Bytes of API request bodies.",
+            [(None, metrics.bytes_out)],
+        )
+        self._counter(
+            lines,
+            "api_received_bytes",
+            "Bytes of API response bodies.",
+            [(None, metrics.bytes_in)],
+        )
+        self._gauge(
+            lines,
+            "api_requests_waiting",
+            "API requests queued for a slot, by scheduler lane.",
+            (
+                ({"lane": lane}, stats["waiting"])
+                for lane, stats in self._client.request_stats.items()
+            ),
+        )
+
+    def _render_manager(self, lines: list[str]) -> None:
+        cycle = self._manager.last_update_cycle
+        if cycle is not None:
+            self._gauge(
+                lines,
+                "poll_cycle_duration_seconds",
+                "Duration of the last update cycle of all devices.",
+                [(None, cycle.duration)],
+            )
+            self._gauge(
+                lines,
+                "poll_cycle_deferred_devices",
+                "Devices with update steps deferred by the last update cycle.",
+                [(None, len(cycle.deferred))],
+            )
+        device_updates = self._manager.device_update_stats
+        statuses = {status.value: 0 for status in DeviceStatus}
+        for stats in device_updates.values():
+            statuses[stats["status"]] = statuses.get(stats["status"], 0) + 1
+        self._gauge(
+            lines,
+            "devices",
+            "Devices by the status their last update left.",
+            (({"status": status}, count) for status, count in statuses.items()),
+        )
+        self._gauge(
+            lines,
+            "device_update_duration_seconds",
+            "Duration of the last update of each device.",
+            (
+                (
+                    {"device_id": device_id, "channel_id": channel_id or ""},
+                    stats["duration"],
+                )
+                for (device_id, channel_id), stats in sorted(
+                    device_updates.items(), key=lambda item: str(item[0])
+                )
+            ),
+        )
+
+    async def handle(self, request: web.Request) -> web.Response:
+        response = web.Response(text=self.render())
+        response.headers["Content-Type"] = CONTENT_TYPE
+        return response
+
+    async def async_start(
+        self, host: str = "127.0.0.1", port: int = 9464, path: str = "/metrics"
+    ) -> None:
+        """Serve the metrics at http://host:port/path; port 0 picks a free port."""
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get(path, self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        try:
+            await site.start()
+        except BaseException:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        self._port = runner.addresses[0][1]
+
+    async def async_stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self._port = None
@@ -1,23 +1,31 @@
 import asyncio
 import hashlib
-import json
+import inspect
 import logging
 import secrets
 import time
 import uuid
+from collections.abc import Callable
 from typing import Any
 from urllib.parse import urlparse
 
 import aiohttp
 
+from .codec import JsonCodec, default_codec
 from .const import (
     API_ENDPOINT_ACCESS_TOKEN,
     ERROR_CODE_INVALID_APP,
     ERROR_CODE_INVALID_SIGN,
     ERROR_CODE_SUCCESS,
     ERROR_CODE_TOKEN_OVERDUE,
+    INTERACTIVE_RESERVED_REQUESTS,
+    JSON_OFFLOAD_THRESHOLD,
+    LOG_BODY_MAX_CHARS,
+    LOG_BODY_SAMPLE_EVERY,
+    MAX_CONCURRENT_REQUESTS,
     PARAM_ACCESS_TOKEN,
     PARAM_APP_ID,
+    PARAM_APP_SECRET,
     PARAM_CODE,
     PARAM_CURRENT_DOMAIN,
     PARAM_DATA,
@@ -31,25 +39,93 @@ from .const import (
     PARAM_TIME,
     PARAM_TOKEN,
     PARAM_VER,
+    REQUEST_LATENCY_BUCKETS,
+    SNAPSHOT_CHUNK_SIZE,
+    SNAPSHOT_POLL_INITIAL_DELAY,
+    SNAPSHOT_POLL_MAX_DELAY,
 )
 from .exceptions import (
     ConnectFailedException,
     InvalidAppIdOrSecretException,
     RequestFailedException,
 )
+from .instrumentation import (
+    ClientEvent,
+    ClientMetrics,
+    RequestFinished,
+    RequestRetried,
+    RequestStarted,
+    TokenRefreshed,
+)
+from .scheduler import RequestPriority, RequestScheduler
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+_REDACTED_PARAMS = frozenset(
+    {PARAM_ACCESS_TOKEN, PARAM_APP_SECRET, PARAM_SIGN, PARAM_TOKEN}
+)
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: "**REDACTED**" if key in _REDACTED_PARAMS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+class _LoggedBody:
+    """A body to log, redacted and truncated only if the record is formatted."""
+
+    __slots__ = ("_body",)
+
+    def __init__(self, body: Any) -> None:
+        self._body = body
+
+    def __str__(self) -> str:
+        text = str(_redact(self._body))
+        if len(text) > LOG_BODY_MAX_CHARS:
+            return f"{text[:LOG_BODY_MAX_CHARS]}...({len(text)} chars)"
+        return text
+
+
+async def _async_decode_json(codec: JsonCodec, raw: bytes) -> Any:
+    """Decode a response body, in a worker thread when it would block the loop."""
+    if len(raw) >= JSON_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(codec.loads, raw)
+    return codec.loads(raw)
+
 
 class ImouOpenApiClient:
     """Async client for Imou Open Platform HTTP API."""
 
-    def __init__(self, app_id: str, app_secret: str, api_url: str) -> None:
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        api_url: str,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+        codec: JsonCodec | None = None,
+        log_body_sample_every: int = LOG_BODY_SAMPLE_EVERY,
+    ) -> None:
         self._app_id = app_id
         self._app_secret = app_secret
         self._api_url = api_url
         self._access_token: str | None = None
         self._session: aiohttp.ClientSession | None = None
+        self._scheduler = RequestScheduler(
+            max_concurrent_requests, INTERACTIVE_RESERVED_REQUESTS
+        )
+        # Encodes request bodies and decodes responses; orjson when installed
+        self._codec = codec if codec is not None else default_codec()
+        self._log_body_sample_every = max(1, log_body_sample_every)
+        # endpoint -> requests completed, for sampling the body debug logs
+        self._logged_requests: dict[str, int] = {}
+        self._metrics = ClientMetrics(REQUEST_LATENCY_BUCKETS)
+        self._listeners: list[Callable[[ClientEvent], None]] = []
 
     async def _async_get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
@@ -64,9 +140,19 @@ class ImouOpenApiClient:
             await self._session.close()
             self._session = None
 
-    async def async_get_token(self) -> None:
+    async def async_get_token(
+        self, priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> None:
         """Fetch and store accessToken."""
-        response = await self.async_request_api(API_ENDPOINT_ACCESS_TOKEN, {})
+        start = time.monotonic()
+        try:
+            response = await self.async_request_api(
+                API_ENDPOINT_ACCESS_TOKEN, {}, priority=priority
+            )
+        except Exception as exception:
+            self._emit(TokenRefreshed(time.monotonic() - start, exception))
+            raise
+        self._emit(TokenRefreshed(time.monotonic() - start, None))
         self._access_token = response[PARAM_ACCESS_TOKEN]
         if PARAM_CURRENT_DOMAIN in response:
             raw = response[PARAM_CURRENT_DOMAIN]
@@ -77,12 +163,18 @@ class ImouOpenApiClient:
                 self._api_url = parsed.netloc
 
     async def async_request_api(
-        self, endpoint: str, params: dict[str, Any] | None = None
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        priority: RequestPriority = RequestPriority.BACKGROUND,
     ) -> dict[str, Any]:
-        """POST to an API endpoint; returns the result data object."""
+        """POST to an API endpoint; returns the result data object.
+
+        Interactive requests are sent ahead of queued background requests.
+        """
         payload = dict(params) if params else {}
         if self._access_token is None and endpoint != API_ENDPOINT_ACCESS_TOKEN:
-            await self.async_get_token()
+            await self.async_get_token(priority)
         if endpoint != API_ENDPOINT_ACCESS_TOKEN:
             payload[PARAM_TOKEN] = self._access_token
         timestamp = round(time.time())
@@ -105,34 +197,177 @@ class ImouOpenApiClient:
         }
         url = f"https://{self._api_url}{endpoint}"
         session = await self._async_get_session()
-        try:
-            async with asyncio.timeout(30):
-                response = await session.request(
-                    "POST", url, json=body, headers=headers
-                )
-                response_body = json.loads(await response.text())
-                _LOGGER.debug(
-                    "url: %s request body: %s response: %s", url, body, response_body
-                )
-        except Exception as exception:
-            raise ConnectFailedException(f"connect failed,{exception}") from exception
-        if response.status != 200:
-            raise RequestFailedException(
-                f"request failed,status code {response.status}"
+        data = self._codec.dumps(body)
+        queued_at = time.monotonic()
+        sent_at: float | None = None
+        received_at: float | None = None
+        status: int | None = None
+        raw = b""
+        result_code: str | None = None
+
+        def _finished(error: BaseException | None) -> RequestFinished:
+            now = time.monotonic()
+            return RequestFinished(
+                endpoint,
+                request_id,
+                priority,
+                None if sent_at is None else (received_at or now) - sent_at,
+                (now if sent_at is None else sent_at) - queued_at,
+                status,
+                result_code,
+                len(data),
+                len(raw),
+                error,
             )
-        result_code = response_body[PARAM_RESULT][PARAM_CODE]
-        result_message = response_body[PARAM_RESULT][PARAM_MSG]
-        if result_code != ERROR_CODE_SUCCESS:
-            msg = result_code + ":" + result_message
-            if result_code in (ERROR_CODE_INVALID_SIGN, ERROR_CODE_INVALID_APP):
-                raise InvalidAppIdOrSecretException(msg)
-            if result_code == ERROR_CODE_TOKEN_OVERDUE:
-                await self.async_get_token()
-                return await self.async_request_api(endpoint, params)
-            raise RequestFailedException(msg)
+
+        try:
+            try:
+                # Only the round trip holds a slot, so a token refresh cannot wait on itself
+                async with self._scheduler.async_slot(priority), asyncio.timeout(30):
+                    sent_at = time.monotonic()
+                    self._emit(
+                        RequestStarted(endpoint, request_id, priority, len(data))
+                    )
+                    response = await session.request(
+                        "POST", url, data=data, headers=headers
+                    )
+                    status = response.status
+                    raw = await response.read()
+                    received_at = time.monotonic()
+                response_body = await _async_decode_json(self._codec, raw)
+            except Exception as exception:
+                raise ConnectFailedException(
+                    f"connect failed,{exception}"
+                ) from exception
+            if status != 200:
+                raise RequestFailedException(f"request failed,status code {status}")
+            result_code = response_body[PARAM_RESULT][PARAM_CODE]
+            result_message = response_body[PARAM_RESULT][PARAM_MSG]
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                self._log_exchange(endpoint, result_code, body, response_body)
+            if result_code not in (ERROR_CODE_SUCCESS, ERROR_CODE_TOKEN_OVERDUE):
+                msg = result_code + ":" + result_message
+                if result_code in (ERROR_CODE_INVALID_SIGN, ERROR_CODE_INVALID_APP):
+                    raise InvalidAppIdOrSecretException(msg)
+                raise RequestFailedException(msg)
+        except BaseException as exception:
+            self._emit(_finished(exception))
+            raise
+        self._emit(_finished(None))
+        if result_code == ERROR_CODE_TOKEN_OVERDUE:
+            self._emit(RequestRetried(endpoint, request_id, result_code))
+            await self.async_get_token(priority)
+            return await self.async_request_api(endpoint, params, priority)
         response_data = response_body[PARAM_RESULT].get(PARAM_DATA, {})
         return response_data
 
+    def add_listener(
+        self, listener: Callable[[ClientEvent], None]
+    ) -> Callable[[], None]:
+        """Register a listener called with each client event; returns a remover.
+
+        Listeners run inline on the request path and must not block.
+        """
+        self._listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def _emit(self, event: ClientEvent) -> None:
+        self._metrics(event)
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                _LOGGER.error("client event listener fail: %s", e)
+
+    def _log_exchange(
+        self, endpoint: str, result_code: str, body: Any, response_body: Any
+    ) -> None:
+        count = self._logged_requests.get(endpoint, 0)
+        self._logged_requests[endpoint] = count + 1
+        if result_code == ERROR_CODE_SUCCESS and count % self._log_body_sample_every:
+            return
+        _LOGGER.debug(
+            "api request endpoint=%s code=%s request=%s response=%s",
+            endpoint,
+            result_code,
+            _LoggedBody(body),
+            _LoggedBody(response_body),
+            extra={"imou_endpoint": endpoint, "imou_result_code": result_code},
+        )
+
+    async def async_download(
+        self,
+        url: str,
+        sink: Any,
+        max_bytes: int,
+        ready_timeout: float = 0,
+    ) -> int:
+        """Stream the file at url into sink on the pooled session; returns its size.
+
+        The file may not exist yet right after it was requested (snapshots), so a
+        403 or 404 is retried with a growing delay for up to ready_timeout seconds.
+        sink is an object with a write method or a callable taking each chunk; either
+        may be a coroutine. A file larger than max_bytes fails the download.
+        """
+        session = await self._async_get_session()
+        deadline = time.monotonic() + ready_timeout
+        delay = SNAPSHOT_POLL_INITIAL_DELAY
+        while True:
+            try:
+                async with session.get(
+                    url, timeout=aiohttp.ClientTimeout(total=120)
+                ) as response:
+                    if response.status == 200:
+                        return await self._async_stream_body(response, sink, max_bytes)
+                    status = response.status
+            except aiohttp.ClientError as exception:
+                raise ConnectFailedException(
+                    f"connect failed,{exception}"
+                ) from exception
+            if status not in (403, 404) or time.monotonic() + delay > deadline:
+                raise RequestFailedException(f"request failed,status code {status}")
+            _LOGGER.debug("file not ready (%s), retrying in %ss", status, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SNAPSHOT_POLL_MAX_DELAY)
+
+    @staticmethod
+    async def _async_stream_body(
+        response: aiohttp.ClientResponse, sink: Any, max_bytes: int
+    ) -> int:
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise RequestFailedException(
+                f"file too large,{response.content_length} bytes"
+            )
+        write = sink.write if hasattr(sink, "write") else sink
+        size = 0
+        async for chunk in response.content.iter_chunked(SNAPSHOT_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise RequestFailedException(f"file too large,over {max_bytes} bytes")
+            result = write(chunk)
+            if inspect.isawaitable(result):
+                await result
+        return size
+
     @property
     def access_token(self) -> str | None:
         return self._access_token
+
+    @property
+    def codec(self) -> JsonCodec:
+        return self._codec
+
+    @property
+    def metrics(self) -> ClientMetrics:
+        """Built-in per-endpoint latency, error, byte and token refresh metrics."""
+        return self._metrics
+
+    @property
+    def request_stats(self) -> dict[str, dict[str, Any]]:
+        """Per-lane request counts, queue wait and latency (see RequestScheduler.stats)."""
+        return self._scheduler.stats
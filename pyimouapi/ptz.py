@@ -0,0 +1,69 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+
+class _PtzMove:
+    def __init__(self, operation: int, duration: int, future: asyncio.Future) -> None:
+        self.operation = operation
+        self.duration = duration
+        self.future = future
+
+
+class PtzSession:
+    """Keep at most one controlMovePTZ request in flight for a camera channel.
+
+    Presses arriving while a move is in flight are queued as a single move: presses
+    in the queued direction extend its duration up to ``max_duration``, and a press
+    in another direction cancels the queued move and replaces it.
+    """
+
+    def __init__(
+        self, send: Callable[[int, int], Awaitable[None]], max_duration: int
+    ) -> None:
+        self._send = send
+        self._max_duration = max_duration
+        self._queued: _PtzMove | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a move is currently in flight."""
+        return self._task is not None
+
+    async def async_move(self, operation: int, duration: int) -> bool:
+        """Move in a direction; False means another direction cancelled the press."""
+        queued = self._queued
+        if queued is not None and queued.operation == operation:
+            queued.duration = min(queued.duration + duration, self._max_duration)
+            return await asyncio.shield(queued.future)
+        if queued is not None:
+            queued.future.set_result(False)
+        move = _PtzMove(
+            operation,
+            min(duration, self._max_duration),
+            asyncio.get_running_loop().create_future(),
+        )
+        if self._task is None:
+            self._queued = None
+            self._task = asyncio.ensure_future(self._async_run(move))
+        else:
+            self._queued = move
+        return await asyncio.shield(move.future)
+
+    async def _async_run(self, move: _PtzMove | None) -> None:
+        try:
+            while move is not None:
+                try:
+                    await self._send(move.operation, move.duration)
+                except Exception as err:
+                    move.future.set_exception(err)
+                else:
+                    move.future.set_result(True)
+                move, self._queued = self._queued, None
+        finally:
+            # A cancelled send must not leave the session busy or its presses waiting
+            self._task = None
+            for pending in (move, self._queued):
+                if pending is not None and not pending.future.done():
+                    pending.future.cancel()
+            self._queued = None
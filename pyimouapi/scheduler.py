@@ -0,0 +1,133 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from enum import IntEnum
+from typing import Any
+
+
+class RequestPriority(IntEnum):
+    """Lane of an API request; a lower value is served first."""
+
+    # User commands and writes: switch toggles, PTZ moves, button presses
+    INTERACTIVE = 0
+    # Polling reads
+    BACKGROUND = 1
+
+
+class _LaneStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "wait_avg": self.wait_total / self.requests if self.requests else 0.0,
+            "latency_avg": self.latency_total / self.requests if self.requests else 0.0,
+            "latency_max": self.latency_max,
+        }
+
+
+class RequestScheduler:
+    """Limit concurrent API requests, serving queued requests by priority.
+
+    Up to ``max_concurrent`` requests run at once. ``interactive_reserved`` of those
+    slots are kept for interactive requests, so a command never waits for more than
+    the requests already running, however many background reads are queued.
+    """
+
+    def __init__(self, max_concurrent: int, interactive_reserved: int = 1) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self._max_concurrent = max_concurrent
+        self._background_limit = max(1, max_concurrent - interactive_reserved)
+        self._active = 0
+        self._waiters: dict[RequestPriority, deque[asyncio.Future]] = {
+            priority: deque() for priority in RequestPriority
+        }
+        self._stats = {priority: _LaneStats() for priority in RequestPriority}
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per lane: requests served, how many had to queue, average queue wait,
+        average and maximum latency (queue wait plus request) in seconds, and the
+        requests waiting now."""
+        return {
+            priority.name.lower(): {
+                **stats.as_dict(),
+                "waiting": len(self._waiters[priority]),
+            }
+            for priority, stats in self._stats.items()
+        }
+
+    def _limit(self, priority: RequestPriority) -> int:
+        if priority is RequestPriority.INTERACTIVE:
+            return self._max_concurrent
+        return self._background_limit
+
+    def _can_start(self, priority: RequestPriority) -> bool:
+        if self._active >= self._limit(priority):
+            return False
+        # Requests of the same or a higher priority queued earlier go first
+        return not any(
+            self._waiters[lane] for lane in RequestPriority if lane <= priority
+        )
+
+    async def _async_acquire(self, priority: RequestPriority) -> None:
+        if self._can_start(priority):
+            self._active += 1
+            return
+        self._stats[priority].queued += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller gave up
+                self._release()
+            else:
+                self._waiters[priority].remove(waiter)
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        for priority in RequestPriority:
+            waiters = self._waiters[priority]
+            while waiters and self._active < self._limit(priority):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self._active += 1
+                waiter.set_result(None)
+            if waiters:
+                # Lower lanes wait while a higher one still has requests queued
+                return
+
+    @contextlib.asynccontextmanager
+    async def async_slot(
+        self, priority: RequestPriority = RequestPriority.BACKGROUND
+    ) -> AsyncIterator[None]:
+        """Hold one request slot of the given lane for the duration of the block."""
+        start = time.monotonic()
+        await self._async_acquire(priority)
+        stats = self._stats[priority]
+        stats.wait_total += time.monotonic() - start
+        try:
+            yield
+        finally:
+            self._release()
+            latency = time.monotonic() - start
+            stats.requests += 1
+            stats.latency_total += latency
+            stats.latency_max = max(stats.latency_max, latency)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+# Clock of the picture ages, looked up here so tests can replace it
+_monotonic = time.monotonic
+
+
+class SnapshotCache:
+    """Keep recent camera pictures so repeated requests do not snap the camera again.
+
+    A picture is served for ``max_age`` seconds after it was taken. The least
+    recently used pictures are evicted to stay within ``max_bytes``, and requests for
+    a key whose snapshot is being taken wait for it instead of starting another.
+    """
+
+    def __init__(self, max_age: float, max_bytes: int) -> None:
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        # key -> (picture, time taken), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[bytes, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._joined = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Hits, requests that joined a snapshot in flight, misses, evictions, cached
+        pictures and bytes, and the share of requests served without a new snapshot."""
+        requests = self._hits + self._joined + self._misses
+        return {
+            "hits": self._hits,
+            "joined": self._joined,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": (self._hits + self._joined) / requests if requests else 0.0,
+        }
+
+    def get(self, key: Hashable) -> bytes | None:
+        """Return the picture cached for key if it is still fresh."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if _monotonic() - entry[1] > self._max_age:
+            self.invalidate(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, image: bytes) -> None:
+        self.invalidate(key)
+        if self._max_age <= 0 or len(image) > self._max_bytes:
+            return
+        self._entries[key] = (image, _monotonic())
+        self._bytes += len(image)
+        while self._bytes > self._max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    async def async_get_or_fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Return the fresh picture for key, or take one with fetch and cache it."""
+        image = self.get(key)
+        if image is not None:
+            self._hits += 1
+            return image
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._joined += 1
+            return await asyncio.shield(in_flight)
+        self._misses += 1
+        in_flight = asyncio.ensure_future(fetch())
+        self._in_flight[key] = in_flight
+        in_flight.add_done_callback(lambda future: self._fetched(key, future))
+        return await asyncio.shield(in_flight)
+
+    def _fetched(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result() is not None:
+            self.put(key, future.result())
@@ -0,0 +1,24 @@
+"""Fixtures shared by the tests."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from pyimouapi import ha_device, snapshot
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen clock of the device manager and the snapshot cache; add to clock[0] to
+    advance it. The event loop keeps its own clock."""
+    now = [1000.0]
+    monkeypatch.setattr(ha_device, "_monotonic", lambda: now[0])
+    monkeypatch.setattr(snapshot, "_monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Sleeps of the device manager, returning at once and recorded."""
+    sleep = AsyncMock()
+    monkeypatch.setattr(ha_device, "_sleep", sleep)
+    return sleep
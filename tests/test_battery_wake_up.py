@@ -0,0 +1,118 @@
+"""Tests for the wake-up policy of sleeping battery cameras."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import (
+    PARAM_BATTERY,
+    PARAM_ELECTRICITYS,
+    PARAM_LITELEC,
+    PARAM_STATE,
+    PARAM_STATUS,
+)
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import DeviceStatus, ImouHaDevice, ImouHaDeviceManager
+
+SLEEPING = RequestFailedException("DV1030:device is sleeping")
+
+
+def _camera() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    device.sensors[PARAM_STATUS][PARAM_STATE] = DeviceStatus.ONLINE.value
+    device.sensors[PARAM_BATTERY] = {PARAM_STATE: "0"}
+    return device
+
+
+def _power(level: int) -> dict:
+    return {PARAM_ELECTRICITYS: [{PARAM_LITELEC: level}]}
+
+
+def _delegate() -> MagicMock:
+    delegate = MagicMock()
+    delegate.async_get_device_power_info = AsyncMock(return_value=_power(80))
+    delegate.async_wake_up_device = AsyncMock()
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_sleeping_device_serves_last_known_level(clock):
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    await manager._async_update_device_battery(device)
+
+    device.sensors[PARAM_STATUS][PARAM_STATE] = DeviceStatus.SLEEP.value
+    delegate.async_get_device_power_info.reset_mock()
+    await manager._async_update_device_battery(device)
+
+    delegate.async_get_device_power_info.assert_not_awaited()
+    delegate.async_wake_up_device.assert_not_awaited()
+    assert device.sensors[PARAM_BATTERY][PARAM_STATE] == "80"
+
+
+@pytest.mark.asyncio
+async def test_sleeping_error_with_known_level_does_not_wake(clock):
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    await manager._async_update_device_battery(device)
+
+    delegate.async_get_device_power_info.side_effect = SLEEPING
+    await manager._async_update_device_battery(device)
+
+    delegate.async_wake_up_device.assert_not_awaited()
+    assert device.sensors[PARAM_BATTERY][PARAM_STATE] == "80"
+
+
+@pytest.mark.asyncio
+async def test_wake_up_then_retry_when_level_unknown(clock):
+    device = _camera()
+    delegate = _delegate()
+    delegate.async_get_device_power_info.side_effect = [SLEEPING, _power(55)]
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager._async_update_device_battery(device)
+
+    delegate.async_wake_up_device.assert_awaited_once_with("dev1")
+    assert device.sensors[PARAM_BATTERY][PARAM_STATE] == "55"
+
+
+@pytest.mark.asyncio
+async def test_wake_ups_are_limited_per_window(clock):
+    device = _camera()
+    delegate = _delegate()
+    delegate.async_get_device_power_info.side_effect = SLEEPING
+    manager = ImouHaDeviceManager(delegate)
+
+    for _ in range(ha_device.WAKE_UP_BUDGET + 2):
+        await manager._async_update_device_battery(device)
+    assert delegate.async_wake_up_device.await_count == ha_device.WAKE_UP_BUDGET
+
+    clock[0] += ha_device.WAKE_UP_BUDGET_WINDOW
+    await manager._async_update_device_battery(device)
+    assert delegate.async_wake_up_device.await_count == ha_device.WAKE_UP_BUDGET + 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_wake_ups_share_one_request(clock):
+    device = _camera()
+    delegate = _delegate()
+    release = asyncio.Event()
+
+    async def _wake_up(device_id):
+        await release.wait()
+
+    delegate.async_wake_up_device = AsyncMock(side_effect=_wake_up)
+    manager = ImouHaDeviceManager(delegate)
+
+    waiters = [
+        asyncio.ensure_future(manager._async_wake_up_device(device)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [True, True, True]
+    delegate.async_wake_up_device.assert_awaited_once()
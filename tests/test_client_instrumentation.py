@@ -0,0 +1,157 @@
+"""Tests for the client event hooks and built-in per-endpoint metrics."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import ERROR_CODE_TOKEN_OVERDUE
+from pyimouapi.exceptions import ConnectFailedException, RequestFailedException
+from pyimouapi.instrumentation import (
+    LatencyHistogram,
+    RequestFinished,
+    RequestRetried,
+    RequestStarted,
+    TokenRefreshed,
+)
+from pyimouapi.openapi import ImouOpenApiClient
+
+
+def _response(code: str = "0", data: dict | None = None, status: int = 200):
+    response = MagicMock(status=status)
+    response.read = AsyncMock(
+        return_value=json.dumps(
+            {"result": {"code": code, "msg": "msg", "data": data or {}}}
+        ).encode()
+    )
+    return response
+
+
+def _client(*responses) -> ImouOpenApiClient:
+    client = ImouOpenApiClient("app", "secret", "api.example.com")
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(side_effect=list(responses))
+    client._session = session
+    return client
+
+
+def test_histogram_counts_into_cumulative_buckets():
+    histogram = LatencyHistogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    assert histogram.buckets == [(0.1, 2), (1, 3), (float("inf"), 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(1) == 3
+    assert histogram.as_dict()["avg"] == pytest.approx(0.9125)
+
+
+@pytest.mark.asyncio
+async def test_listener_sees_token_refresh_and_request_events():
+    client = _client(
+        _response(data={"accessToken": "token"}), _response(data={"ok": 1})
+    )
+    events = []
+    client.add_listener(events.append)
+
+    await client.async_request_api("/openapi/deviceOnline", {})
+
+    assert [type(event) for event in events] == [
+        RequestStarted,
+        RequestFinished,
+        TokenRefreshed,
+        RequestStarted,
+        RequestFinished,
+    ]
+    finished = events[-1]
+    assert finished.endpoint == "/openapi/deviceOnline"
+    assert finished.status == 200
+    assert finished.result_code == "0"
+    assert finished.bytes_out == events[-2].bytes_out > 0
+    assert finished.bytes_in > 0
+    assert finished.error is None
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_reported_as_a_retry():
+    client = _client(
+        _response(code=ERROR_CODE_TOKEN_OVERDUE),
+        _response(data={"accessToken": "fresh"}),
+        _response(),
+    )
+    client._access_token = "stale"
+    events = []
+    client.add_listener(events.append)
+
+    await client.async_request_api("/openapi/deviceOnline", {})
+
+    assert [event for event in events if isinstance(event, RequestRetried)] == [
+        RequestRetried(
+            "/openapi/deviceOnline", events[0].request_id, ERROR_CODE_TOKEN_OVERDUE
+        )
+    ]
+    assert client.metrics.stats["retries"] == 1
+    assert client.metrics.stats["token_refreshes"] == 1
+    assert client.metrics.stats["errors"] == {}
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_failures_per_endpoint_and_code():
+    client = _client(
+        _response(code="DV1007"), _response(status=500), OSError("unreachable")
+    )
+    client._access_token = "token"
+
+    for exception in (RequestFailedException,) * 2 + (ConnectFailedException,):
+        with pytest.raises(exception):
+            await client.async_request_api("/openapi/deviceOnline", {})
+
+    stats = client.metrics.stats
+    assert stats["errors"] == {
+        "/openapi/deviceOnline DV1007": 1,
+        "/openapi/deviceOnline http_500": 1,
+        "/openapi/deviceOnline OSError": 1,
+    }
+    assert stats["latency"]["/openapi/deviceOnline"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_failing_and_removed_listeners_do_not_affect_requests():
+    client = _client(_response(), _response())
+    client._access_token = "token"
+    remove = client.add_listener(MagicMock(side_effect=RuntimeError("boom")))
+
+    await client.async_request_api("/openapi/deviceOnline", {})
+    remove()
+    await client.async_request_api("/openapi/deviceOnline", {})
+
+    assert client.metrics.stats["latency"]["/openapi/deviceOnline"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_round_trip_is_timed_from_getting_a_slot():
+    client = ImouOpenApiClient(
+        "app", "secret", "api.example.com", max_concurrent_requests=1
+    )
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(return_value=_response())
+    client._session = session
+    client._access_token = "token"
+    events = []
+    client.add_listener(events.append)
+
+    async with client._scheduler.async_slot():
+        request = asyncio.ensure_future(
+            client.async_request_api("/openapi/deviceOnline", {})
+        )
+        await asyncio.sleep(0.05)
+        assert events == []
+    await request
+
+    started, finished = events
+    assert isinstance(started, RequestStarted)
+    assert finished.queue_wait >= 0.05
+    assert finished.duration < 0.05
+    stats = client.metrics.stats
+    assert stats["queue_wait"]["/openapi/deviceOnline"]["count"] == 1
+    assert stats["latency"]["/openapi/deviceOnline"]["max"] < 0.05
@@ -0,0 +1,102 @@
+"""Tests for tracking entity state changes and notifying listeners."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_CHANNELS,
+    PARAM_CURRENT_OPTION,
+    PARAM_ONLINE,
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_STATE,
+    PARAM_STATUS,
+)
+from pyimouapi.ha_device import (
+    DeviceStatus,
+    EntityChange,
+    ImouHaDevice,
+    ImouHaDeviceManager,
+)
+
+
+def _device() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    device.sensors[PARAM_STATUS][PARAM_STATE] = DeviceStatus.ONLINE.value
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    device.selects["volume"] = {PARAM_REF: "15400", PARAM_CURRENT_OPTION: "0"}
+    return device
+
+
+def test_listener_receives_changes_on_flush():
+    device = _device()
+    received = []
+    device.add_change_listener(lambda dev, changes: received.append(changes))
+
+    device.set_entity_state("switch", "relay", True)
+    device.set_entity_state("select", "volume", "50")
+    device.flush_changes()
+
+    assert received == [
+        [
+            EntityChange("switch", "relay", False, True),
+            EntityChange("select", "volume", "0", "50"),
+        ]
+    ]
+    assert not device.has_changes
+
+
+def test_unchanged_state_is_not_reported():
+    device = _device()
+    listener = MagicMock()
+    device.add_change_listener(listener)
+
+    device.set_entity_state("switch", "relay", False)
+
+    assert not device.has_changes
+    assert device.flush_changes() == []
+    listener.assert_not_called()
+
+
+def test_changes_are_merged_and_reverted_changes_dropped():
+    device = _device()
+
+    device.set_entity_state("switch", "relay", True)
+    device.set_entity_state("switch", "relay", False)
+    device.set_entity_state("select", "volume", "10")
+    device.set_entity_state("select", "volume", "20")
+
+    assert device.flush_changes() == [EntityChange("select", "volume", "0", "20")]
+
+
+def test_removed_listener_is_not_called():
+    device = _device()
+    listener = MagicMock()
+    remove = device.add_change_listener(listener)
+
+    remove()
+    device.set_entity_state("switch", "relay", True)
+    device.flush_changes()
+
+    listener.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_notifies_only_changed_entities():
+    device = _device()
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={PARAM_ONLINE: "1", "channels": []}
+    )
+    delegate.async_get_iot_device_detail_info = AsyncMock(
+        return_value={PARAM_PROPERTIES: {"10001": 1, "15400": 0}, PARAM_CHANNELS: []}
+    )
+    manager = ImouHaDeviceManager(delegate)
+    received = []
+    device.add_change_listener(lambda dev, changes: received.append(changes))
+
+    await manager.async_update_device_status(device)
+    await manager.async_update_device_status(device)
+
+    assert received == [[EntityChange("switch", "relay", False, True)]]
@@ -0,0 +1,76 @@
+"""Tests for dropping the state kept about a removed device."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_ONLINE,
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_STATE,
+    PARAM_STREAMS,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _device(device_id: str) -> ImouHaDevice:
+    device = ImouHaDevice(device_id, "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    return device
+
+
+def _delegate() -> MagicMock:
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={PARAM_ONLINE: "0", "channels": []}
+    )
+    delegate.async_get_iot_device_detail_info = AsyncMock(
+        return_value={PARAM_PROPERTIES: {}}
+    )
+    delegate.async_get_stream_url = AsyncMock(return_value={PARAM_STREAMS: [{}]})
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_forget_device_drops_its_state():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    device, other = _device("dev1"), _device("dev2")
+    await manager.async_update_devices_status([device, other])
+    await manager._async_get_device_streams(device)
+    manager.ptz_session(device)
+    manager._record_missing_ref(device, "10001", source="test")
+
+    manager.forget_device(device)
+
+    assert manager.get_offline_backoff(device) is None
+    assert manager.get_offline_backoff(other) is not None
+    assert list(manager.device_update_stats) == [("dev2", None)]
+    assert not manager._stream_cache
+    assert not manager._ptz_sessions
+    assert not manager._missing_refs
+
+
+@pytest.mark.asyncio
+async def test_update_running_when_forgotten_leaves_no_stats():
+    delegate = _delegate()
+    release = asyncio.Event()
+
+    async def _online_status(device_id):
+        await release.wait()
+        return {PARAM_ONLINE: "1", "channels": []}
+
+    delegate.async_get_device_online_status.side_effect = _online_status
+    manager = ImouHaDeviceManager(delegate)
+    device = _device("dev1")
+    update = asyncio.ensure_future(manager.async_update_device_status(device))
+    await asyncio.sleep(0)
+
+    manager.forget_device(device)
+    with pytest.raises(asyncio.CancelledError):
+        await update
+
+    assert manager.device_update_stats == {}
+    assert not manager._updates_in_flight
@@ -0,0 +1,265 @@
+"""Tests for updating the accessories of a hub together."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import (
+    PARAM_CHANNEL_ID,
+    PARAM_CHANNELS,
+    PARAM_DEVICE_ID,
+    PARAM_ONLINE,
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_STATE,
+    PARAM_STATUS,
+)
+from pyimouapi.ha_device import (
+    DeviceStatus,
+    ImouHaDevice,
+    ImouHaDeviceManager,
+    UpdateOverlapPolicy,
+)
+
+
+def _accessory(device_id: str, hub: str = "hub1") -> ImouHaDevice:
+    device = ImouHaDevice(device_id, "Sensor", "Imou", "Door", "1.0")
+    device.set_product_id("acc")
+    device.set_parent_device_id(hub)
+    device.set_parent_product_id("hubpid")
+    device.switches["alarm"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    return device
+
+
+def _delegate() -> MagicMock:
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={PARAM_ONLINE: "1", "channels": []}
+    )
+    delegate.async_get_iot_device_detail_info = AsyncMock(
+        return_value={PARAM_PROPERTIES: {"10001": 1}, PARAM_CHANNELS: []}
+    )
+    delegate.async_get_iot_devices_properties = AsyncMock(
+        side_effect=lambda devices: [
+            {PARAM_DEVICE_ID: device_id, PARAM_PROPERTIES: {"10001": 1}}
+            for device_id, _, _, _ in devices
+        ]
+    )
+    return delegate
+
+
+def test_resolved_device_id_is_composed_for_accessories():
+    device = _accessory("door1")
+    assert device.resolved_device_id == "door1_hub1_hubpid"
+
+    device.set_parent_device_id("hub2")
+    assert device.resolved_device_id == "door1_hub2_hubpid"
+    assert ImouHaDevice("cam", "Camera", "Imou", "IPC", "1.0").resolved_device_id == (
+        "cam"
+    )
+
+
+@pytest.mark.asyncio
+async def test_hub_accessories_share_one_properties_request():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+    plug = ImouHaDevice("plug1", "Plug", "Imou", "Plug", "1.0")
+    plug.set_product_id("pid1")
+
+    await manager.async_update_devices_status([*accessories, plug])
+
+    delegate.async_get_iot_devices_properties.assert_awaited_once_with(
+        [(f"door{i}_hub1_hubpid", None, "acc", ["10001"]) for i in range(3)]
+    )
+    delegate.async_get_iot_device_detail_info.assert_awaited_once_with("plug1", "pid1")
+    assert all(device.switches["alarm"][PARAM_STATE] for device in accessories)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_falls_back_to_detail_requests():
+    delegate = _delegate()
+    delegate.async_get_iot_devices_properties.side_effect = RuntimeError("boom")
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory("door1"), _accessory("door2")]
+
+    await manager.async_update_devices_status(accessories)
+
+    assert delegate.async_get_iot_device_detail_info.await_count == 2
+    assert all(device.switches["alarm"][PARAM_STATE] for device in accessories)
+
+
+@pytest.mark.asyncio
+async def test_single_accessory_of_a_hub_is_updated_alone():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_update_devices_status(
+        [_accessory("door1", "hub1"), _accessory("door2", "hub2")]
+    )
+
+    delegate.async_get_iot_devices_properties.assert_not_awaited()
+    assert delegate.async_get_iot_device_detail_info.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_offline_accessories_are_not_read_and_back_off():
+    delegate = _delegate()
+    delegate.async_get_device_online_status.return_value = {
+        PARAM_ONLINE: "0",
+        "channels": [],
+    }
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+
+    for _ in range(3):
+        await manager.async_update_devices_status(accessories)
+
+    assert delegate.async_get_device_online_status.await_count == 3
+    delegate.async_get_iot_devices_properties.assert_not_awaited()
+    delegate.async_get_iot_device_detail_info.assert_not_awaited()
+    assert all(
+        manager.get_offline_backoff(device)["skipped_checks"] == 2
+        for device in accessories
+    )
+
+
+@pytest.mark.asyncio
+async def test_only_online_accessories_are_batched():
+    delegate = _delegate()
+    delegate.async_get_device_online_status.side_effect = lambda device_id: {
+        PARAM_ONLINE: "0" if device_id.startswith("door0") else "1",
+        "channels": [],
+    }
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+
+    await manager.async_update_devices_status(accessories)
+
+    delegate.async_get_iot_devices_properties.assert_awaited_once_with(
+        [(f"door{i}_hub1_hubpid", None, "acc", ["10001"]) for i in (1, 2)]
+    )
+    assert delegate.async_get_device_online_status.await_count == 3
+    assert (
+        accessories[0].sensors[PARAM_STATUS][PARAM_STATE] == DeviceStatus.OFFLINE.value
+    )
+
+
+@pytest.mark.asyncio
+async def test_channels_of_one_accessory_get_their_own_properties():
+    delegate = _delegate()
+    delegate.async_get_device_online_status.return_value = {
+        PARAM_ONLINE: "1",
+        "channels": [
+            {PARAM_CHANNEL_ID: "0", PARAM_ONLINE: "1"},
+            {PARAM_CHANNEL_ID: "1", PARAM_ONLINE: "1"},
+        ],
+    }
+    delegate.async_get_iot_devices_properties.side_effect = lambda devices: [
+        {
+            PARAM_DEVICE_ID: device_id,
+            PARAM_CHANNEL_ID: int(channel_id),
+            PARAM_PROPERTIES: {"10001": int(channel_id)},
+        }
+        for device_id, channel_id, _, _ in reversed(devices)
+    ]
+    manager = ImouHaDeviceManager(delegate)
+    channels = [_accessory("nvr1"), _accessory("nvr1")]
+    channels[0].set_channel_id("0")
+    channels[1].set_channel_id("1")
+
+    await manager.async_update_devices_status(channels)
+
+    assert [device.switches["alarm"][PARAM_STATE] for device in channels] == [
+        False,
+        True,
+    ]
+    delegate.async_get_iot_device_detail_info.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_accessory_updating_already_is_not_checked_or_batched():
+    delegate = _delegate()
+    release = asyncio.Event()
+
+    async def _online_status(device_id):
+        if device_id.startswith("door0"):
+            await release.wait()
+        return {PARAM_ONLINE: "1", "channels": []}
+
+    delegate.async_get_device_online_status.side_effect = _online_status
+    manager = ImouHaDeviceManager(
+        delegate, update_overlap_policy=UpdateOverlapPolicy.SKIP
+    )
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+    running = asyncio.ensure_future(manager.async_update_device_status(accessories[0]))
+    await asyncio.sleep(0)
+
+    await manager.async_update_devices_status(accessories)
+
+    assert delegate.async_get_device_online_status.await_count == 3
+    delegate.async_get_iot_devices_properties.assert_awaited_once_with(
+        [(f"door{i}_hub1_hubpid", None, "acc", ["10001"]) for i in (1, 2)]
+    )
+    release.set()
+    await running
+    delegate.async_get_iot_device_detail_info.assert_awaited_once_with(
+        "door0_hub1_hubpid", "acc"
+    )
+
+
+@pytest.mark.asyncio
+async def test_offline_accessory_does_not_wait_for_the_batch():
+    delegate = _delegate()
+    delegate.async_get_device_online_status.side_effect = lambda device_id: {
+        PARAM_ONLINE: "0" if device_id.startswith("door0") else "1",
+        "channels": [],
+    }
+    read = asyncio.Event()
+
+    async def _properties(devices):
+        await read.wait()
+        return []
+
+    delegate.async_get_iot_devices_properties.side_effect = _properties
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+    cycle = asyncio.ensure_future(manager.async_update_devices_status(accessories))
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert manager.device_update_stats[("door0_hub1_hubpid", None)]["status"] == (
+        DeviceStatus.OFFLINE.value
+    )
+    assert ("door1_hub1_hubpid", None) not in manager.device_update_stats
+    read.set()
+    await cycle
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_other_checks(monkeypatch):
+    monkeypatch.setattr(ha_device, "HUB_PROPERTIES_BATCH_SIZE", 2)
+    delegate = _delegate()
+    release = asyncio.Event()
+
+    async def _online_status(device_id):
+        if device_id.startswith("door2"):
+            await release.wait()
+        return {PARAM_ONLINE: "1", "channels": []}
+
+    delegate.async_get_device_online_status.side_effect = _online_status
+    manager = ImouHaDeviceManager(delegate)
+    accessories = [_accessory(f"door{i}") for i in range(3)]
+    cycle = asyncio.ensure_future(manager.async_update_devices_status(accessories))
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+    delegate.async_get_iot_devices_properties.assert_awaited_once_with(
+        [(f"door{i}_hub1_hubpid", None, "acc", ["10001"]) for i in (0, 1)]
+    )
+    assert all(device.switches["alarm"][PARAM_STATE] for device in accessories[:2])
+    release.set()
+    await cycle
+    assert delegate.async_get_iot_devices_properties.await_count == 2
+    delegate.async_get_iot_device_detail_info.assert_not_awaited()
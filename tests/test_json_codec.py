@@ -0,0 +1,75 @@
+"""Tests for the pluggable JSON codec used to encode requests and decode responses."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import codec
+from pyimouapi.codec import JsonCodec, OrjsonCodec, default_codec
+from pyimouapi.openapi import ImouOpenApiClient
+
+
+def test_stdlib_codec_round_trips_compact_bytes():
+    body = {"params": {"deviceId": "dev1", "name": "Caméra"}}
+
+    raw = JsonCodec().dumps(body)
+
+    assert isinstance(raw, bytes)
+    assert b" " not in raw
+    assert JsonCodec().loads(raw) == body
+
+
+def test_default_codec_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", None)
+
+    assert type(default_codec()) is JsonCodec
+    with pytest.raises(ImportError):
+        OrjsonCodec()
+
+
+def test_default_codec_prefers_orjson():
+    pytest.importorskip("orjson")
+
+    assert default_codec().name == "orjson"
+
+
+class _RecordingCodec(JsonCodec):
+    def __init__(self) -> None:
+        self.encoded = []
+        self.decoded = []
+
+    def dumps(self, obj):
+        self.encoded.append(obj)
+        return super().dumps(obj)
+
+    def loads(self, raw):
+        self.decoded.append(raw)
+        return super().loads(raw)
+
+
+def _response(data: dict) -> MagicMock:
+    response = MagicMock(status=200)
+    response.read = AsyncMock(
+        return_value=json.dumps(
+            {"result": {"code": "0", "msg": "ok", "data": data}}
+        ).encode()
+    )
+    return response
+
+
+@pytest.mark.asyncio
+async def test_client_sends_and_reads_bodies_through_its_codec():
+    recorder = _RecordingCodec()
+    client = ImouOpenApiClient("app", "secret", "api.example.com", 1, codec=recorder)
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(
+        side_effect=[_response({"accessToken": "token"}), _response({"ok": 1})]
+    )
+    client._session = session
+
+    assert await client.async_request_api("/openapi/restartDevice", {}) == {"ok": 1}
+
+    assert client.codec is recorder
+    assert len(recorder.encoded) == len(recorder.decoded) == 2
+    sent = session.request.await_args.kwargs["data"]
+    assert json.loads(sent)["params"]["token"] == "token"
@@ -0,0 +1,46 @@
+"""Tests for decoding responses from bytes, offloading large ones."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from pyimouapi import openapi
+from pyimouapi.codec import JsonCodec
+from pyimouapi.instrumentation import LoopLagMonitor
+
+
+@pytest.mark.asyncio
+async def test_small_response_is_decoded_on_the_loop(monkeypatch):
+    to_thread = AsyncMock()
+    monkeypatch.setattr(openapi.asyncio, "to_thread", to_thread)
+
+    assert await openapi._async_decode_json(
+        JsonCodec(), b'{"result": {"code": "0"}}'
+    ) == {"result": {"code": "0"}}
+    to_thread.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_large_response_is_decoded_in_a_worker_thread(monkeypatch):
+    monkeypatch.setattr(openapi, "JSON_OFFLOAD_THRESHOLD", 16)
+    to_thread = AsyncMock(side_effect=lambda func, raw: func(raw))
+    monkeypatch.setattr(openapi.asyncio, "to_thread", to_thread)
+    raw = json.dumps({"deviceList": [{"deviceId": "dev1"}]}).encode()
+
+    assert await openapi._async_decode_json(JsonCodec(), raw) == {
+        "deviceList": [{"deviceId": "dev1"}]
+    }
+    to_thread.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_a_blocked_loop():
+    async with LoopLagMonitor(interval=0.01) as monitor:
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+
+    assert monitor.stats["samples"] >= 2
+    assert monitor.stats["lag_max"] >= 0.05
@@ -44,3 +44,23 @@ def test_lookup_channel_id_integer_zero():
         PARAM_CHANNELS: [{PARAM_CHANNEL_ID: 0, PARAM_PROPERTIES: {}}],
     }
     assert ImouHaDeviceManager._lookup_property(detail, "0", "10001") == 7
+
+
+def test_indexed_lookup_matches_channel_zero_fallback():
+    index = ImouHaDeviceManager._index_properties(DETAIL)
+    assert ImouHaDeviceManager._lookup_indexed_property(index, "0", "10001") == 1
+    assert ImouHaDeviceManager._lookup_indexed_property(index, "0", "20001") == 0
+    assert ImouHaDeviceManager._lookup_indexed_property(index, "1", "30001") == 1
+    assert ImouHaDeviceManager._lookup_indexed_property(index, "1", "10001") is None
+    assert ImouHaDeviceManager._lookup_indexed_property(index, None, "15400") == 50
+
+
+def test_index_keeps_first_channel_with_duplicate_id():
+    detail = {
+        PARAM_CHANNELS: [
+            {PARAM_CHANNEL_ID: 1, PARAM_PROPERTIES: {"30001": 1}},
+            {PARAM_CHANNEL_ID: "1", PARAM_PROPERTIES: {"30001": 2}},
+        ],
+    }
+    index = ImouHaDeviceManager._index_properties(detail)
+    assert ImouHaDeviceManager._lookup_indexed_property(index, "1", "30001") == 1
@@ -0,0 +1,131 @@
+"""Tests for exporting client and fleet metrics in the OpenMetrics format."""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+from pyimouapi.const import PARAM_STATE, PARAM_STATUS
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import DeviceStatus, ImouHaDevice, ImouHaDeviceManager
+from pyimouapi.metrics import CONTENT_TYPE, OpenMetricsExporter
+from pyimouapi.openapi import ImouOpenApiClient
+
+ENDPOINT = "/openapi/deviceOnline"
+
+
+def _response(code: str = "0") -> MagicMock:
+    response = MagicMock(status=200)
+    response.read = AsyncMock(
+        return_value=json.dumps(
+            {"result": {"code": code, "msg": "msg", "data": {"accessToken": "t"}}}
+        ).encode()
+    )
+    return response
+
+
+async def _client() -> ImouOpenApiClient:
+    client = ImouOpenApiClient("app", "secret", "api.example.com")
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(
+        side_effect=[_response(), _response(), _response("DV1007")]
+    )
+    client._session = session
+    await client.async_request_api(ENDPOINT, {})
+    with pytest.raises(RequestFailedException):
+        await client.async_request_api(ENDPOINT, {})
+    return client
+
+
+def _manager(*statuses: str) -> ImouHaDeviceManager:
+    async def _status(device):
+        device.sensors[PARAM_STATUS][PARAM_STATE] = statuses[int(device.device_id)]
+
+    manager = ImouHaDeviceManager(MagicMock())
+    manager._async_update_status = AsyncMock(side_effect=_status)
+    manager._async_update_device_detail = AsyncMock()
+    manager._async_update_device_services = AsyncMock()
+    manager._async_update_device_select_status = AsyncMock()
+    manager._async_update_device_sensor_status = AsyncMock()
+    manager._async_update_device_switch_status = AsyncMock()
+    return manager
+
+
+def _devices(count: int) -> list[ImouHaDevice]:
+    return [
+        ImouHaDevice(str(index), "Camera", "Imou", "IPC", "1.0")
+        for index in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_client_metrics_are_rendered():
+    exporter = OpenMetricsExporter(await _client())
+
+    text = exporter.render()
+
+    assert text.endswith("# EOF\n")
+    assert f'imou_api_request_duration_seconds_count{{endpoint="{ENDPOINT}"}} 2' in text
+    assert (
+        f'imou_api_request_duration_seconds_bucket{{endpoint="{ENDPOINT}",le="+Inf"}} 2'
+        in text
+    )
+    assert (
+        f'imou_api_request_errors_total{{endpoint="{ENDPOINT}",code="DV1007"}} 1'
+        in text
+    )
+    assert "imou_api_token_refreshes_total 1" in text
+    assert (
+        f'imou_api_request_queue_wait_seconds_count{{endpoint="{ENDPOINT}"}} 2' in text
+    )
+    assert 'imou_api_requests_waiting{lane="background"} 0' in text
+    assert "imou_devices" not in text
+
+
+@pytest.mark.asyncio
+async def test_fleet_metrics_are_rendered():
+    manager = _manager(DeviceStatus.ONLINE.value, DeviceStatus.OFFLINE.value)
+    devices = _devices(2)
+    await manager.async_update_devices_status(devices)
+    exporter = OpenMetricsExporter(
+        ImouOpenApiClient("app", "secret", "api.example.com"), manager
+    )
+
+    text = exporter.render()
+
+    assert "imou_poll_cycle_duration_seconds " in text
+    assert 'imou_devices{status="online"} 1' in text
+    assert 'imou_devices{status="offline"} 1' in text
+    assert 'imou_devices{status="sleep"} 0' in text
+    assert 'imou_device_update_duration_seconds{device_id="1",channel_id=""}' in text
+
+
+@pytest.mark.asyncio
+async def test_exporter_serves_metrics_over_http():
+    exporter = OpenMetricsExporter(await _client())
+    await exporter.async_start(port=0)
+    try:
+        url = f"http://127.0.0.1:{exporter.port}/metrics"
+        async with aiohttp.ClientSession() as session, session.get(url) as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "imou_api_token_refreshes_total 1" in await response.text()
+    finally:
+        await exporter.async_stop()
+    assert exporter.port is None
+
+
+@pytest.mark.asyncio
+async def test_only_devices_of_the_last_cycle_are_exported():
+    manager = _manager(DeviceStatus.ONLINE.value, DeviceStatus.OFFLINE.value)
+    devices = _devices(2)
+    await manager.async_update_devices_status(devices)
+    await manager.async_update_devices_status(devices[:1])
+    exporter = OpenMetricsExporter(
+        ImouOpenApiClient("app", "secret", "api.example.com"), manager
+    )
+
+    text = exporter.render()
+
+    assert 'imou_devices{status="offline"} 0' in text
+    assert 'device_id="1"' not in text
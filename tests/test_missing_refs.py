@@ -0,0 +1,101 @@
+"""Tests for suppressing refs that a device never reports."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import (
+    PARAM_CHANNELS,
+    PARAM_CURRENT_OPTION,
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_STATE,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _setup() -> tuple[ImouHaDevice, MagicMock, ImouHaDeviceManager]:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    delegate = MagicMock()
+    delegate.async_get_iot_device_properties = AsyncMock(
+        return_value={PARAM_PROPERTIES: {}}
+    )
+    return device, delegate, ImouHaDeviceManager(delegate)
+
+
+async def _poll(manager, device, times):
+    for _ in range(times):
+        await manager._async_update_device_switch_status_by_ref(
+            device, "relay", "10001"
+        )
+
+
+@pytest.mark.asyncio
+async def test_ref_is_suppressed_after_repeated_misses(clock):
+    device, delegate, manager = _setup()
+
+    await _poll(manager, device, ha_device.MISSING_REF_SUPPRESS_THRESHOLD + 2)
+
+    assert (
+        delegate.async_get_iot_device_properties.await_count
+        == ha_device.MISSING_REF_SUPPRESS_THRESHOLD
+    )
+    (suppressed,) = manager.get_suppressed_refs(device)
+    assert suppressed["ref"] == "10001"
+    assert suppressed["product_id"] == "pid1"
+    assert suppressed["entity"] == "switch.relay"
+    assert suppressed["recheck_in"] == ha_device.MISSING_REF_RECHECK_INTERVAL
+
+
+@pytest.mark.asyncio
+async def test_suppressed_ref_is_rechecked_and_restored(clock):
+    device, delegate, manager = _setup()
+    await _poll(manager, device, ha_device.MISSING_REF_SUPPRESS_THRESHOLD)
+
+    clock[0] += ha_device.MISSING_REF_RECHECK_INTERVAL
+    delegate.async_get_iot_device_properties.return_value = {
+        PARAM_PROPERTIES: {"10001": 1}
+    }
+    await _poll(manager, device, 1)
+
+    assert device.switches["relay"][PARAM_STATE] is True
+    assert manager.get_suppressed_refs() == []
+
+
+@pytest.mark.asyncio
+async def test_missing_ref_in_detail_is_suppressed(clock):
+    device, _, manager = _setup()
+    device.selects["volume"] = {PARAM_REF: "15400", PARAM_CURRENT_OPTION: "0"}
+
+    for volume in range(ha_device.MISSING_REF_SUPPRESS_THRESHOLD):
+        await manager._async_update_properties_from_detail(
+            device, {PARAM_PROPERTIES: {"15400": volume}, PARAM_CHANNELS: []}
+        )
+
+    assert [ref["ref"] for ref in manager.get_suppressed_refs(device)] == ["10001"]
+    other = ImouHaDevice("dev2", "Plug", "Imou", "Plug", "1.0")
+    other.set_product_id("pid1")
+    assert manager.get_suppressed_refs(other) == []
+
+
+@pytest.mark.asyncio
+async def test_missing_ref_in_identical_details_is_suppressed_and_rechecked(clock):
+    device, _, manager = _setup()
+    device.selects["volume"] = {PARAM_REF: "15400", PARAM_CURRENT_OPTION: "0"}
+
+    async def _apply_detail():
+        await manager._async_update_properties_from_detail(
+            device, {PARAM_PROPERTIES: {"15400": 2}, PARAM_CHANNELS: []}
+        )
+
+    for _ in range(ha_device.MISSING_REF_SUPPRESS_THRESHOLD):
+        await _apply_detail()
+    (suppressed,) = manager.get_suppressed_refs(device)
+    assert suppressed["ref"] == "10001"
+
+    clock[0] += ha_device.MISSING_REF_RECHECK_INTERVAL
+    await _apply_detail()
+    (suppressed,) = manager.get_suppressed_refs(device)
+    assert suppressed["recheck_in"] == ha_device.MISSING_REF_RECHECK_INTERVAL
@@ -0,0 +1,192 @@
+"""Tests for backing off online checks of offline devices."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import (
+    PARAM_CHANNEL_ID,
+    PARAM_CHANNELS,
+    PARAM_ONLINE,
+    PARAM_PROPERTIES,
+    PARAM_RESTART_DEVICE,
+    PARAM_STATE,
+    PARAM_STATUS,
+    PARAM_STREAMS,
+    PARAM_URL,
+)
+from pyimouapi.device import ImouChannel, ImouDevice
+from pyimouapi.ha_device import DeviceStatus, ImouHaDevice, ImouHaDeviceManager
+
+
+def _setup(online: str = "0") -> tuple[ImouHaDevice, MagicMock, ImouHaDeviceManager]:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={PARAM_ONLINE: online, "channels": []}
+    )
+    delegate.async_get_iot_device_detail_info = AsyncMock(return_value={})
+    return device, delegate, ImouHaDeviceManager(delegate)
+
+
+@pytest.mark.asyncio
+async def test_offline_checks_back_off_exponentially(clock):
+    device, delegate, manager = _setup()
+
+    await manager.async_update_device_status(device)
+    assert manager.get_offline_backoff(device)["interval"] == 60
+
+    clock[0] += 30
+    await manager.async_update_device_status(device)
+    assert delegate.async_get_device_online_status.await_count == 1
+
+    clock[0] += 30
+    await manager.async_update_device_status(device)
+    assert delegate.async_get_device_online_status.await_count == 2
+
+    backoff = manager.get_offline_backoff(device)
+    assert backoff["interval"] == 120
+    assert backoff["offline_checks"] == 2
+    assert backoff["skipped_checks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_is_capped(clock):
+    device, _, manager = _setup()
+
+    for _ in range(12):
+        await manager.async_update_device_status(device)
+        clock[0] += ha_device.OFFLINE_BACKOFF_MAX_INTERVAL
+
+    assert (
+        manager.get_offline_backoff(device)["interval"]
+        == ha_device.OFFLINE_BACKOFF_MAX_INTERVAL
+    )
+
+
+@pytest.mark.asyncio
+async def test_backoff_resets_when_device_comes_back(clock):
+    device, delegate, manager = _setup()
+    await manager.async_update_device_status(device)
+    clock[0] += 60
+
+    delegate.async_get_device_online_status.return_value = {
+        PARAM_ONLINE: "1",
+        "channels": [],
+    }
+    await manager.async_update_device_status(device)
+    assert device.sensors[PARAM_STATUS][PARAM_STATE] == DeviceStatus.ONLINE.value
+    assert manager.get_offline_backoff(device)["interval"] == 0
+
+    await manager.async_update_device_status(device)
+    assert delegate.async_get_device_online_status.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_reset_offline_backoff_forces_next_check(clock):
+    device, delegate, manager = _setup()
+    await manager.async_update_device_status(device)
+
+    manager.reset_offline_backoff(device)
+    await manager.async_update_device_status(device)
+
+    assert delegate.async_get_device_online_status.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_online_check_does_not_back_off(clock):
+    device, delegate, manager = _setup()
+    delegate.async_get_device_online_status.side_effect = RuntimeError("timeout")
+
+    for _ in range(3):
+        await manager.async_update_device_status(device)
+    assert manager.get_offline_backoff(device) is None
+    assert delegate.async_get_iot_device_detail_info.await_count == 0
+
+    delegate.async_get_device_online_status.side_effect = None
+    delegate.async_get_device_online_status.return_value = {
+        PARAM_ONLINE: "1",
+        "channels": [],
+    }
+    await manager.async_update_device_status(device)
+
+    assert delegate.async_get_device_online_status.await_count == 4
+    assert device.sensors[PARAM_STATUS][PARAM_STATE] == DeviceStatus.ONLINE.value
+
+
+async def _restart(manager: ImouHaDeviceManager, device: ImouHaDevice) -> None:
+    await manager.async_press_button(device, PARAM_RESTART_DEVICE, 0)
+
+
+async def _snapshot(manager: ImouHaDeviceManager, device: ImouHaDevice) -> None:
+    await manager.async_get_device_image(device, 1)
+
+
+async def _stream(manager: ImouHaDeviceManager, device: ImouHaDevice) -> None:
+    await manager._async_get_device_streams(device)
+
+
+async def _read_property(manager: ImouHaDeviceManager, device: ImouHaDevice) -> None:
+    await manager._async_read_property(device, "1000")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sign_of_life",
+    [_restart, _snapshot, _stream, _read_property],
+    ids=["control", "snapshot", "stream", "property"],
+)
+async def test_sign_of_life_resets_backoff(clock, sign_of_life):
+    device, delegate, manager = _setup()
+    delegate.async_restart_device = AsyncMock()
+    delegate.async_get_device_snap = AsyncMock(return_value={PARAM_URL: "u"})
+    delegate.async_download_file = AsyncMock(return_value=0)
+    delegate.async_get_stream_url = AsyncMock(return_value={PARAM_STREAMS: [{}]})
+    delegate.async_get_iot_device_properties = AsyncMock(
+        return_value={PARAM_PROPERTIES: {"1000": 1}}
+    )
+    await manager.async_update_device_status(device)
+
+    await sign_of_life(manager, device)
+    await manager.async_update_device_status(device)
+
+    assert manager.get_offline_backoff(device)["interval"] == 60
+    assert delegate.async_get_device_online_status.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_control_keeps_backoff(clock):
+    device, delegate, manager = _setup()
+    delegate.async_restart_device = AsyncMock(side_effect=RuntimeError("offline"))
+    await manager.async_update_device_status(device)
+
+    with pytest.raises(RuntimeError):
+        await _restart(manager, device)
+    await manager.async_update_device_status(device)
+
+    assert delegate.async_get_device_online_status.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_online_device_in_list_resets_backoff(clock):
+    listed = ImouDevice("dev1", "Camera", "online", "Imou", "IPC")
+    listed.set_device_ability("")
+    listed.set_channels([ImouChannel("0", "Camera", "online", "")])
+    delegate = MagicMock()
+    delegate.async_get_devices = AsyncMock(return_value=[listed])
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={
+            PARAM_ONLINE: "0",
+            PARAM_CHANNELS: [{PARAM_CHANNEL_ID: "0", PARAM_ONLINE: "0"}],
+        }
+    )
+    manager = ImouHaDeviceManager(delegate)
+    (device,) = await manager.async_get_devices()
+    await manager.async_update_device_status(device)
+    assert manager.get_offline_backoff(device)["interval"] == 60
+
+    await manager.async_get_devices()
+    await manager.async_update_device_status(device)
+
+    assert delegate.async_get_device_online_status.await_count == 2
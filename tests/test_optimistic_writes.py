@@ -0,0 +1,128 @@
+"""Tests for optimistic ref writes confirmed by background read-backs."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_CURRENT_OPTION,
+    PARAM_OPTIONS,
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_STATE,
+    PARAM_VALUE_TYPE,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _plug() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    device.selects["device_volume"] = {
+        PARAM_REF: "15400",
+        PARAM_OPTIONS: ["99", "0", "1", "2"],
+        PARAM_CURRENT_OPTION: "0",
+        PARAM_VALUE_TYPE: "int",
+    }
+    return device
+
+
+def _delegate(*reads: dict) -> MagicMock:
+    delegate = MagicMock()
+    delegate.async_set_iot_device_properties = AsyncMock()
+    delegate.async_get_iot_device_properties = AsyncMock(
+        side_effect=[{PARAM_PROPERTIES: read} for read in reads]
+    )
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_switch_write_returns_before_read_back(sleeps):
+    device = _plug()
+    delegate = _delegate()
+    read_back = asyncio.Event()
+
+    async def _read(*args):
+        await read_back.wait()
+        return {PARAM_PROPERTIES: {"10001": 1}}
+
+    delegate.async_get_iot_device_properties = AsyncMock(side_effect=_read)
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_switch_operation(device, "relay", True)
+
+    assert device.switches["relay"][PARAM_STATE] is True
+    assert manager.write_verification_stats == {"verified": 0, "reverted": 0}
+
+    read_back.set()
+    await manager.async_wait_for_write_verifications()
+    delegate.async_get_iot_device_properties.assert_awaited_once()
+    assert manager.write_verification_stats == {"verified": 1, "reverted": 0}
+
+
+@pytest.mark.asyncio
+async def test_read_back_retries_with_backoff_until_converged(sleeps):
+    device = _plug()
+    delegate = _delegate({"10001": 0}, {"10001": 0}, {"10001": 1})
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_switch_operation(device, "relay", True)
+    await manager.async_wait_for_write_verifications()
+
+    assert [call.args[0] for call in sleeps.await_args_list] == [1, 2, 4]
+    assert device.switches["relay"][PARAM_STATE] is True
+
+
+@pytest.mark.asyncio
+async def test_mismatch_reverts_to_device_value(sleeps):
+    device = _plug()
+    delegate = _delegate(*[{"10001": 0}] * 4)
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_switch_operation(device, "relay", True)
+    await manager.async_wait_for_write_verifications()
+
+    assert delegate.async_get_iot_device_properties.await_count == 4
+    assert device.switches["relay"][PARAM_STATE] is False
+    assert manager.write_verification_stats == {"verified": 0, "reverted": 1}
+
+
+@pytest.mark.asyncio
+async def test_select_write_is_optimistic_and_keeps_volume_mapping(sleeps):
+    device = _plug()
+    delegate = _delegate({"15400": -1})
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_select_option(device, "device_volume", "99")
+
+    delegate.async_set_iot_device_properties.assert_awaited_once_with(
+        "dev1", None, "pid1", {"15400": -1}
+    )
+    assert device.selects["device_volume"][PARAM_CURRENT_OPTION] == "99"
+    await manager.async_wait_for_write_verifications()
+    assert device.selects["device_volume"][PARAM_CURRENT_OPTION] == "99"
+    assert manager.write_verification_stats["verified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_later_write_supersedes_pending_read_back(sleeps, caplog):
+    device = _plug()
+    delegate = _delegate()
+    read_back = asyncio.Event()
+
+    async def _read(*args):
+        await read_back.wait()
+        return {PARAM_PROPERTIES: {"10001": 0}}
+
+    delegate.async_get_iot_device_properties = AsyncMock(side_effect=_read)
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager.async_switch_operation(device, "relay", True)
+    await manager.async_switch_operation(device, "relay", False)
+    read_back.set()
+    await manager.async_wait_for_write_verifications()
+
+    assert manager.write_verification_stats == {"verified": 1, "reverted": 0}
+    assert device.switches["relay"][PARAM_STATE] is False
+    assert "did not converge" not in caplog.text
@@ -0,0 +1,109 @@
+"""Tests for PTZ move coalescing per camera channel."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+from pyimouapi.ptz import PtzSession
+
+
+class _Camera:
+    """Records controlMovePTZ calls and holds each one until released."""
+
+    def __init__(self) -> None:
+        self.moves: list[tuple[int, int]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = asyncio.Event()
+
+    async def send(self, operation: int, duration: int) -> None:
+        self.moves.append((operation, duration))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await self.release.wait()
+        self.in_flight -= 1
+
+
+async def _press(session: PtzSession, *presses: tuple[int, int]) -> list:
+    tasks = []
+    for operation, duration in presses:
+        tasks.append(asyncio.ensure_future(session.async_move(operation, duration)))
+        await asyncio.sleep(0)
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_same_direction_presses_merge_into_one_move():
+    camera = _Camera()
+    session = PtzSession(camera.send, 10000)
+
+    tasks = await _press(session, (0, 500), (0, 500), (0, 500), (0, 500))
+    camera.release.set()
+
+    assert await asyncio.gather(*tasks) == [True] * 4
+    assert camera.moves == [(0, 500), (0, 1500)]
+    assert camera.max_in_flight == 1
+    assert not session.busy
+
+
+@pytest.mark.asyncio
+async def test_merged_duration_is_capped():
+    camera = _Camera()
+    session = PtzSession(camera.send, 1200)
+
+    tasks = await _press(session, (0, 500), (0, 500), (0, 500), (0, 500))
+    camera.release.set()
+    await asyncio.gather(*tasks)
+
+    assert camera.moves == [(0, 500), (0, 1200)]
+
+
+@pytest.mark.asyncio
+async def test_direction_change_cancels_queued_move():
+    camera = _Camera()
+    session = PtzSession(camera.send, 10000)
+
+    tasks = await _press(session, (0, 500), (2, 500), (2, 500), (3, 500))
+    camera.release.set()
+
+    assert await asyncio.gather(*tasks) == [True, False, False, True]
+    assert camera.moves == [(0, 500), (3, 500)]
+
+
+@pytest.mark.asyncio
+async def test_press_button_uses_one_session_per_channel():
+    camera = _Camera()
+    camera.release.set()
+    delegate = MagicMock()
+    delegate.async_control_device_ptz = MagicMock(
+        side_effect=lambda device_id, channel_id, operation, duration: camera.send(
+            operation, duration
+        )
+    )
+    manager = ImouHaDeviceManager(delegate)
+    device = ImouHaDevice("dev1", "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+
+    await manager.async_press_button(device, "ptz_left", 500)
+
+    assert manager.ptz_session(device) is manager.ptz_session(device)
+    delegate.async_control_device_ptz.assert_called_once_with("dev1", "0", 2, 500)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_send_releases_the_session():
+    camera = _Camera()
+    session = PtzSession(camera.send, 10000)
+    first, queued = await _press(session, (0, 1000), (1, 1000))
+
+    session._task.cancel()
+    results = await asyncio.wait_for(
+        asyncio.gather(first, queued, return_exceptions=True), 1
+    )
+
+    assert [type(result) for result in results] == [asyncio.CancelledError] * 2
+    assert not session.busy
+    camera.release.set()
+    assert await asyncio.wait_for(session.async_move(2, 500), 1) is True
+    assert camera.moves[-1] == (2, 500)
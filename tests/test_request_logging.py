@@ -0,0 +1,94 @@
+"""Tests for the sampled, redacted debug logs of API requests."""
+
+import json
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import openapi
+from pyimouapi.openapi import ImouOpenApiClient
+
+
+def _response(code: str = "0", data: dict | None = None) -> MagicMock:
+    response = MagicMock(status=200)
+    response.read = AsyncMock(
+        return_value=json.dumps(
+            {"result": {"code": code, "msg": "msg", "data": data or {}}}
+        ).encode()
+    )
+    return response
+
+
+def _client(*responses: MagicMock, sample_every: int = 10) -> ImouOpenApiClient:
+    client = ImouOpenApiClient(
+        "app", "secret", "api.example.com", log_body_sample_every=sample_every
+    )
+    client._access_token = "secret-token"
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(side_effect=list(responses))
+    client._session = session
+    return client
+
+
+def _logged(caplog) -> list[str]:
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.message.startswith("api request")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_token_and_signature_are_redacted(caplog):
+    caplog.set_level(logging.DEBUG, logger="pyimouapi")
+    client = _client(_response(data={"accessToken": "fresh-token"}))
+
+    await client.async_request_api("/openapi/deviceOnline", {"deviceId": "dev1"})
+
+    (message,) = _logged(caplog)
+    assert "dev1" in message
+    assert "secret-token" not in message
+    assert "fresh-token" not in message
+    assert "'sign': '**REDACTED**'" in message
+    assert caplog.records[-1].imou_endpoint == "/openapi/deviceOnline"
+
+
+@pytest.mark.asyncio
+async def test_successes_are_sampled_and_failures_always_logged(caplog):
+    caplog.set_level(logging.DEBUG, logger="pyimouapi")
+    client = _client(
+        *[_response() for _ in range(4)], _response(code="DV1007"), sample_every=3
+    )
+
+    for _ in range(4):
+        await client.async_request_api("/openapi/deviceOnline", {})
+    with pytest.raises(openapi.RequestFailedException):
+        await client.async_request_api("/openapi/deviceOnline", {})
+
+    codes = [message.split("code=")[1].split()[0] for message in _logged(caplog)]
+    assert codes == ["0", "0", "DV1007"]
+
+
+@pytest.mark.asyncio
+async def test_long_bodies_are_truncated(caplog, monkeypatch):
+    monkeypatch.setattr(openapi, "LOG_BODY_MAX_CHARS", 50)
+    caplog.set_level(logging.DEBUG, logger="pyimouapi")
+    client = _client(_response(data={"deviceList": ["dev"] * 100}))
+
+    await client.async_request_api("/openapi/listDeviceDetailsByPage", {})
+
+    (message,) = _logged(caplog)
+    assert "chars)" in message
+    assert len(message) < 400
+
+
+@pytest.mark.asyncio
+async def test_bodies_are_not_formatted_without_debug_logging(caplog, monkeypatch):
+    caplog.set_level(logging.INFO, logger="pyimouapi")
+    redact = MagicMock()
+    monkeypatch.setattr(openapi, "_redact", redact)
+    client = _client(_response())
+
+    await client.async_request_api("/openapi/deviceOnline", {})
+
+    redact.assert_not_called()
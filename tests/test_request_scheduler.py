@@ -0,0 +1,123 @@
+"""Tests for serving interactive API requests ahead of background polling."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.openapi import ImouOpenApiClient
+from pyimouapi.scheduler import RequestPriority, RequestScheduler
+
+
+async def _hold(scheduler, priority, release, order, name):
+    async with scheduler.async_slot(priority):
+        order.append(name)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_reserved_slot_lets_interactive_skip_background_queue():
+    scheduler = RequestScheduler(2, interactive_reserved=1)
+    release = asyncio.Event()
+    order = []
+
+    tasks = [
+        asyncio.ensure_future(
+            _hold(scheduler, RequestPriority.BACKGROUND, release, order, f"bg{i}")
+        )
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    tasks.append(
+        asyncio.ensure_future(
+            _hold(scheduler, RequestPriority.INTERACTIVE, release, order, "cmd")
+        )
+    )
+    await asyncio.sleep(0)
+
+    assert order == ["bg0", "cmd"]
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.stats["background"]["queued"] == 2
+    assert scheduler.stats["interactive"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_interactive_request_is_served_first():
+    scheduler = RequestScheduler(1)
+    release = asyncio.Event()
+    order = []
+
+    first = asyncio.ensure_future(
+        _hold(scheduler, RequestPriority.BACKGROUND, release, order, "bg0")
+    )
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.ensure_future(
+            _hold(scheduler, RequestPriority.BACKGROUND, release, order, "bg1")
+        ),
+        asyncio.ensure_future(
+            _hold(scheduler, RequestPriority.INTERACTIVE, release, order, "cmd")
+        ),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert order == ["bg0", "cmd", "bg1"]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    scheduler = RequestScheduler(1)
+    release = asyncio.Event()
+    order = []
+
+    first = asyncio.ensure_future(
+        _hold(scheduler, RequestPriority.BACKGROUND, release, order, "bg0")
+    )
+    await asyncio.sleep(0)
+    cancelled = asyncio.ensure_future(
+        _hold(scheduler, RequestPriority.INTERACTIVE, release, order, "cmd")
+    )
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    await first
+    await _hold(scheduler, RequestPriority.BACKGROUND, release, order, "bg1")
+
+    assert order == ["bg0", "bg1"]
+    assert scheduler.active == 0
+
+
+def _response(data: dict) -> MagicMock:
+    response = MagicMock(status=200)
+    response.read = AsyncMock(
+        return_value=json.dumps(
+            {"result": {"code": "0", "msg": "ok", "data": data}}
+        ).encode()
+    )
+    return response
+
+
+@pytest.mark.asyncio
+async def test_client_token_refresh_does_not_wait_on_its_own_slot():
+    client = ImouOpenApiClient("app", "secret", "api.example.com", 1)
+    session = MagicMock(closed=False)
+    session.request = AsyncMock(
+        side_effect=[_response({"accessToken": "token"}), _response({"ok": 1})]
+    )
+    client._session = session
+
+    result = await asyncio.wait_for(
+        client.async_request_api(
+            "/openapi/restartDevice", {}, RequestPriority.INTERACTIVE
+        ),
+        1,
+    )
+
+    assert result == {"ok": 1}
+    assert client.request_stats["interactive"]["requests"] == 2
+    assert client.request_stats["background"]["requests"] == 0
@@ -0,0 +1,79 @@
+"""Tests for caching static select option lists across polls and rediscovery."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_CURRENT_OPTION,
+    PARAM_MODE,
+    PARAM_MODES,
+    PARAM_NIGHT_VISION_MODE,
+    PARAM_OPTIONS,
+)
+from pyimouapi.device import ImouChannel, ImouDevice
+from pyimouapi.ha_device import ImouHaDeviceManager
+
+
+def _delegate(mode: str = "Infrared") -> MagicMock:
+    device = ImouDevice("dev1", "Camera", "online", "Imou", "IPC")
+    device.set_channel_number(1)
+    device.set_device_ability("")
+    device.set_channels([ImouChannel("0", "Camera", "online", "NVM")])
+
+    delegate = MagicMock()
+    delegate.async_get_devices = AsyncMock(return_value=[device])
+    delegate.async_get_device_night_vision_mode = AsyncMock(
+        return_value={PARAM_MODE: mode, PARAM_MODES: ["Intelligent", "Infrared"]}
+    )
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_options_list_is_reused_when_modes_are_unchanged():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    (device,) = await manager.async_get_devices()
+
+    await manager._async_update_device_night_vision_mode(device)
+    options = device.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS]
+    assert options == ["intelligent", "infrared"]
+
+    await manager._async_update_device_night_vision_mode(device)
+    select = device.selects[PARAM_NIGHT_VISION_MODE]
+    assert select[PARAM_OPTIONS] is options
+    assert select[PARAM_CURRENT_OPTION] == "infrared"
+
+
+@pytest.mark.asyncio
+async def test_options_survive_rediscovery():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    (device,) = await manager.async_get_devices()
+    await manager._async_update_device_night_vision_mode(device)
+
+    (rediscovered,) = await manager.async_get_devices()
+
+    assert rediscovered is not device
+    assert rediscovered.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS] == [
+        "intelligent",
+        "infrared",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_poll_keeps_cached_options():
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    (device,) = await manager.async_get_devices()
+    await manager._async_update_device_night_vision_mode(device)
+
+    delegate.async_get_device_night_vision_mode.return_value = {}
+    await manager._async_update_device_select_status_by_type(
+        device, PARAM_NIGHT_VISION_MODE
+    )
+
+    assert device.selects[PARAM_NIGHT_VISION_MODE][PARAM_OPTIONS] == [
+        "intelligent",
+        "infrared",
+    ]
+    assert device.selects[PARAM_NIGHT_VISION_MODE][PARAM_CURRENT_OPTION] == ""
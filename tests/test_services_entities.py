@@ -0,0 +1,77 @@
+"""Tests for services-type entity updates via iotDeviceControl."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_CONTENT,
+    PARAM_EXPRESSION,
+    PARAM_OUTPUT_DATA,
+    PARAM_REF,
+    PARAM_REF_TYPE,
+    PARAM_SERVICES,
+    PARAM_STATE,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _plug() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    for key, expression in (
+        ("power", "data['29023']"),
+        ("voltage", "round(data['29021']/1000,2)"),
+        ("current", "round(data['29022']/1000,2)"),
+        ("switch_cnt", "data['29024']"),
+    ):
+        device.sensors[key] = {
+            PARAM_REF: "29000",
+            PARAM_STATE: 0,
+            PARAM_REF_TYPE: PARAM_SERVICES,
+            PARAM_EXPRESSION: expression,
+        }
+    return device
+
+
+@pytest.mark.asyncio
+async def test_services_sharing_a_ref_are_invoked_once():
+    device = _plug()
+    delegate = MagicMock()
+    delegate.async_iot_device_control = AsyncMock(
+        return_value={
+            PARAM_CONTENT: {
+                PARAM_OUTPUT_DATA: {
+                    "29021": 230500,
+                    "29022": 1250,
+                    "29023": 288,
+                    "29024": 7,
+                }
+            }
+        }
+    )
+
+    manager = ImouHaDeviceManager(delegate)
+    await manager._async_update_services_entities(device)
+
+    delegate.async_iot_device_control.assert_awaited_once_with(
+        "dev1", "pid1", "29000", {}
+    )
+    assert device.sensors["power"][PARAM_STATE] == "288"
+    assert device.sensors["voltage"][PARAM_STATE] == 230.5
+    assert device.sensors["current"][PARAM_STATE] == 1.25
+    assert device.sensors["switch_cnt"][PARAM_STATE] == "7"
+
+
+@pytest.mark.asyncio
+async def test_services_bad_expression_does_not_block_siblings():
+    device = _plug()
+    delegate = MagicMock()
+    delegate.async_iot_device_control = AsyncMock(
+        return_value={PARAM_CONTENT: {PARAM_OUTPUT_DATA: {"29023": 12}}}
+    )
+
+    manager = ImouHaDeviceManager(delegate)
+    await manager._async_update_services_entities(device)
+
+    assert device.sensors["power"][PARAM_STATE] == "12"
+    assert device.sensors["voltage"][PARAM_STATE] == 0
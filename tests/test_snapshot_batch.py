@@ -0,0 +1,123 @@
+"""Tests for snapping many cameras with pipelined triggers and downloads."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import PARAM_URL
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _camera(device_id: str) -> ImouHaDevice:
+    device = ImouHaDevice(device_id, "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    return device
+
+
+def _cameras(count: int) -> list[ImouHaDevice]:
+    return [_camera(f"dev{i}") for i in range(count)]
+
+
+class _FakeApi:
+    def __init__(self) -> None:
+        self.triggers = 0
+        self.downloads = 0
+        self.peak_triggers = 0
+        self.peak_downloads = 0
+        self.events: list[str] = []
+        self.ready: dict[str, asyncio.Event] = {}
+
+    async def snap(self, device_id, channel_id):
+        self.triggers += 1
+        self.peak_triggers = max(self.peak_triggers, self.triggers)
+        await asyncio.sleep(0)
+        self.triggers -= 1
+        self.events.append(f"snap {device_id}")
+        return {PARAM_URL: device_id}
+
+    async def download(self, url, sink, max_bytes, ready_timeout):
+        self.downloads += 1
+        self.peak_downloads = max(self.peak_downloads, self.downloads)
+        try:
+            if url in self.ready:
+                await self.ready[url].wait()
+            await asyncio.sleep(0)
+            if url == "broken":
+                raise RequestFailedException("request failed,status code 404")
+            sink(url.encode())
+            self.events.append(f"download {url}")
+        finally:
+            self.downloads -= 1
+        return len(url)
+
+
+def _manager(api: _FakeApi, **kwargs) -> ImouHaDeviceManager:
+    delegate = MagicMock()
+    delegate.async_get_device_snap = AsyncMock(side_effect=api.snap)
+    delegate.async_download_file = AsyncMock(side_effect=api.download)
+    return ImouHaDeviceManager(delegate, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_results_are_yielded_as_they_complete():
+    api = _FakeApi()
+    api.ready["dev0"] = asyncio.Event()
+    manager = _manager(api)
+    results = []
+
+    async for device, image in manager.async_iter_device_images(_cameras(3), 5):
+        results.append((device.device_id, image))
+        if len(results) == 2:
+            api.ready["dev0"].set()
+
+    assert results == [(f"dev{i}", f"dev{i}".encode()) for i in (1, 2, 0)]
+
+
+@pytest.mark.asyncio
+async def test_triggers_and_downloads_have_separate_limits():
+    api = _FakeApi()
+    manager = _manager(api, max_snapshot_jobs=10)
+
+    results = [
+        result
+        async for result in manager.async_iter_device_images(
+            _cameras(12), 5, max_triggers=4, max_downloads=2
+        )
+    ]
+
+    assert len(results) == 12
+    assert api.peak_triggers == 4
+    assert api.peak_downloads == 2
+
+
+@pytest.mark.asyncio
+async def test_all_snaps_are_triggered_before_slow_downloads_finish():
+    api = _FakeApi()
+    api.ready["dev0"] = asyncio.Event()
+    manager = _manager(api)
+    images = manager.async_iter_device_images(_cameras(3), 5, max_downloads=1)
+
+    first = asyncio.ensure_future(images.__anext__())
+    await asyncio.sleep(0.01)
+    assert api.events == ["snap dev0", "snap dev1", "snap dev2"]
+
+    api.ready["dev0"].set()
+    device, _ = await first
+    assert device.device_id == "dev0"
+    await images.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_yielded_with_their_device():
+    api = _FakeApi()
+    manager = _manager(api)
+    cameras = [_camera("dev0"), _camera("broken")]
+
+    results = {
+        device.device_id: image
+        async for device, image in manager.async_iter_device_images(cameras, 5)
+    }
+
+    assert results["dev0"] == b"dev0"
+    assert isinstance(results["broken"], RequestFailedException)
@@ -0,0 +1,118 @@
+"""Tests for serving repeated image requests from the snapshot cache."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import PARAM_URL
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+from pyimouapi.snapshot import SnapshotCache
+
+
+def test_picture_expires_after_max_age(clock):
+    cache = SnapshotCache(max_age=5, max_bytes=100)
+    cache.put("cam", b"jpeg")
+
+    clock[0] += 5
+    assert cache.get("cam") == b"jpeg"
+    clock[0] += 1
+    assert cache.get("cam") is None
+    assert cache.stats["bytes"] == 0
+
+
+def test_least_recently_used_pictures_are_evicted(clock):
+    cache = SnapshotCache(max_age=5, max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    cache.get("a")
+
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["bytes"] == 8
+
+
+def test_picture_over_budget_is_not_cached(clock):
+    cache = SnapshotCache(max_age=5, max_bytes=3)
+    cache.put("a", b"aaaa")
+
+    assert cache.stats["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_join_the_snapshot_in_flight(clock):
+    cache = SnapshotCache(max_age=5, max_bytes=100)
+    release = asyncio.Event()
+    calls = []
+
+    async def _fetch():
+        calls.append(1)
+        await release.wait()
+        return b"jpeg"
+
+    waiters = [
+        asyncio.ensure_future(cache.async_get_or_fetch("cam", _fetch)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [b"jpeg"] * 3
+    assert await cache.async_get_or_fetch("cam", _fetch) == b"jpeg"
+    assert len(calls) == 1
+    assert cache.stats["hit_rate"] == 0.75
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_not_cached(clock):
+    cache = SnapshotCache(max_age=5, max_bytes=100)
+    fetch = AsyncMock(side_effect=[None, b"jpeg"])
+
+    assert await cache.async_get_or_fetch("cam", fetch) is None
+    assert await cache.async_get_or_fetch("cam", fetch) == b"jpeg"
+
+
+def _camera() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    return device
+
+
+def _delegate() -> MagicMock:
+    async def _download(url, sink, max_bytes, ready_timeout):
+        sink(b"jpeg")
+        return 4
+
+    delegate = MagicMock()
+    delegate.async_get_device_snap = AsyncMock(return_value={PARAM_URL: "url"})
+    delegate.async_download_file = AsyncMock(side_effect=_download)
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_manager_serves_repeated_requests_from_cache(clock):
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate, snapshot_max_age=5)
+
+    assert await manager.async_get_device_image(device, 3) == b"jpeg"
+    assert await manager.async_get_device_image(device, 3) == b"jpeg"
+    delegate.async_get_device_snap.assert_awaited_once()
+
+    clock[0] += 6
+    await manager.async_get_device_image(device, 3)
+    assert delegate.async_get_device_snap.await_count == 2
+    assert manager.snapshot_cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_zero_max_age_disables_caching(clock):
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate, snapshot_max_age=0)
+
+    await manager.async_get_device_image(device, 3)
+    await manager.async_get_device_image(device, 3)
+
+    assert delegate.async_get_device_snap.await_count == 2
@@ -0,0 +1,160 @@
+"""Tests for streaming snapshot downloads on the client's pooled session."""
+
+import asyncio
+import io
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pyimouapi import openapi
+from pyimouapi.const import PARAM_URL
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+from pyimouapi.openapi import ImouOpenApiClient
+
+IMAGE = b"\xff\xd8" + bytes(200_000) + b"\xff\xd9"
+
+
+@pytest.fixture
+async def server(monkeypatch):
+    monkeypatch.setattr(openapi, "SNAPSHOT_POLL_INITIAL_DELAY", 0.01)
+    requests = {"count": 0, "ready_after": 2}
+
+    async def _snapshot(request):
+        requests["count"] += 1
+        if requests["count"] <= requests["ready_after"]:
+            return web.Response(status=404)
+        return web.Response(body=IMAGE, content_type="image/jpeg")
+
+    app = web.Application()
+    app.router.add_get("/snap.jpg", _snapshot)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield test_server, requests
+    await test_server.close()
+
+
+@pytest.fixture
+async def client():
+    client = ImouOpenApiClient("app", "secret", "api.example.com")
+    yield client
+    await client.async_close()
+
+
+@pytest.mark.asyncio
+async def test_download_polls_until_ready_and_streams_to_sink(server, client):
+    test_server, requests = server
+    sink = io.BytesIO()
+
+    size = await client.async_download(
+        str(test_server.make_url("/snap.jpg")), sink, len(IMAGE), ready_timeout=5
+    )
+
+    assert size == len(IMAGE)
+    assert sink.getvalue() == IMAGE
+    assert requests["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_download_to_async_consumer(server, client):
+    test_server, requests = server
+    requests["ready_after"] = 0
+    chunks = []
+
+    async def _consume(chunk):
+        chunks.append(chunk)
+
+    await client.async_download(str(test_server.make_url("/snap.jpg")), _consume, 10**6)
+
+    assert b"".join(chunks) == IMAGE
+
+
+@pytest.mark.asyncio
+async def test_download_over_size_cap_fails(server, client):
+    test_server, requests = server
+    requests["ready_after"] = 0
+
+    with pytest.raises(RequestFailedException):
+        await client.async_download(
+            str(test_server.make_url("/snap.jpg")), io.BytesIO(), 1000
+        )
+
+
+@pytest.mark.asyncio
+async def test_download_gives_up_after_ready_timeout(server, client):
+    test_server, requests = server
+    requests["ready_after"] = 100
+
+    with pytest.raises(RequestFailedException):
+        await client.async_download(
+            str(test_server.make_url("/snap.jpg")), io.BytesIO(), 10**6, 0.05
+        )
+    assert 1 < requests["count"] < 100
+
+
+def _camera(device_id: str) -> ImouHaDevice:
+    device = ImouHaDevice(device_id, "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    return device
+
+
+@pytest.mark.asyncio
+async def test_device_image_returns_bytes_without_sink():
+    delegate = MagicMock()
+    delegate.async_get_device_snap = AsyncMock(return_value={PARAM_URL: "url"})
+
+    async def _download(url, sink, max_bytes, ready_timeout):
+        sink(b"jpeg")
+        return 4
+
+    delegate.async_download_file = AsyncMock(side_effect=_download)
+    manager = ImouHaDeviceManager(delegate)
+
+    assert await manager.async_get_device_image(_camera("dev1"), 3) == b"jpeg"
+    assert delegate.async_download_file.await_args.args[3] == 3
+
+
+@pytest.mark.asyncio
+async def test_snapshot_jobs_are_bounded_across_cameras():
+    running = []
+    peak = []
+    release = asyncio.Event()
+
+    async def _download(url, sink, max_bytes, ready_timeout):
+        running.append(url)
+        peak.append(len(running))
+        await release.wait()
+        running.remove(url)
+        return 0
+
+    delegate = MagicMock()
+    delegate.async_get_device_snap = AsyncMock(
+        side_effect=lambda device_id, channel_id: {PARAM_URL: device_id}
+    )
+    delegate.async_download_file = AsyncMock(side_effect=_download)
+    manager = ImouHaDeviceManager(delegate, max_snapshot_jobs=2)
+
+    jobs = [
+        asyncio.ensure_future(
+            manager.async_get_device_image(_camera(f"dev{i}"), 3, io.BytesIO())
+        )
+        for i in range(5)
+    ]
+    await asyncio.sleep(0.01)
+    assert len(running) == 2
+    release.set()
+    assert await asyncio.gather(*jobs) == [0] * 5
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_download_returns_none():
+    delegate = MagicMock()
+    delegate.async_get_device_snap = AsyncMock(return_value={PARAM_URL: "url"})
+    delegate.async_download_file = AsyncMock(
+        side_effect=RequestFailedException("request failed,status code 404")
+    )
+    manager = ImouHaDeviceManager(delegate)
+
+    assert await manager.async_get_device_image(_camera("dev1"), 3) is None
@@ -0,0 +1,159 @@
+"""Tests for reusing resolved live stream addresses."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import (
+    PARAM_EXPIRE_TIME,
+    PARAM_HD,
+    PARAM_HLS,
+    PARAM_STREAM_ID,
+    PARAM_STREAMS,
+)
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+STREAMS = {
+    PARAM_STREAMS: [
+        {PARAM_HLS: "https://hd.m3u8", PARAM_STREAM_ID: 0},
+        {PARAM_HLS: "https://sd.m3u8", PARAM_STREAM_ID: 1},
+        {PARAM_HLS: "rtmp://hd", PARAM_STREAM_ID: 0},
+    ]
+}
+
+
+def _camera(device_id: str = "dev1") -> ImouHaDevice:
+    device = ImouHaDevice(device_id, "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    return device
+
+
+def _delegate() -> MagicMock:
+    delegate = MagicMock()
+    delegate.async_get_stream_url = AsyncMock(return_value=STREAMS)
+    delegate.async_create_stream_url = AsyncMock(return_value=STREAMS)
+    return delegate
+
+
+@pytest.mark.asyncio
+async def test_selection_runs_against_cached_streams(clock):
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    device = _camera()
+
+    assert await manager.async_get_device_stream(device, PARAM_HD, "https") == (
+        "https://hd.m3u8"
+    )
+    assert await manager.async_get_device_stream(device, "SD", "https") == (
+        "https://sd.m3u8"
+    )
+    assert await manager.async_get_device_stream(device, PARAM_HD, "rtmp") == (
+        "rtmp://hd"
+    )
+    delegate.async_get_stream_url.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_streams_are_resolved_again_after_ttl_or_invalidation(clock):
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+    device = _camera()
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+
+    clock[0] += ha_device.STREAM_CACHE_TTL
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+    manager.invalidate_device_stream(device)
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+
+    assert delegate.async_get_stream_url.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_missing_live_is_bound_once_for_concurrent_views(clock):
+    delegate = _delegate()
+    release = asyncio.Event()
+
+    async def _create(device_id, channel_id):
+        await release.wait()
+        return STREAMS
+
+    delegate.async_get_stream_url.side_effect = RequestFailedException(
+        "LV1002:live not exist"
+    )
+    delegate.async_create_stream_url.side_effect = _create
+    manager = ImouHaDeviceManager(delegate)
+    device = _camera()
+
+    views = [
+        asyncio.ensure_future(
+            manager.async_get_device_stream(device, PARAM_HD, "https")
+        )
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*views) == ["https://hd.m3u8"] * 3
+    delegate.async_get_stream_url.assert_awaited_once()
+    delegate.async_create_stream_url.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_prewarm_resolves_streams_ahead_of_time(clock):
+    delegate = _delegate()
+
+    async def _get_stream_url(device_id, channel_id):
+        if device_id == "offline":
+            raise RequestFailedException("DV1007:device offline")
+        return STREAMS
+
+    delegate.async_get_stream_url.side_effect = _get_stream_url
+    manager = ImouHaDeviceManager(delegate)
+    cameras = [_camera("dev1"), _camera("dev2"), _camera("offline")]
+
+    failed = await manager.async_prewarm_device_streams(cameras)
+    for camera in cameras[:2]:
+        await manager.async_get_device_stream(camera, PARAM_HD, "https")
+
+    assert failed == [cameras[2]]
+    assert delegate.async_get_stream_url.await_count == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "streams",
+    [
+        lambda expire: {
+            PARAM_STREAMS: [
+                {PARAM_HLS: f"https://hd.m3u8?expire={expire}", PARAM_STREAM_ID: 0}
+            ]
+        },
+        lambda expire: {
+            PARAM_STREAMS: [
+                {
+                    PARAM_HLS: "https://hd.m3u8",
+                    PARAM_STREAM_ID: 0,
+                    PARAM_EXPIRE_TIME: expire * 1000,
+                }
+            ]
+        },
+    ],
+    ids=["url", "response"],
+)
+async def test_streams_are_reused_until_they_expire(clock, streams):
+    delegate = _delegate()
+    delegate.async_get_stream_url.return_value = streams(int(time.time()) + 600)
+    manager = ImouHaDeviceManager(delegate)
+    device = _camera()
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+
+    clock[0] += 500
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+    assert delegate.async_get_stream_url.await_count == 1
+
+    clock[0] += 600 - 500 - ha_device.STREAM_EXPIRY_MARGIN
+    await manager.async_get_device_stream(device, PARAM_HD, "https")
+    assert delegate.async_get_stream_url.await_count == 2
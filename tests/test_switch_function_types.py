@@ -0,0 +1,80 @@
+"""Tests for learning which function types answer for ability-based switches."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi import ha_device
+from pyimouapi.const import PARAM_FUNCTION_TYPE, PARAM_STATE, PARAM_STATUS
+from pyimouapi.exceptions import RequestFailedException
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _camera() -> ImouHaDevice:
+    device = ImouHaDevice("dev1", "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    device.switches["motion_detect"] = {
+        PARAM_STATE: False,
+        PARAM_FUNCTION_TYPE: ["mobileDetect", "motionDetect"],
+    }
+    return device
+
+
+def _delegate() -> MagicMock:
+    async def _get_status(device_id, channel_id, enable_type):
+        if enable_type == "motionDetect":
+            return {PARAM_STATUS: "on"}
+        raise RequestFailedException("OP1009:not support")
+
+    delegate = MagicMock()
+    delegate.async_get_device_status = AsyncMock(side_effect=_get_status)
+    return delegate
+
+
+def _queried(delegate: MagicMock) -> list[str]:
+    return [call.args[2] for call in delegate.async_get_device_status.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_only_answering_function_type_is_polled_after_probe():
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager._async_update_device_switch_status(device)
+    assert sorted(_queried(delegate)) == ["mobileDetect", "motionDetect"]
+    assert device.switches["motion_detect"][PARAM_STATE] is True
+
+    delegate.async_get_device_status.reset_mock()
+    await manager._async_update_device_switch_status(device)
+    assert _queried(delegate) == ["motionDetect"]
+    assert device.switches["motion_detect"][PARAM_STATE] is True
+
+
+@pytest.mark.asyncio
+async def test_reprobe_after_interval(clock):
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager._async_update_device_switch_status(device)
+    clock[0] += ha_device.SWITCH_FUNCTION_TYPE_REPROBE_INTERVAL
+    delegate.async_get_device_status.reset_mock()
+    await manager._async_update_device_switch_status(device)
+
+    assert sorted(_queried(delegate)) == ["mobileDetect", "motionDetect"]
+
+
+@pytest.mark.asyncio
+async def test_reprobe_after_learned_function_type_fails():
+    device = _camera()
+    delegate = _delegate()
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager._async_update_device_switch_status(device)
+    delegate.async_get_device_status.side_effect = RequestFailedException("timeout")
+    await manager._async_update_device_switch_status(device)
+    assert device.switches["motion_detect"][PARAM_STATE] is False
+
+    delegate.async_get_device_status.reset_mock()
+    await manager._async_update_device_switch_status(device)
+    assert sorted(_queried(delegate)) == ["mobileDetect", "motionDetect"]
@@ -0,0 +1,97 @@
+"""Tests for bounding a fleet update cycle by a deadline with priority shedding."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import (
+    PARAM_BATTERY,
+    PARAM_CHANNEL_ID,
+    PARAM_CHANNELS,
+    PARAM_ELECTRICITYS,
+    PARAM_LITELEC,
+    PARAM_ONLINE,
+    PARAM_STATE,
+    PARAM_STORAGE_USED,
+    PARAM_TOTAL_BYTES,
+    PARAM_USED_BYTES,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+def _setup(clock, battery_seconds: float = 0.0):
+    device = ImouHaDevice("dev1", "Camera", "Imou", "IPC", "1.0")
+    device.set_channel_id("0")
+    device.sensors[PARAM_STORAGE_USED] = {PARAM_STATE: "0"}
+    device.sensors[PARAM_BATTERY] = {PARAM_STATE: "0"}
+
+    async def _power_info(*args):
+        clock[0] += battery_seconds
+        return {PARAM_ELECTRICITYS: [{PARAM_LITELEC: 80}]}
+
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(
+        return_value={
+            PARAM_ONLINE: "1",
+            PARAM_CHANNELS: [{PARAM_CHANNEL_ID: "0", PARAM_ONLINE: "1"}],
+        }
+    )
+    delegate.async_get_device_storage = AsyncMock(
+        return_value={PARAM_TOTAL_BYTES: 100, PARAM_USED_BYTES: 25}
+    )
+    delegate.async_get_device_power_info = AsyncMock(side_effect=_power_info)
+    return device, delegate, ImouHaDeviceManager(delegate)
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_defers_all_but_high_priority(clock):
+    device, delegate, manager = _setup(clock)
+
+    report = await manager.async_update_devices_status([device], timeout=0)
+
+    delegate.async_get_device_online_status.assert_awaited_once()
+    delegate.async_get_device_storage.assert_not_awaited()
+    delegate.async_get_device_power_info.assert_not_awaited()
+    assert sorted(report.deferred[("dev1", "0")]) == [
+        "battery",
+        "selects",
+        "services",
+        "storage",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_deferred_steps_run_on_next_cycle(clock):
+    device, delegate, manager = _setup(clock)
+    await manager.async_update_devices_status([device], timeout=0)
+
+    report = await manager.async_update_devices_status([device], timeout=0)
+
+    delegate.async_get_device_storage.assert_awaited_once()
+    delegate.async_get_device_power_info.assert_awaited_once()
+    assert report.deferred == {}
+    assert device.sensors[PARAM_STORAGE_USED][PARAM_STATE] == "25"
+
+
+@pytest.mark.asyncio
+async def test_low_priority_step_needs_margin_over_its_cost(clock):
+    device, delegate, manager = _setup(clock, battery_seconds=10)
+    await manager.async_update_devices_status([device])
+    assert manager.update_step_costs["battery"] == 10
+
+    report = await manager.async_update_devices_status([device], timeout=15)
+
+    assert delegate.async_get_device_storage.await_count == 2
+    assert delegate.async_get_device_power_info.await_count == 1
+    assert report.deferred == {("dev1", "0"): ["battery"]}
+
+
+@pytest.mark.asyncio
+async def test_no_timeout_runs_every_step(clock):
+    device, delegate, manager = _setup(clock, battery_seconds=100)
+
+    report = await manager.async_update_devices_status([device])
+    report = await manager.async_update_devices_status([device])
+
+    assert delegate.async_get_device_power_info.await_count == 2
+    assert report.deferred == {}
+    assert report.duration == 100
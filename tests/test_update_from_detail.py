@@ -1,6 +1,5 @@
 """Tests for applying detail properties to HA device entities."""
 
-import asyncio
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -87,7 +86,7 @@ async def test_update_device_status_skips_detail_when_offline():
 
 
 @pytest.mark.asyncio
-async def test_switch_operation_by_ref_uses_single_property_query(monkeypatch):
+async def test_switch_operation_by_ref_uses_single_property_query(sleeps):
     device = _online_device()
     device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
 
@@ -98,11 +97,63 @@ async def test_switch_operation_by_ref_uses_single_property_query(monkeypatch):
     )
     delegate.async_get_iot_device_detail_info = AsyncMock()
 
-    monkeypatch.setattr(asyncio, "sleep", AsyncMock())
-
     manager = ImouHaDeviceManager(delegate)
     await manager._async_switch_operation_by_ref(device, "relay", True, "10001")
+    await manager.async_wait_for_write_verifications()
 
     delegate.async_get_iot_device_detail_info.assert_not_called()
     delegate.async_get_iot_device_properties.assert_awaited_once()
     assert device.switches["relay"][PARAM_STATE] is True
+
+
+@pytest.mark.asyncio
+async def test_unchanged_detail_is_not_applied_again():
+    device = _online_device()
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    device.selects["volume"] = {PARAM_REF: "15400", PARAM_CURRENT_OPTION: "0"}
+    manager = ImouHaDeviceManager(MagicMock())
+    manager._apply_property_value = MagicMock(wraps=manager._apply_property_value)
+
+    await manager._async_update_properties_from_detail(
+        device, {PARAM_PROPERTIES: {"10001": 1, "15400": 2}, PARAM_CHANNELS: []}
+    )
+    assert manager._apply_property_value.call_count == 2
+    # Only the refs read are kept, not the payload
+    assert manager._applied_details[device] == {
+        ("switch", "relay"): 1,
+        ("select", "volume"): 2,
+    }
+
+    await manager._async_update_properties_from_detail(
+        device, {PARAM_PROPERTIES: {"10001": 1, "15400": 2}, PARAM_CHANNELS: []}
+    )
+    assert manager._apply_property_value.call_count == 2
+
+    await manager._async_update_properties_from_detail(
+        device, {PARAM_PROPERTIES: {"10001": 1, "15400": 3}, PARAM_CHANNELS: []}
+    )
+    assert manager._apply_property_value.call_count == 3
+    assert manager._apply_property_value.call_args.args[2] == "volume"
+    assert device.selects["volume"][PARAM_CURRENT_OPTION] == "3"
+
+
+@pytest.mark.asyncio
+async def test_local_write_reapplies_unchanged_detail(sleeps):
+    device = _online_device()
+    device.switches["relay"] = {PARAM_REF: "10001", PARAM_STATE: False}
+    detail = {PARAM_PROPERTIES: {"10001": 0}, PARAM_CHANNELS: []}
+
+    delegate = MagicMock()
+    delegate.async_set_iot_device_properties = AsyncMock()
+    delegate.async_get_iot_device_properties = AsyncMock(
+        return_value={PARAM_PROPERTIES: {"10001": 1}}
+    )
+    manager = ImouHaDeviceManager(delegate)
+
+    await manager._async_update_properties_from_detail(device, detail)
+    await manager._async_switch_operation_by_ref(device, "relay", True, "10001")
+    assert device.switches["relay"][PARAM_STATE] is True
+    await manager.async_wait_for_write_verifications()
+
+    await manager._async_update_properties_from_detail(device, dict(detail))
+    assert device.switches["relay"][PARAM_STATE] is False
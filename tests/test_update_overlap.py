@@ -0,0 +1,92 @@
+"""Tests for keeping status updates of one device from overlapping."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.const import PARAM_ONLINE
+from pyimouapi.ha_device import (
+    ImouHaDevice,
+    ImouHaDeviceManager,
+    UpdateOverlapPolicy,
+)
+
+
+def _setup(
+    policy: UpdateOverlapPolicy,
+) -> tuple[ImouHaDevice, MagicMock, ImouHaDeviceManager, asyncio.Event]:
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    release = asyncio.Event()
+
+    async def _online_status(*args):
+        await release.wait()
+        return {PARAM_ONLINE: "1", "channels": []}
+
+    delegate = MagicMock()
+    delegate.async_get_device_online_status = AsyncMock(side_effect=_online_status)
+    delegate.async_get_iot_device_detail_info = AsyncMock(return_value={})
+    manager = ImouHaDeviceManager(delegate, update_overlap_policy=policy)
+    return device, delegate, manager, release
+
+
+async def _overlapping_updates(manager, device, count):
+    first = asyncio.ensure_future(manager.async_update_device_status(device))
+    await asyncio.sleep(0)
+    others = [
+        asyncio.ensure_future(manager.async_update_device_status(device))
+        for _ in range(count)
+    ]
+    await asyncio.sleep(0)
+    return first, others
+
+
+@pytest.mark.asyncio
+async def test_skip_returns_while_update_is_running():
+    device, delegate, manager, release = _setup(UpdateOverlapPolicy.SKIP)
+
+    first, others = await _overlapping_updates(manager, device, 2)
+    await asyncio.gather(*others)
+    assert not first.done()
+
+    release.set()
+    await first
+    assert delegate.async_get_device_online_status.await_count == 1
+    assert manager.update_overlap_stats == {"overlapped": 2, "skipped": 2}
+
+
+@pytest.mark.asyncio
+async def test_coalesce_waits_for_running_update():
+    device, delegate, manager, release = _setup(UpdateOverlapPolicy.COALESCE)
+
+    first, others = await _overlapping_updates(manager, device, 2)
+    assert not any(other.done() for other in others)
+
+    release.set()
+    await asyncio.gather(first, *others)
+    assert delegate.async_get_device_online_status.await_count == 1
+    assert manager.update_overlap_stats == {"overlapped": 2, "skipped": 2}
+
+
+@pytest.mark.asyncio
+async def test_queue_runs_one_follow_up():
+    device, delegate, manager, release = _setup(UpdateOverlapPolicy.QUEUE)
+
+    first, others = await _overlapping_updates(manager, device, 3)
+    release.set()
+    await asyncio.gather(first, *others)
+
+    assert delegate.async_get_device_online_status.await_count == 2
+    assert manager.update_overlap_stats == {"overlapped": 3, "skipped": 2}
+
+
+@pytest.mark.asyncio
+async def test_sequential_updates_do_not_overlap():
+    device, delegate, manager, release = _setup(UpdateOverlapPolicy.SKIP)
+    release.set()
+
+    await manager.async_update_device_status(device)
+    await manager.async_update_device_status(device)
+
+    assert delegate.async_get_device_online_status.await_count == 2
+    assert manager.update_overlap_stats == {"overlapped": 0, "skipped": 0}
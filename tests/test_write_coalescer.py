@@ -0,0 +1,141 @@
+"""Tests for coalescing rapid successive property writes."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pyimouapi.coalescer import WriteCoalescer
+from pyimouapi.const import (
+    PARAM_PROPERTIES,
+    PARAM_REF,
+    PARAM_REF_TYPE,
+    PARAM_STATE,
+    PARAM_VALUE_TYPE,
+)
+from pyimouapi.ha_device import ImouHaDevice, ImouHaDeviceManager
+
+
+@pytest.mark.asyncio
+async def test_writes_within_debounce_window_send_latest_value_once():
+    coalescer = WriteCoalescer(debounce=0.01)
+    write = AsyncMock(side_effect=lambda value: f"sent {value}")
+
+    results = await asyncio.gather(
+        *[coalescer.async_submit("key", value, write) for value in (10, 20, 30)]
+    )
+
+    write.assert_awaited_once_with(30)
+    assert results == ["sent 30"] * 3
+    assert coalescer.stats == {"submitted": 3, "sent": 1}
+
+
+@pytest.mark.asyncio
+async def test_writes_during_in_flight_request_are_collapsed():
+    coalescer = WriteCoalescer()
+    release = asyncio.Event()
+    sent = []
+
+    async def _write(value):
+        sent.append(value)
+        await release.wait()
+
+    first = asyncio.ensure_future(coalescer.async_submit("key", 1, _write))
+    await asyncio.sleep(0)
+    others = [
+        asyncio.ensure_future(coalescer.async_submit("key", value, _write))
+        for value in (2, 3, 4)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *others)
+
+    assert sent == [1, 4]
+
+
+@pytest.mark.asyncio
+async def test_every_caller_receives_the_error():
+    coalescer = WriteCoalescer(debounce=0.01)
+    write = AsyncMock(side_effect=RuntimeError("boom"))
+
+    results = await asyncio.gather(
+        coalescer.async_submit("key", 1, write),
+        coalescer.async_submit("key", 2, write),
+        return_exceptions=True,
+    )
+
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+    write.assert_awaited_once_with(2)
+
+
+@pytest.mark.asyncio
+async def test_keys_are_independent():
+    coalescer = WriteCoalescer(debounce=0.01)
+    write = AsyncMock()
+
+    await asyncio.gather(
+        coalescer.async_submit("a", 1, write),
+        coalescer.async_submit("b", 2, write),
+    )
+
+    assert write.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_manager_collapses_text_writes(sleeps):
+    device = ImouHaDevice("dev1", "Plug", "Imou", "Plug", "1.0")
+    device.set_product_id("pid1")
+    device.texts["overcharge_switch"] = {
+        PARAM_REF: "1008",
+        PARAM_STATE: "100",
+        PARAM_REF_TYPE: "properties",
+        PARAM_VALUE_TYPE: "int",
+    }
+    delegate = MagicMock()
+    delegate.async_set_iot_device_properties = AsyncMock()
+    delegate.async_get_iot_device_properties = AsyncMock(
+        return_value={PARAM_PROPERTIES: {"1008": 80}}
+    )
+    manager = ImouHaDeviceManager(delegate, write_debounce=0.01)
+    await asyncio.gather(
+        *[
+            manager.async_set_text_value(device, "overcharge_switch", value)
+            for value in ("90", "85", "80")
+        ]
+    )
+
+    delegate.async_set_iot_device_properties.assert_awaited_once_with(
+        "dev1", None, "pid1", {"1008": 80}
+    )
+    assert device.texts["overcharge_switch"][PARAM_STATE] == "80"
+    await manager.async_wait_for_write_verifications()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stage", ["debounce", "previous", "write"])
+async def test_cancelled_flush_releases_its_callers(stage):
+    coalescer = WriteCoalescer(debounce=10 if stage == "debounce" else 0.0)
+    release = asyncio.Event()
+
+    async def _write(value):
+        await release.wait()
+        return value
+
+    first = None
+    if stage == "previous":
+        first = asyncio.ensure_future(coalescer.async_submit("key", 0, _write))
+        await asyncio.sleep(0)
+    caller = asyncio.ensure_future(coalescer.async_submit("key", 1, _write))
+    await asyncio.sleep(0)
+    flush = coalescer._pending.get("key") or coalescer._in_flight["key"]
+    flush = getattr(flush, "task", flush)
+    await asyncio.sleep(0)
+
+    flush.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, 1)
+
+    release.set()
+    if first is not None:
+        assert await first == 0
+    assert coalescer._pending == {}
+    assert coalescer._in_flight == {}